@@ -0,0 +1,85 @@
+"""Compare building every hall one command at a time with one batch build.
+
+Writes --halls rosters whose residents hold overlapping cards, then builds
+the Clash Royale deck for each hall with its own `doordecks build-clash`
+run (each with a cold image cache, as when halls are built from separate
+checkouts), the same with one shared cache, and once with `doordecks batch`
+from a cold cache. Reports wall time and how many image requests reached
+the local ImageServer.
+
+    python benchmarks/bench_batch.py [--halls 8] [--residents 300] [--latency 0.05]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_server import ImageServer  # noqa: E402
+from bench_roster import RARITIES, write_roster  # noqa: E402
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CARDS = 100
+
+
+def doordecks(*args):
+    subprocess.run([sys.executable, '-m', 'doordecks.cli', *args],
+                   env=dict(os.environ, PYTHONPATH=REPO_ROOT), capture_output=True, check=True)
+
+
+def timed(server, build):
+    shutil.rmtree('cache', ignore_errors=True)
+    served = server.requests_served
+    start = time.perf_counter()
+    build()
+    return {'seconds': time.perf_counter() - start, 'requests': server.requests_served - served}
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--halls', type=int, default=8)
+    parser.add_argument('--residents', type=int, default=300, help='residents per hall')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per image request')
+    args = parser.parse_args()
+
+    results = {}
+    cwd = os.getcwd()
+    with ImageServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            with open('cards.json', 'w') as f:
+                json.dump([{'name': f'card{i}', 'image_url': server.url(i),
+                            'rarity': RARITIES[i % 5]} for i in range(CARDS)], f)
+            os.makedirs('rosters')
+            halls = [f'hall{k:02d}' for k in range(args.halls)]
+            for hall in halls:
+                write_roster(os.path.join('rosters', f'residents_{hall}.csv'), args.residents)
+
+            def per_hall(shared_cache):
+                for hall in halls:
+                    cache_dir = 'cache' if shared_cache else os.path.join('cache', hall)
+                    doordecks('build-clash', '--cards', 'cards.json', '--in-memory',
+                              '--roster', os.path.join('rosters', f'residents_{hall}.csv'),
+                              '--cache-dir', cache_dir, '--output', f'{hall}.pptx')
+
+            results['per hall, cache per hall'] = timed(server, lambda: per_hall(False))
+            results['per hall, shared cache'] = timed(server, lambda: per_hall(True))
+            results['batch'] = timed(server, lambda: doordecks(
+                'batch', 'clash', 'rosters', '--data', 'cards.json', '--in-memory',
+                '--cache-dir', 'cache', '--output-dir', 'decks'))
+        finally:
+            os.chdir(cwd)
+
+    print(f'{"build":28s} {"time":>9s} {"requests":>9s}')
+    for label, result in results.items():
+        print(f'{label:28s} {result["seconds"]:7.2f} s {result["requests"]:9d}')
+    print(json.dumps(results))
+
+
+if __name__ == '__main__':
+    run()
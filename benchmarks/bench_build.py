@@ -0,0 +1,210 @@
+"""End-to-end and per-stage timings of both deck generators.
+
+Builds the Clash Royale and villager decks for synthetic Name,Room rosters
+with every image served by the local ImageServer at a fixed latency, starting
+each build from an empty image cache. Stage times come from timing wrappers
+installed around the generator functions for the duration of a build:
+
+    fetch     image downloads (summed over the download threads; with
+              --in-memory this includes the colors of each card image)
+    colors    dominant color extraction
+    gradient  gradient background render and write
+    shapes    drawing or stamping cards
+    slides    prs.slides.add_slide
+    save      prs.save
+
+Results are written as JSON named after the current commit, and --compare
+prints the change against an earlier results file:
+
+    python benchmarks/bench_build.py [--sizes 100 1000 10000] [--latency 0.02]
+    python benchmarks/bench_build.py --compare benchmarks/results/build-<old>.json
+"""
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pptx.presentation import Presentation  # noqa: E402
+from pptx.slide import Slides  # noqa: E402
+
+from image_server import ImageServer  # noqa: E402
+from bench_roster import write_roster  # noqa: E402
+from doordecks import clash, villager  # noqa: E402
+from doordecks.card_template import CardTemplate  # noqa: E402
+from doordecks.image_cache import ImageCache  # noqa: E402
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, 'benchmarks', 'results')
+RARITIES = ['common', 'rare', 'epic', 'legendary', 'champion']
+CARDS = 60
+VILLAGERS = 400
+# Stages slower than this fraction over the baseline are flagged by --compare
+REGRESSION_THRESHOLD = 0.10
+
+STAGES = {
+    'clash': [
+        ('fetch', clash, 'fetch_and_save_image'),
+        ('fetch', clash, 'fetch_card_image'),
+        ('colors', clash, 'image_dominant_colors'),
+        ('gradient', clash, 'gradient_background_path'),
+        ('gradient', clash, 'gradient_background_stream'),
+        ('shapes', clash, 'add_clash_card'),
+        ('shapes', CardTemplate, 'stamp'),
+        ('slides', Slides, 'add_slide'),
+        ('save', Presentation, 'save'),
+    ],
+    'villager': [
+        ('fetch', ImageCache, 'fetch'),
+        ('shapes', villager, 'add_villager_card'),
+        ('shapes', CardTemplate, 'stamp'),
+        ('slides', Slides, 'add_slide'),
+        ('save', Presentation, 'save'),
+    ],
+}
+
+
+class StageTimer:
+    """Accumulate time spent in patched functions, per stage"""
+
+    def __init__(self, stages):
+        self.stages = stages
+        self.seconds = {}
+        self._lock = threading.Lock()
+
+    def _wrap(self, stage, fn):
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.seconds[stage] = self.seconds.get(stage, 0.0) + elapsed
+        return timed
+
+    def __enter__(self):
+        self._saved = []
+        for stage, owner, name in self.stages:
+            original = owner.__dict__[name]
+            self._saved.append((owner, name, original))
+            setattr(owner, name, self._wrap(stage, original))
+        return self
+
+    def __exit__(self, *exc):
+        for owner, name, original in reversed(self._saved):
+            setattr(owner, name, original)
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def build(theme, server, residents, workdir, in_memory=False):
+    """Build one deck from a cold cache in workdir and return its result entry"""
+    os.makedirs(workdir)
+    os.chdir(workdir)
+    shutil.copy(os.path.join(REPO_ROOT, 'bells.png'), '.')
+    write_roster('roster.csv', residents)
+    clash._dominant_color_cache.clear()
+    clash._gradient_background_path.cache_clear()
+    clash._gradient_background_png.cache_clear()
+    cache = ImageCache('cache')
+
+    with StageTimer(STAGES[theme]) as timer, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        if theme == 'clash':
+            card_data = [{'name': f'card{i}', 'image_url': server.url(i), 'rarity': RARITIES[i % 5]}
+                         for i in range(CARDS)]
+            clash.create_clash_royale_presentation('roster.csv', card_data, cache=cache,
+                                                   in_memory=in_memory, save_path='deck.pptx')
+        else:
+            image_urls = [server.url(1000 + i % VILLAGERS) for i in range(residents)]
+            villager.adjust_pptx('roster.csv', image_urls, cache=cache, save_path='deck.pptx')
+        total = time.perf_counter() - start
+
+    return {
+        'total': total,
+        'stages': dict(sorted(timer.seconds.items())),
+        'pptx_bytes': os.path.getsize('deck.pptx'),
+    }
+
+
+def compare(baseline, results):
+    """Print per-stage changes against a baseline results file"""
+    print(f'\ncompared with {baseline["commit"]}:')
+    for key, entry in results['results'].items():
+        old = baseline['results'].get(key)
+        if not old:
+            continue
+        rows = [('total', old['total'], entry['total'])]
+        rows += [(stage, old['stages'].get(stage), seconds) for stage, seconds in entry['stages'].items()]
+        for stage, before, after in rows:
+            if not before:
+                continue
+            change = after / before - 1
+            flag = '  <- slower' if change > REGRESSION_THRESHOLD else ''
+            print(f'{key:16s} {stage:9s} {before:8.3f} s -> {after:8.3f} s {change:+7.1%}{flag}')
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--themes', nargs='+', choices=sorted(STAGES), default=sorted(STAGES))
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--in-memory', action='store_true',
+                        help='build the Clash deck without writing clash_royale_images/')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/build-<commit>.json)')
+    parser.add_argument('--compare', metavar='JSON', help='earlier results file to compare with')
+    args = parser.parse_args()
+
+    results = {
+        'commit': current_commit(),
+        'python': platform.python_version(),
+        'latency': args.latency,
+        'in_memory': args.in_memory,
+        'results': {},
+    }
+    cwd = os.getcwd()
+    print(f'{"build":16s} {"total":>9s}  stages')
+    with ImageServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as tmp:
+        try:
+            for theme in args.themes:
+                for residents in args.sizes:
+                    key = f'{theme}/{residents}'
+                    entry = build(theme, server, residents, os.path.join(tmp, key.replace('/', '-')),
+                                  args.in_memory)
+                    results['results'][key] = entry
+                    stages = ' '.join(f'{stage}={seconds:.2f}' for stage, seconds in entry['stages'].items())
+                    print(f'{key:16s} {entry["total"]:7.2f} s  {stages}')
+        finally:
+            os.chdir(cwd)
+
+    output = args.output or os.path.join(RESULTS_DIR, f'build-{results["commit"]}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'results written to {output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,77 @@
+"""Per-card cost of template cloning vs drawing every card through add_clash_card.
+
+Run from the repository root:
+
+    python benchmarks/bench_card_templates.py --cards 1000 10000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from PIL import Image
+from pptx import Presentation
+from pptx.util import Inches
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_server import make_image_bytes  # noqa: E402
+from doordecks import clash  # noqa: E402
+
+RARITIES = ['common', 'rare', 'epic', 'legendary', 'champion']
+
+
+def build_deck(n_cards, card_images, gradients, use_templates):
+    """Lay out n_cards cards and return the elapsed seconds (excluding save)"""
+    prs = Presentation()
+    templates = {}
+    start = time.perf_counter()
+    for index in range(n_cards):
+        column = index % 3
+        if column == 0:
+            slide = prs.slides.add_slide(prs.slide_layouts[5])
+        rarity = RARITIES[index % len(RARITIES)]
+        card_image = card_images[index % len(card_images)]
+        gradient = gradients[index % len(gradients)]
+        name, room = f'Resident {index}', str(100 + index)
+        if not use_templates:
+            clash.add_clash_card(slide, column, name, room, rarity, card_image, gradient)
+            continue
+        key = (rarity, True, True, None)
+        if key not in templates:
+            templates[key] = clash.clash_card_template(*key)
+        templates[key].stamp(slide, Inches(column * 3), {'{name}': name, '{room}': room},
+                             {'card_image': card_image, 'gradient': gradient})
+    return time.perf_counter() - start
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cards', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--images', type=int, default=60)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        card_images, gradients = [], []
+        for i in range(args.images):
+            path = os.path.join(tmp, f'{i}_card.jpg')
+            Image.open(io.BytesIO(make_image_bytes(i))).save(path)
+            card_images.append(path)
+            gradients.append(clash.gradient_background_path(
+                tmp, clash.CARD_WIDTH_PX, clash.CARD_HEIGHT_PX, clash.extract_dominant_colors(path)))
+
+        print(f'{"cards":>7} {"builder":>14} {"template":>14} {"speedup":>8}')
+        for n_cards in args.cards:
+            # Elixir.png is usually absent; silence the per-card warning
+            with contextlib.redirect_stdout(io.StringIO()):
+                builder = build_deck(n_cards, card_images, gradients, use_templates=False)
+                template = build_deck(n_cards, card_images, gradients, use_templates=True)
+            print(f'{n_cards:7d} {builder / n_cards * 1e3:11.3f} ms {template / n_cards * 1e3:11.3f} ms '
+                  f'{builder / template:7.1f}x')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,85 @@
+"""Compare the original getpixel-based color sampler with extract_dominant_colors.
+
+Run from the repository root:
+
+    python benchmarks/bench_dominant_colors.py --images 60 --residents 600
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_server import make_image_bytes  # noqa: E402
+from doordecks import clash  # noqa: E402
+
+
+def legacy_extract_dominant_colors(image_path, num_colors=3):
+    """The pre-NumPy implementation: first distinct pixels in scan order"""
+    image = Image.open(image_path)
+    image = image.resize((50, 50))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    width, height = image.size
+    unique_colors = []
+    for y in range(0, height, 5):
+        for x in range(0, width, 5):
+            pixel = image.getpixel((x, y))
+            is_unique = True
+            for existing in unique_colors:
+                if abs(pixel[0] - existing[0]) < 50 and abs(pixel[1] - existing[1]) < 50 and abs(pixel[2] - existing[2]) < 50:
+                    is_unique = False
+                    break
+            if is_unique and len(unique_colors) < num_colors:
+                unique_colors.append(pixel[:3])
+            if len(unique_colors) >= num_colors:
+                break
+        if len(unique_colors) >= num_colors:
+            break
+    while len(unique_colors) < num_colors:
+        unique_colors.append((100 + len(unique_colors) * 50, 150, 200))
+    return unique_colors
+
+
+def timed(fn, paths):
+    start = time.perf_counter()
+    for path in paths:
+        fn(path)
+    return time.perf_counter() - start
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--images', type=int, default=60)
+    parser.add_argument('--residents', type=int, default=600)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        images = []
+        for i in range(args.images):
+            path = os.path.join(tmp, f'{i}.jpg')
+            Image.open(BytesIO(make_image_bytes(i, size=(500, 600)))).save(path, quality=90)
+            images.append(path)
+        # Each resident analyzes the card assigned to them, as in doordecks.clash
+        paths = [images[i % args.images] for i in range(args.residents)]
+
+        legacy = timed(legacy_extract_dominant_colors, paths)
+        clash._dominant_color_cache.clear()
+        cold = timed(clash.extract_dominant_colors, images)
+        clash._dominant_color_cache.clear()
+        memoized = timed(clash.extract_dominant_colors, paths)
+
+    print(f'images={args.images} residents={args.residents} (500x600 JPEG)')
+    print(f'legacy getpixel:      {legacy * 1000:8.1f} ms  ({legacy / len(paths) * 1e3:.2f} ms/call)')
+    print(f'numpy, per image:     {cold * 1000:8.1f} ms  ({cold / len(images) * 1e3:.2f} ms/call)')
+    print(f'numpy + memoization:  {memoized * 1000:8.1f} ms  ({memoized / len(paths) * 1e3:.2f} ms/call)')
+    print(f'speedup per roster:   {legacy / memoized:8.1f}x')
+
+
+if __name__ == '__main__':
+    run()
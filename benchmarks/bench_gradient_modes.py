@@ -0,0 +1,73 @@
+"""Compare deck size and build time for rasterized vs native gradient card backgrounds.
+
+Run from the repository root:
+
+    python benchmarks/bench_gradient_modes.py --residents 500 --cards 60
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_server import ImageServer  # noqa: E402
+from doordecks.image_cache import ImageCache  # noqa: E402
+from doordecks import clash  # noqa: E402
+
+RARITIES = ['common', 'rare', 'epic', 'legendary', 'champion']
+
+
+def build(residents_df, card_data, cache, native_gradient):
+    """Build one deck from a cold gradient/color state and return (seconds, bytes)"""
+    shutil.rmtree('clash_royale_images', ignore_errors=True)
+    clash._gradient_background_path.cache_clear()
+    clash._gradient_background_png.cache_clear()
+    clash._dominant_color_cache.clear()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        clash.create_clash_royale_presentation(
+            residents_df, card_data, cache=cache, native_gradient=native_gradient)
+    elapsed = time.perf_counter() - start
+    return elapsed, os.path.getsize('Clash_Royale_Door_Decks.pptx')
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--residents', type=int, default=500)
+    parser.add_argument('--cards', type=int, default=60)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with ImageServer(latency=0) as server, tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            card_data = [{'name': f'card{i}', 'image_url': server.url(i), 'rarity': RARITIES[i % 5]}
+                         for i in range(args.cards)]
+            residents_df = pd.DataFrame({
+                'Name': [f'Resident {i}' for i in range(args.residents)],
+                'Room': [100 + i for i in range(args.residents)],
+            })
+            # Warm the download cache so neither mode pays for the network
+            cache = ImageCache(os.path.join(tmp, 'cache'))
+            for card in card_data:
+                cache.fetch(card['image_url'])
+
+            results = {mode: build(residents_df, card_data, cache, mode == 'native')
+                       for mode in ('picture', 'native')}
+        finally:
+            os.chdir(cwd)
+
+    print(f'residents={args.residents} cards={args.cards}')
+    for mode, (elapsed, size) in results.items():
+        print(f'{mode:8s} {elapsed:7.2f}s  {size / 1024:9.1f} KiB')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,99 @@
+"""Time incremental rebuilds after small roster edits against a full build.
+
+Builds each deck once with build_incremental (a full build that writes the
+manifest), then applies single-resident edits to the roster and patches the
+deck: a room change (rewritten in place), a new resident on the last slide
+(one slide rendered again) and an edit that changes a card's image. Images
+come from the local ImageServer and the image cache stays warm, so the times
+are deck work only.
+
+    python benchmarks/bench_incremental.py [--residents 1000]
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_server import ImageServer  # noqa: E402
+from doordecks.image_cache import ImageCache  # noqa: E402
+from doordecks.incremental import build_incremental  # noqa: E402
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RARITIES = ['common', 'rare', 'epic', 'legendary', 'champion']
+CARDS = 60
+VILLAGERS = 400
+
+
+def write_rows(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['Name', 'Room'])
+        writer.writerows(rows)
+
+
+def timed_build(theme, data, cache):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        summary = build_incremental(theme, 'roster.csv', data, 'deck.pptx', cache=cache)
+        return time.perf_counter() - start, summary
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--residents', type=int, default=1000)
+    args = parser.parse_args()
+
+    results = {}
+    cwd = os.getcwd()
+    print(f'{"build":24s} {"time":>8s}  summary')
+    with ImageServer(latency=0) as server, tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            shutil.copy(os.path.join(REPO_ROOT, 'bells.png'), '.')
+            for theme in ('clash', 'villager'):
+                if theme == 'clash':
+                    data = [{'name': f'card{i}', 'image_url': server.url(i), 'rarity': RARITIES[i % 5]}
+                            for i in range(CARDS)]
+                else:
+                    data = [server.url(1000 + i % VILLAGERS) for i in range(args.residents + 1)]
+                rows = [[f'Resident {i}', str(1000 + i % 2000)] for i in range(args.residents)]
+                cache = ImageCache('cache')
+                # Warm the image cache so the full build is not timing downloads
+                write_rows('roster.csv', rows)
+                timed_build(theme, data, cache)
+                os.remove('deck.manifest.json')
+
+                def edit_image():
+                    if theme == 'clash':
+                        data[len(rows) // 2 % CARDS]['image_url'] = server.url(CARDS)
+                    else:
+                        data[len(rows) // 2] = server.url(1000 + VILLAGERS)
+
+                edits = [
+                    ('full', lambda: None),
+                    ('room change', lambda: rows[len(rows) // 2].__setitem__(1, '9999')),
+                    ('new resident', lambda: rows.append(['New Resident', '1'])),
+                    ('image change', edit_image),
+                ]
+                for label, edit in edits:
+                    edit()
+                    write_rows('roster.csv', rows)
+                    seconds, summary = timed_build(theme, data, cache)
+                    results[f'{theme}/{label}'] = {'seconds': seconds, **summary}
+                    print(f'{theme + " " + label:24s} {seconds:6.2f} s  {summary}')
+                os.remove('deck.manifest.json')
+        finally:
+            os.chdir(cwd)
+    print(json.dumps(results))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,84 @@
+"""Peak memory of deck builds against roster size, with and without a memory budget.
+
+Each build runs in a fresh `doordecks --memory-report` process, so the
+RSS high-water mark covers that build alone. Images come from the local
+ImageServer (noisy, so they compress like real artwork) and the cache is
+warmed first. Reports peak RSS, the tracemalloc peak of the Python heap
+and the number of parts a budgeted build was saved in.
+
+    python benchmarks/bench_memory.py [--residents 500 2000 8000] [--budget 150]
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_server import ImageServer  # noqa: E402
+from bench_roster import RARITIES, write_roster  # noqa: E402
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CARDS = 100
+VILLAGERS = 400
+
+
+def build(theme, budget=None):
+    """(peak RSS MiB, peak Python heap MiB, parts) of one build in a fresh process"""
+    if theme == 'clash':
+        command = ['build-clash', '--cards', 'cards.json', '--in-memory']
+    else:
+        command = ['build-villager', '--image-urls', 'villagers.json']
+    if budget:
+        command += ['--memory-budget', str(budget)]
+    for path in glob.glob('deck*.pptx'):
+        os.remove(path)
+    result = subprocess.run([sys.executable, '-m', 'doordecks.cli', *command, '--roster', 'roster.csv',
+                             '--cache-dir', 'cache', '--output', 'deck.pptx', '--memory-report'],
+                            env=dict(os.environ, PYTHONPATH=REPO_ROOT), capture_output=True,
+                            text=True, check=True)
+    rss = float(re.search(r'Peak RSS: ([\d.]+) MiB', result.stdout).group(1))
+    heap = float(re.search(r'Peak Python heap \(tracemalloc\): ([\d.]+) MiB', result.stdout).group(1))
+    return rss, heap, len(glob.glob('deck*.pptx'))
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--residents', type=int, nargs='+', default=[500, 2000, 8000])
+    parser.add_argument('--budget', type=int, default=150, help='MiB for the budgeted builds')
+    args = parser.parse_args()
+
+    results = {}
+    cwd = os.getcwd()
+    print(f'{"build":34s} {"peak RSS":>10s} {"heap":>10s} {"parts":>6s}')
+    with ImageServer(latency=0, noise=20) as server, tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            shutil.copy(os.path.join(REPO_ROOT, 'bells.png'), '.')
+            with open('cards.json', 'w') as f:
+                json.dump([{'name': f'card{i}', 'image_url': server.url(i),
+                            'rarity': RARITIES[i % 5]} for i in range(CARDS)], f)
+            with open('villagers.json', 'w') as f:
+                json.dump([server.url(1000 + i % VILLAGERS) for i in range(max(args.residents))], f)
+            for residents in args.residents:
+                write_roster('roster.csv', residents)
+                for theme in ('clash', 'villager'):
+                    if residents == args.residents[0]:
+                        build(theme)  # warm the image cache
+                    for budget in (None, args.budget):
+                        rss, heap, parts = build(theme, budget)
+                        label = f'{theme} {residents} ' + (f'budget {budget} MiB' if budget else 'unbounded')
+                        results[label] = {'rss_mib': rss, 'heap_mib': heap, 'parts': parts}
+                        print(f'{label:34s} {rss:6.1f} MiB {heap:6.1f} MiB {parts:6d}')
+        finally:
+            os.chdir(cwd)
+    print(json.dumps(results))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,89 @@
+"""Compare decks built from downloaded images with print-resolution ones.
+
+Serves large transparent images from the local ImageServer, builds both decks
+with images embedded as downloaded (--dpi 0) and resampled to their picture
+boxes at the print DPI, and reports the .pptx size, the prs.save time and the
+build time of each. Builds start from a warm download cache so only the
+image handling differs; 'rebuild' repeats the build once the resampled images
+are cached too.
+
+    python benchmarks/bench_normalize.py [--residents 3000] [--image-size 800] [--dpi 300]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_server import ImageServer  # noqa: E402
+from bench_roster import write_roster  # noqa: E402
+from doordecks import clash, villager  # noqa: E402
+from doordecks.image_cache import ImageCache  # noqa: E402
+from doordecks.tracing import tracing  # noqa: E402
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RARITIES = ['common', 'rare', 'epic', 'legendary', 'champion']
+CARDS = 60
+VILLAGERS = 100
+
+
+def build(theme, server, residents, dpi, cache_dir):
+    clash._dominant_color_cache.clear()
+    clash._gradient_background_path.cache_clear()
+    clash._gradient_background_png.cache_clear()
+    cache = ImageCache(cache_dir)
+    with tracing() as tracer, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        if theme == 'clash':
+            card_data = [{'name': f'card{i}', 'image_url': server.url(i), 'rarity': RARITIES[i % 5]}
+                         for i in range(CARDS)]
+            clash.create_clash_royale_presentation('roster.csv', card_data, cache=cache, dpi=dpi,
+                                                   save_path='deck.pptx')
+        else:
+            image_urls = [server.url(1000 + i % VILLAGERS) for i in range(residents)]
+            villager.adjust_pptx('roster.csv', image_urls, cache=cache, dpi=dpi, save_path='deck.pptx')
+        total = time.perf_counter() - start
+    _, save_seconds, _ = tracer.stages()['save']
+    return {'total': total, 'save': save_seconds, 'pptx_bytes': os.path.getsize('deck.pptx')}
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--residents', type=int, default=3000)
+    parser.add_argument('--image-size', type=int, default=800)
+    parser.add_argument('--dpi', type=int, default=300)
+    args = parser.parse_args()
+
+    results = {}
+    cwd = os.getcwd()
+    print(f'{"build":18s} {"pptx":>10s} {"save":>8s} {"build":>8s} {"rebuild":>8s}')
+    size = (args.image_size, args.image_size)
+    with ImageServer(latency=0, size=size, alpha=True, noise=20) as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            shutil.copy(os.path.join(REPO_ROOT, 'bells.png'), '.')
+            write_roster('roster.csv', args.residents)
+            cache_dir = os.path.join(tmp, 'cache')
+            for theme in ('clash', 'villager'):
+                # Warm the download cache so neither mode pays for the network
+                build(theme, server, min(args.residents, VILLAGERS), None, cache_dir)
+                for label, dpi in (('downloaded', None), (f'{args.dpi} dpi', args.dpi)):
+                    entry = build(theme, server, args.residents, dpi, cache_dir)
+                    entry['rebuild'] = build(theme, server, args.residents, dpi, cache_dir)['total']
+                    results[f'{theme}/{label}'] = entry
+                    print(f'{theme + " " + label:18s} {entry["pptx_bytes"] / 2**20:7.1f} MiB '
+                          f'{entry["save"]:6.2f} s {entry["total"]:6.2f} s {entry["rebuild"]:6.2f} s')
+        finally:
+            os.chdir(cwd)
+    print(json.dumps(results))
+
+
+if __name__ == '__main__':
+    run()
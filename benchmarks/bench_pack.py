@@ -0,0 +1,106 @@
+"""Compare reading villager posters from the image cache with an image pack.
+
+Packs --villagers posters from the local ImageServer, then times reading all
+of them back in a fresh process (load the cache index and open each
+normalized file, or map the pack and slice it) and a villager build of
+--residents residents either way. The server is stopped before the pack
+build, so that one cannot touch the network.
+
+    python benchmarks/bench_pack.py [--villagers 400] [--residents 1200]
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_server import ImageServer  # noqa: E402
+from doordecks import villager  # noqa: E402
+from doordecks.image_cache import ImageCache  # noqa: E402
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a child process so imports and the index load are part of the time
+READ_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+from doordecks import villager
+from doordecks.image_cache import ImageCache
+from doordecks.normalize import normalized_image
+mode, urls = sys.argv[1], json.load(open('urls.json'))
+size = villager.villager_image_size()
+total = 0
+if mode == 'cache':
+    cache = ImageCache('cache')
+    for url in urls:
+        with open(normalized_image(cache, url, size), 'rb') as f:
+            total += len(f.read())
+else:
+    pack = villager.open_villager_pack('villagers.pack', size)
+    for url in urls:
+        total += len(pack.open_image(url).getvalue())
+print(json.dumps({'seconds': time.perf_counter() - start, 'bytes': total}))
+'''
+
+
+def read_all(mode):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    output = subprocess.run([sys.executable, '-c', READ_SCRIPT, mode], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def timed_build(urls, pack=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        villager.adjust_pptx('roster.csv', urls, cache=ImageCache('cache'), save_path='deck.pptx',
+                             paths_csv='paths.csv', pack=pack)
+        return time.perf_counter() - start
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--villagers', type=int, default=400)
+    parser.add_argument('--residents', type=int, default=1200)
+    args = parser.parse_args()
+
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            shutil.copy(os.path.join(REPO_ROOT, 'bells.png'), '.')
+            with open('roster.csv', 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['Name', 'Room'])
+                writer.writerows([f'Resident {i}', str(100 + i)] for i in range(args.residents))
+
+            with ImageServer(latency=0) as server:
+                posters = [server.url(1000 + i) for i in range(args.villagers)]
+                urls = [posters[i % args.villagers] for i in range(args.residents)]
+                with contextlib.redirect_stdout(io.StringIO()):
+                    villager.pack_villager_images(posters, 'villagers.pack', cache=ImageCache('cache'))
+                with open('urls.json', 'w') as f:
+                    json.dump(posters, f)
+                results['read cache'] = read_all('cache')
+                results['build cache'] = {'seconds': timed_build(urls)}
+            results['read pack'] = read_all('pack')
+            results['build pack'] = {'seconds': timed_build(urls, 'villagers.pack')}
+        finally:
+            os.chdir(cwd)
+
+    for label, result in results.items():
+        print(f'{label:12s} {result["seconds"]:6.2f} s')
+    print(json.dumps(results))
+
+
+if __name__ == '__main__':
+    run()
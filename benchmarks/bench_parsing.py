@@ -0,0 +1,130 @@
+"""Compare BeautifulSoup and streaming lxml parsing of wiki pages.
+
+Checks that both parsers extract identical card images, rarities and villager
+poster URLs, then reports parse time and peak memory per page. Peak memory is
+the RSS growth of a fresh process parsing one page, since lxml allocates
+outside the Python heap.
+
+    python benchmarks/bench_parsing.py [--pages-dir DIR] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wiki_fixture_server import LAZY_GIF, make_card_page, make_villager_list_page  # noqa: E402
+from doordecks import scrape_clash as cards  # noqa: E402
+from doordecks import scrape_villagers as villagers  # noqa: E402
+
+
+def card_pages(pages_dir=None):
+    """(card name, html) pairs: saved pages, or synthetic pages plus edge cases"""
+    if pages_dir:
+        for card_name in cards.CARD_NAMES:
+            path = os.path.join(pages_dir, f'{card_name}.html')
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    yield card_name, f.read()
+        return
+    for card_name in cards.CARD_NAMES:
+        yield card_name, make_card_page(card_name, cards.RARITY_MAPPING[card_name])
+    page = make_card_page('Knight', 'common')
+    # Infobox image without a "Card" alt: the src tier must win over later lazy images
+    yield 'Knight', page.replace('alt="KnightCard"', 'alt="Knight"')
+    # Only lazy-loaded card images, so the data-src tier decides
+    yield 'Knight', page.replace('alt="KnightCard" src=', f'alt="Knight" src="{LAZY_GIF}" data-src=')
+    # No card image at all
+    yield 'Knight', page.replace('Card.png', '.png')
+    # Card missing from RARITY_MAPPING falls back to the full selectors
+    yield 'Unknown_Card', make_card_page('Unknown_Card', 'legendary')
+
+
+def villager_page(pages_dir=None):
+    if pages_dir:
+        path = os.path.join(pages_dir, f'{villagers.url.rsplit("/", 1)[-1]}.html')
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+    return make_villager_list_page()
+
+
+def per_page_time(fn, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for args in pages:
+            fn(*args)
+    return (time.perf_counter() - start) / (repeat * len(pages))
+
+
+def rss_high_water_kib():
+    """Peak RSS of this process. Linux carries ru_maxrss across exec, so prefer VmHWM"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def child(kind, parser, pages_dir):
+    """Parse one page in this process and print the RSS growth in KiB"""
+    if kind == 'card':
+        args = next(card_pages(pages_dir))
+        fn = cards.parse_card_page_fast if parser == 'fast' else cards.parse_card_page
+    else:
+        args = (villager_page(pages_dir),)
+        fn = villagers.parse_image_urls_fast if parser == 'fast' else villagers.parse_image_urls
+    before = rss_high_water_kib()
+    fn(*args)
+    print(rss_high_water_kib() - before)
+
+
+def peak_kib(kind, parser, pages_dir):
+    command = [sys.executable, __file__, '--child', kind, parser]
+    if pages_dir:
+        command += ['--pages-dir', pages_dir]
+    return int(subprocess.check_output(command).decode().split()[-1])
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages-dir')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child, args.pages_dir)
+        return
+
+    pages = list(card_pages(args.pages_dir))
+    for card_name, html in pages:
+        soup = cards.parse_card_page(card_name, html)
+        fast = cards.parse_card_page_fast(card_name, html)
+        assert soup == fast, (card_name, soup, fast)
+    vpage = villager_page(args.pages_dir)
+    assert villagers.parse_image_urls(vpage) == villagers.parse_image_urls_fast(vpage)
+    print(f'identical results on {len(pages)} card pages and the villager list')
+
+    rows = [
+        ('card page', 'card', pages, cards.parse_card_page, cards.parse_card_page_fast),
+        ('villager list', 'villager', [(vpage,)], villagers.parse_image_urls, villagers.parse_image_urls_fast),
+    ]
+    print(f'{"page":14s} {"parser":7s} {"time/page":>11s} {"peak RSS":>10s}')
+    results = {}
+    for label, kind, page_args, soup_fn, fast_fn in rows:
+        for name, fn in (('soup', soup_fn), ('fast', fast_fn)):
+            seconds = per_page_time(fn, page_args, args.repeat)
+            peak = peak_kib(kind, name, args.pages_dir)
+            results[f'{kind}/{name}'] = {'seconds': seconds, 'peak_kib': peak}
+            print(f'{label:14s} {name:7s} {seconds * 1e3:8.2f} ms {peak:7d} KiB')
+    print(json.dumps(results))
+
+
+if __name__ == '__main__':
+    run()
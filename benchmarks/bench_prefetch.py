@@ -0,0 +1,49 @@
+"""Compare serial per-resident downloads with the concurrent prefetch stage.
+
+Run from the repository root:
+
+    python benchmarks/bench_prefetch.py --residents 600 --cards 60 --latency 0.05
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_server import ImageServer  # noqa: E402
+from doordecks.clash import fetch_and_save_image, prefetch_card_images  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--residents', type=int, default=600)
+    parser.add_argument('--cards', type=int, default=60)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    with ImageServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as tmp:
+        urls = [server.url(i % args.cards) for i in range(args.residents)]
+
+        start = time.perf_counter()
+        for i, url in enumerate(urls):
+            fetch_and_save_image(url, os.path.join(tmp, f'serial_{i}_card.jpg'))
+        serial = time.perf_counter() - start
+        serial_requests = server.requests_served
+
+        start = time.perf_counter()
+        images = prefetch_card_images(urls, os.path.join(tmp, 'prefetch'), args.workers)
+        prefetch = time.perf_counter() - start
+        prefetch_requests = server.requests_served - serial_requests
+
+    assert all(images.values()), 'prefetch failed to download some images'
+    print(f'residents={args.residents} cards={args.cards} latency={args.latency}s workers={args.workers}')
+    print(f'serial:   {serial:7.2f}s  {serial_requests} requests')
+    print(f'prefetch: {prefetch:7.2f}s  {prefetch_requests} requests')
+    print(f'speedup:  {serial / prefetch:7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Compare DataFrame row access with the streaming roster reader.
+
+Runs only the roster side of a build: read the CSV, walk residents three per
+slide, and write a Name/Path/Rarity paths CSV. 'frame' is the previous
+pd.read_csv + iloc + DataFrame.to_csv pipeline, 'stream' is
+doordecks.roster. Each run happens in a fresh process so peak RSS growth is
+measured per roster size.
+
+    python benchmarks/bench_roster.py [--rows 10000 100000 1000000]
+"""
+import argparse
+import csv
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parsing import rss_high_water_kib  # noqa: E402
+
+RARITIES = ['common', 'rare', 'epic', 'legendary', 'champion']
+
+
+def write_roster(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['Name', 'Room'])
+        for i in range(rows):
+            writer.writerow([f'Resident {i}', 1000 + i % 2000])
+
+
+def frame(roster, paths_csv):
+    import pandas as pd
+    residents_df = pd.read_csv(roster)
+    names = []
+    for i in range(0, len(residents_df), 3):
+        for j in range(3):
+            index = i + j
+            if index < len(residents_df):
+                resident = residents_df.iloc[index]
+                names.append((resident['Name'], resident['Room']))
+    pd.DataFrame({
+        'Name': list(residents_df['Name']),
+        'Path': [f'card_{index % 60}.jpg' for index in range(len(residents_df))],
+        'Rarity': [RARITIES[index % 5] for index in range(len(residents_df))],
+    }).to_csv(paths_csv, index=False)
+
+
+def stream(roster, paths_csv):
+    from doordecks.roster import PathsWriter, chunked, read_roster
+    with PathsWriter(paths_csv, ('Name', 'Path', 'Rarity')) as paths:
+        for group in chunked(read_roster(roster), 3):
+            for resident in group:
+                paths.write(resident.name, f'card_{resident.position % 60}.jpg',
+                            RARITIES[resident.position % 5])
+
+
+def child(mode, roster, paths_csv):
+    """Run one mode in this process and print seconds and RSS growth in KiB"""
+    fn = frame if mode == 'frame' else stream
+    if mode == 'frame':
+        # Load pandas before the clock starts: import cost is not part of the comparison
+        importlib.import_module('pandas')
+    before = rss_high_water_kib()
+    start = time.perf_counter()
+    fn(roster, paths_csv)
+    print(time.perf_counter() - start, rss_high_water_kib() - before)
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--child', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    results = {}
+    print(f'{"rows":>8s} {"mode":6s} {"time":>9s} {"peak RSS":>10s}')
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            roster = os.path.join(tmp, 'roster.csv')
+            write_roster(roster, rows)
+            outputs = {}
+            for mode in ('frame', 'stream'):
+                paths_csv = os.path.join(tmp, f'{mode}.csv')
+                seconds, peak = subprocess.check_output(
+                    [sys.executable, __file__, '--child', mode, roster, paths_csv]).decode().split()[-2:]
+                with open(paths_csv, 'rb') as f:
+                    outputs[mode] = f.read()
+                results[f'{rows}/{mode}'] = {'seconds': float(seconds), 'peak_kib': int(peak)}
+                print(f'{rows:8d} {mode:6s} {float(seconds):7.2f} s {int(peak):7d} KiB')
+            assert outputs['frame'] == outputs['stream'], 'paths CSVs differ'
+    print(json.dumps(results))
+
+
+if __name__ == '__main__':
+    run()
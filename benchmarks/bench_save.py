@@ -0,0 +1,104 @@
+"""Time Presentation.save against the fast package writer.
+
+Builds a clash and a villager deck from the local ImageServer (noisy images,
+so media compresses like real artwork), loads each one back and saves it
+with the stock Presentation.save and with save_package at a few deflate
+levels. Reports the save time and file size, and checks that every fast
+save passes a zip CRC check and reopens with the same parts.
+
+    python benchmarks/bench_save.py [--residents 1500] [--repeat 3]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_server import ImageServer  # noqa: E402
+from bench_roster import write_roster  # noqa: E402
+from pptx import Presentation  # noqa: E402
+from doordecks import clash, villager  # noqa: E402
+from doordecks.image_cache import ImageCache  # noqa: E402
+from doordecks.package_writer import save_package  # noqa: E402
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RARITIES = ['common', 'rare', 'epic', 'legendary', 'champion']
+CARDS = 100
+VILLAGERS = 400
+LEVELS = (1, 6)
+
+
+def build(theme, server, residents):
+    with contextlib.redirect_stdout(io.StringIO()):
+        if theme == 'clash':
+            card_data = [{'name': f'card{i}', 'image_url': server.url(i), 'rarity': RARITIES[i % 5]}
+                         for i in range(CARDS)]
+            clash.create_clash_royale_presentation('roster.csv', card_data, cache=ImageCache('cache'),
+                                                   save_path='deck.pptx')
+        else:
+            image_urls = [server.url(1000 + i % VILLAGERS) for i in range(residents)]
+            villager.adjust_pptx('roster.csv', image_urls, cache=ImageCache('cache'),
+                                 save_path='deck.pptx')
+
+
+def timed(save, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        save()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def members(path):
+    with zipfile.ZipFile(path) as z:
+        assert z.testzip() is None
+        return {name: z.read(name) for name in z.namelist()}
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--residents', type=int, default=1500)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    results = {}
+    cwd = os.getcwd()
+    print(f'{"save":24s} {"time":>8s} {"size":>10s}')
+    with ImageServer(latency=0, noise=20) as server, tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            shutil.copy(os.path.join(REPO_ROOT, 'bells.png'), '.')
+            write_roster('roster.csv', args.residents)
+            for theme in ('clash', 'villager'):
+                build(theme, server, args.residents)
+                prs = Presentation('deck.pptx')
+                saves = [('stock', lambda: prs.save('stock.pptx'), 'stock.pptx')]
+                for level in LEVELS:
+                    saves.append((f'fast level {level}',
+                                  lambda level=level: save_package(prs, f'fast{level}.pptx', level),
+                                  f'fast{level}.pptx'))
+                for label, save, path in saves:
+                    seconds = timed(save, args.repeat)
+                    size = os.path.getsize(path)
+                    results[f'{theme}/{label}'] = {'seconds': seconds, 'bytes': size}
+                    print(f'{theme + " " + label:24s} {seconds:6.2f} s {size / 1e6:8.1f} MB')
+                stock = members('stock.pptx')
+                for level in LEVELS:
+                    assert members(f'fast{level}.pptx') == stock
+                    assert len(Presentation(f'fast{level}.pptx').slides) == len(prs.slides)
+        finally:
+            os.chdir(cwd)
+    print(json.dumps(results))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,71 @@
+"""Check the async card scraper against a local wiki fixture and time it.
+
+The async scraper must produce exactly what a one-page-at-a-time scrape of the
+same pages produces, even when the fixture answers some requests with 429/503.
+
+    python benchmarks/bench_scraper.py --latency 0.1 --error-rate 0.1 [--pages-dir DIR]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wiki_fixture_server import WikiFixtureServer  # noqa: E402
+from doordecks import scrape_clash as scraper  # noqa: E402
+
+
+def serial_scrape(base_url, delay):
+    """The original loop: one page at a time with a fixed sleep after each"""
+    card_data = []
+    for card_name in scraper.CARD_NAMES:
+        response = requests.get(f'{base_url}/wiki/{card_name}')
+        response.raise_for_status()
+        card = scraper.parse_card_page(card_name, response.text, base_url)
+        if card:
+            card_data.append(card)
+        time.sleep(delay)
+    return card_data
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages-dir')
+    parser.add_argument('--latency', type=float, default=0.1)
+    parser.add_argument('--error-rate', type=float, default=0.1)
+    parser.add_argument('--sleep', type=float, default=0.5, help='fixed sleep of the serial scraper')
+    parser.add_argument('--concurrency', type=int, default=scraper.DEFAULT_CONCURRENCY)
+    parser.add_argument('--rate', type=float, default=scraper.DEFAULT_REQUESTS_PER_SECOND)
+    args = parser.parse_args()
+
+    with WikiFixtureServer(args.pages_dir, latency=args.latency) as server:
+        start = time.perf_counter()
+        expected = serial_scrape(server.base_url, args.sleep)
+        serial = time.perf_counter() - start
+
+    with WikiFixtureServer(args.pages_dir, latency=args.latency, error_rate=args.error_rate) as server:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            actual = scraper.get_clash_royale_card_data(
+                base_url=server.base_url, concurrency=args.concurrency,
+                requests_per_second=args.rate, backoff=0.05)
+        concurrent = time.perf_counter() - start
+        errors = server.errors_served
+
+    identical = json.dumps(actual, indent=4) == json.dumps(expected, indent=4)
+    print(f'pages={len(scraper.CARD_NAMES)} latency={args.latency}s')
+    print(f'serial:  {serial:6.2f}s  ({len(expected)} cards)')
+    print(f'async:   {concurrent:6.2f}s  ({len(actual)} cards, {errors} injected 429/503 retried)')
+    print(f'output identical: {identical}')
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,105 @@
+"""Compare cold command-line builds with requests to a warm deck server.
+
+Each theme's deck is built for the same roster by a fresh `doordecks`
+process (imports, data load, template capture on every run) and by POSTing
+the roster to a DeckServer whose workers stay up. Images come from the local
+ImageServer and are prefetched into the cache first, so both sides only
+read from it. Reports the wall time per build, best and median.
+
+    python benchmarks/bench_server.py [--residents 60] [--repeat 5]
+"""
+import argparse
+import http.client
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_server import ImageServer  # noqa: E402
+from bench_roster import RARITIES, write_roster  # noqa: E402
+from doordecks.server import DeckService, make_server  # noqa: E402
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CARDS = 60
+VILLAGERS = 200
+
+
+def cold_build(theme):
+    if theme == 'clash':
+        command = ['build-clash', '--cards', 'cards.json', '--in-memory']
+    else:
+        command = ['build-villager', '--image-urls', 'villagers.json']
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'doordecks.cli', *command, '--roster', 'roster.csv',
+                    '--cache-dir', 'cache', '--output', 'cold.pptx'],
+                   env=dict(os.environ, PYTHONPATH=REPO_ROOT), capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def warm_build(port, theme, roster):
+    start = time.perf_counter()
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    connection.request('POST', f'/decks/{theme}', body=roster)
+    response = connection.getresponse()
+    body = response.read()
+    assert response.status == 200, body
+    return time.perf_counter() - start
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--residents', type=int, default=60)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    cwd = os.getcwd()
+    with ImageServer(latency=0) as image_server, tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            shutil.copy(os.path.join(REPO_ROOT, 'bells.png'), '.')
+            with open('cards.json', 'w') as f:
+                json.dump([{'name': f'card{i}', 'image_url': image_server.url(i),
+                            'rarity': RARITIES[i % 5]} for i in range(CARDS)], f)
+            with open('villagers.json', 'w') as f:
+                json.dump([image_server.url(1000 + i) for i in range(VILLAGERS)], f)
+            write_roster('roster.csv', args.residents)
+            with open('roster.csv', 'rb') as f:
+                roster = f.read()
+
+            service = DeckService(1, 'cache', {'clash': 'cards.json', 'villager': 'villagers.json'})
+            server = make_server(service, port=0)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                service.warm_up(prefetch=True)
+                for theme in ('clash', 'villager'):
+                    # The first request captures the theme's card templates
+                    warm_build(server.server_address[1], theme, roster)
+                    for label, build in (('cold CLI', lambda: cold_build(theme)),
+                                         ('warm server', lambda: warm_build(server.server_address[1],
+                                                                            theme, roster))):
+                        times = [build() for _ in range(args.repeat)]
+                        results[f'{theme} {label}'] = {'best': min(times),
+                                                       'median': statistics.median(times)}
+            finally:
+                server.shutdown()
+                server.server_close()
+                service.close()
+        finally:
+            os.chdir(cwd)
+
+    print(f'{"build":24s} {"best":>8s} {"median":>8s}')
+    for label, result in results.items():
+        print(f'{label:24s} {result["best"]:6.2f} s {result["median"]:6.2f} s')
+    print(json.dumps(results))
+
+
+if __name__ == '__main__':
+    run()
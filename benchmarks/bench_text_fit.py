@@ -0,0 +1,100 @@
+"""Time text auto-fit on its own and as part of a deck build.
+
+Fits --residents random names and rooms for both themes with a cold and a
+warm memo, then builds the villager deck with and without fit_text from the
+local ImageServer (warm image cache, best of --repeat alternating runs) to
+show what fitting adds to a build. Text is only fitted when the decks' own
+fonts (Impact, Perpetua) are installed; without them nothing is shrunk.
+
+    python benchmarks/bench_text_fit.py [--residents 10000] [--build-residents 3000] [--repeat 3]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_server import ImageServer  # noqa: E402
+from bench_roster import write_roster  # noqa: E402
+from doordecks import clash, text_fit, villager  # noqa: E402
+from doordecks.image_cache import ImageCache  # noqa: E402
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VILLAGERS = 100
+
+
+def random_name(rng):
+    words = rng.randint(1, 3)
+    return ' '.join(rng.choice(string.ascii_uppercase)
+                    + ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 12)))
+                    for _ in range(words))
+
+
+def time_fits(residents):
+    results = {}
+    for theme, module in (('clash', clash), ('villager', villager)):
+        text_fit.fit_font_size.cache_clear()
+        text_fit._advances.cache_clear()
+        for label in ('cold', 'warm'):
+            start = time.perf_counter()
+            shrunk = sum(module.card_text_sizes(name, room, True) != module.card_text_sizes(name, room)
+                         for name, room in residents)
+            results[f'{theme} fit {label}'] = {'seconds': time.perf_counter() - start, 'shrunk': shrunk}
+    return results
+
+
+def time_build(server, residents, fit_text):
+    image_urls = [server.url(1000 + i % VILLAGERS) for i in range(residents)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        villager.adjust_pptx('roster.csv', image_urls, cache=ImageCache('cache'), save_path='deck.pptx',
+                             fit_text=fit_text)
+        return time.perf_counter() - start
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--residents', type=int, default=10000)
+    parser.add_argument('--build-residents', type=int, default=3000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    residents = [(random_name(rng), str(rng.randint(100, 2999))) for _ in range(args.residents)]
+    results = time_fits(residents)
+
+    cwd = os.getcwd()
+    with ImageServer(latency=0) as server, tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            shutil.copy(os.path.join(REPO_ROOT, 'bells.png'), '.')
+            write_roster('roster.csv', args.build_residents)
+            time_build(server, args.build_residents, False)  # warm the image cache
+            # Alternate the two builds and keep the best of each, as single runs are noisy
+            for _ in range(args.repeat):
+                for fit_text in (False, True):
+                    text_fit.fit_font_size.cache_clear()
+                    text_fit._advances.cache_clear()
+                    seconds = time_build(server, args.build_residents, fit_text)
+                    label = f'villager build fit_text={fit_text}'
+                    if label not in results or seconds < results[label]['seconds']:
+                        results[label] = {'seconds': seconds}
+        finally:
+            os.chdir(cwd)
+
+    for label, result in results.items():
+        extra = f"  ({result['shrunk']} shrunk)" if 'shrunk' in result else ''
+        print(f"{label:32s} {result['seconds']:6.2f} s{extra}")
+    print(json.dumps(results))
+
+
+if __name__ == '__main__':
+    run()
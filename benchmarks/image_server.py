@@ -0,0 +1,100 @@
+"""Local HTTP stand-in for the wiki image CDN used by the benchmarks"""
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+from PIL import Image
+
+
+def make_image_bytes(seed, size=(268, 320), fmt='PNG', alpha=False, noise=0):
+    """Build a deterministic test image so every URL serves distinct content.
+
+    With alpha the image is RGBA with a transparent margin, like the wiki's
+    card art and villager posters. noise blends in Gaussian noise of that
+    sigma so the image compresses more like real artwork than flat stripes.
+    """
+    image = Image.new('RGB', size, ((seed * 37) % 256, (seed * 91) % 256, (seed * 53) % 256))
+    for y in range(0, size[1], 16):
+        image.paste(((seed * 13 + y) % 256, (y * 3) % 256, (seed * 7) % 256), (0, y, size[0], y + 8))
+    if noise:
+        grain = Image.effect_noise(size, noise).convert('RGB')
+        image = Image.blend(image, grain, 0.25)
+    if alpha:
+        image = image.convert('RGBA')
+        margin = min(size) // 8
+        mask = Image.new('L', size, 0)
+        mask.paste(255, (margin, margin, size[0] - margin, size[1] - margin))
+        image.putalpha(mask)
+    buffer = BytesIO()
+    image.save(buffer, fmt)
+    return buffer.getvalue()
+
+
+class ImageServer:
+    """Serve /img/<n>.png with a fixed per-request latency on a background thread.
+
+    Responses carry an ETag and honour If-None-Match with a 304.
+    """
+
+    def __init__(self, latency=0.05, host='127.0.0.1', size=(268, 320), alpha=False, noise=0):
+        self.latency = latency
+        self.size = size
+        self.alpha = alpha
+        self.noise = noise
+        self.requests_served = 0
+        self._images = {}
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(server.latency)
+                with server._lock:
+                    server.requests_served += 1
+                body = server.image_for(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'image/png')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def image_for(self, path):
+        name = path.split('?', 1)[0].rsplit('/', 1)[-1]
+        if not name.endswith('.png') or not name[:-4].isdigit():
+            return None
+        seed = int(name[:-4])
+        with self._lock:
+            if seed not in self._images:
+                self._images[seed] = make_image_bytes(seed, self.size, alpha=self.alpha, noise=self.noise)
+            return self._images[seed]
+
+    def url(self, n):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}/img/{n}.png'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,184 @@
+"""Local HTTP fixture server that serves wiki pages for the scraper benchmarks.
+
+Pages come from a directory of saved HTML files named <Page_name>.html, or are
+synthesized with an infobox like the Clash Royale wiki's when no directory is
+given. Save real pages once with:
+
+    python benchmarks/wiki_fixture_server.py --save benchmarks/fixtures/clash
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FILLER = ('<p>Lorem ipsum dolor sit amet, <a href="/wiki/Arena">arena</a> consectetur '
+          '<b>elixir</b> adipiscing elit, sed do eiusmod tempor incididunt.</p>\n')
+
+
+LAZY_GIF = 'data:image/gif;base64,R0lGODlhAQABAIABAAAAAP///yH5BAEAAAEALAAAAAABAAEAQAICTAEAOw%3D%3D'
+
+
+def _card_image_url(stem, width=100):
+    return (f'https://static.wikia.nocookie.net/clashroyale/images/a/ab/{stem}Card.png'
+            f'/revision/latest/scale-to-width-down/{width}?cb=20240101000000')
+
+
+def make_card_page(card_name, rarity='common', filler=2000):
+    """Synthetic card page with the image and rarity where the wiki puts them.
+
+    Like the real wiki, it has lazy-loaded images (placeholder src, real URL
+    in data-src) and a navbox linking other cards' images after the infobox.
+    """
+    stem = card_name.replace('_', '').replace('.', '')
+    rows = ''.join(f'<tr><th>Stat {i}</th><td>{i * 7}</td></tr>' for i in range(20))
+    navbox = ''.join(
+        f'<td><a class="image"><img alt="Other{i}Card" src="{LAZY_GIF}" '
+        f'data-src="{_card_image_url(f"Other{i}", 150)}" class="lazyload"></a></td>'
+        for i in range(40))
+    return (f'<!DOCTYPE html><html><head><title>{card_name}</title>'
+            f'<script>var wgPageName = "{card_name}";</script></head><body>'
+            f'<div class="page-header"><img src="/logo.png" alt="Wiki logo"></div>'
+            f'<table class="infobox"><tr><td><a class="image"><img alt="{stem}Card" '
+            f'src="{_card_image_url(stem)}"></a></td></tr><tr><th>Rarity</th><td>{rarity.title()}</td></tr>'
+            f'{rows}</table>'
+            + FILLER * filler +
+            f'<table class="navbox"><tr>{navbox}</tr></table>'
+            '<table class="wikitable"><tr><td>Common</td><td>Rare</td></tr></table>'
+            '</body></html>')
+
+
+def make_villager_list_page(villagers=400, filler=1000):
+    """Synthetic villager list: one sortable table with a poster per villager"""
+    rows = []
+    for i in range(villagers):
+        poster = (f'https://static.wikia.nocookie.net/animalcrossing/images/{i % 10}/{i:02x}/'
+                  f'NH-Villager{i}_poster.png/revision/latest/scale-to-width-down/100?cb=20200522013249')
+        # The first rows load eagerly, the rest lazily through data-src
+        img = (f'<img src="{poster}" alt="Villager{i}">' if i < 8 else
+               f'<img src="{LAZY_GIF}" data-src="{poster}" alt="Villager{i}" class="lazyload">')
+        rows.append(f'<tr><td><a href="/wiki/Villager{i}">Villager{i}</a></td>'
+                    f'<td><a class="image">{img}</a></td><td>Species</td><td>Normal</td></tr>')
+    return ('<!DOCTYPE html><html><head><title>Villager list</title></head><body>'
+            '<div class="page-header"><img src="https://static.wikia.nocookie.net/logo.png"></div>'
+            + FILLER * filler +
+            '<table class="article-table sortable"><tr><th>Name</th><th>Image</th><th>Species</th>'
+            '<th>Personality</th></tr>' + ''.join(rows) + '</table>'
+            + FILLER * filler +
+            '<table class="navbox"><tr><td><img src="https://static.wikia.nocookie.net/nav.png">'
+            '</td></tr></table></body></html>')
+
+
+class WikiFixtureServer:
+    """Serve /wiki/<name> on a background thread.
+
+    latency delays every response; error_rate answers that fraction of
+    requests with a 429 or 503 so the scraper's retries are exercised.
+    Pages carry an ETag and If-None-Match is answered with a 304.
+    """
+
+    def __init__(self, pages_dir=None, latency=0.0, error_rate=0.0, seed=0, host='127.0.0.1'):
+        self.pages_dir = pages_dir
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests_served = 0
+        self.errors_served = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(server.latency)
+                with server._lock:
+                    server.requests_served += 1
+                    fail = server._random.random() < server.error_rate
+                    if fail:
+                        server.errors_served += 1
+                if fail:
+                    status = server._random.choice([429, 503])
+                    self.send_response(status)
+                    self.send_header('Retry-After', '0')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body = server.page(unquote(self.path.split('?', 1)[0]))
+                if body is None:
+                    self.send_error(404)
+                    return
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def page(self, path):
+        if not path.startswith('/wiki/'):
+            return None
+        name = path[len('/wiki/'):]
+        if self.pages_dir:
+            file_path = os.path.join(self.pages_dir, f'{name}.html')
+            if not os.path.exists(file_path):
+                return None
+            with open(file_path, 'rb') as f:
+                return f.read()
+        if name.startswith('Villager_list'):
+            return make_villager_list_page().encode('utf-8')
+        from doordecks.scrape_clash import RARITY_MAPPING
+        return make_card_page(name, RARITY_MAPPING.get(name, 'common')).encode('utf-8')
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def save_pages(pages_dir):
+    """Download the real card pages and villager list once so they can be served offline"""
+    import requests
+    from doordecks.scrape_clash import BASE_URL, CARD_NAMES
+    from doordecks import scrape_villagers
+    os.makedirs(pages_dir, exist_ok=True)
+    pages = {card_name: f'{BASE_URL}/wiki/{card_name}' for card_name in CARD_NAMES}
+    pages[scrape_villagers.url.rsplit('/', 1)[-1]] = scrape_villagers.url
+    for card_name, page_url in pages.items():
+        response = requests.get(page_url)
+        response.raise_for_status()
+        with open(os.path.join(pages_dir, f'{card_name}.html'), 'wb') as f:
+            f.write(response.content)
+        print(f'Saved {card_name}')
+        time.sleep(0.5)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--save', metavar='DIR', required=True, help='directory to save pages into')
+    save_pages(parser.parse_args().save)
@@ -0,0 +1,8 @@
+"""Door deck generators for resident rosters.
+
+Importing the package is free of side effects and loads nothing heavy; each
+theme lives in its own module (doordecks.clash, doordecks.villager) and the
+`doordecks` command imports only what the chosen subcommand needs.
+"""
+
+__version__ = '0.1.0'
@@ -0,0 +1,3 @@
+from doordecks.cli import main
+
+main()
@@ -0,0 +1,144 @@
+"""Batch builds: one deck per hall roster, `doordecks batch <theme> <rosters>`.
+
+Every roster is read first and the images of every hall are planned into
+one fetch stage, so each distinct image is downloaded and resampled once
+for the whole campus, over one pooled HTTP session, into the shared image
+cache. Halls are then built in a process pool whose workers load the
+theme's data once and keep the image cache, card templates, palettes and
+fitted text sizes warm from one hall to the next.
+"""
+import os
+import glob
+import time
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from doordecks.image_cache import ImageCache, DEFAULT_CACHE_DIR
+from doordecks.pipeline import DEFAULT_FETCH_WORKERS, normalize_images
+from doordecks.roster import iter_residents
+from doordecks.themes import load_theme
+from doordecks.tracing import span
+
+DEFAULT_OUTPUT_DIR = 'decks'
+# Roster files are usually named residents_<hall>.csv
+ROSTER_PREFIX = 'residents_'
+
+
+def find_rosters(sources):
+    """Roster CSVs from directories (every *.csv in them), globs and plain paths, in order"""
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            matches = sorted(glob.glob(os.path.join(source, '*.csv')))
+        else:
+            matches = sorted(glob.glob(source))
+        if not matches:
+            print(f"No roster CSVs match {source}")
+        paths += matches
+    return list(dict.fromkeys(paths))
+
+
+def hall_name(roster_path):
+    """Hall a roster belongs to, from its file name ('rosters/residents_moore.csv' -> 'moore')"""
+    name = os.path.splitext(os.path.basename(roster_path))[0]
+    return name.removeprefix(ROSTER_PREFIX) or name
+
+
+# Per-process state of the build workers, set up by _init_worker
+_worker = None
+
+
+def _init_worker(theme, data, cache_dir):
+    """Worker: import the theme and hold its data, the image cache and templates"""
+    global _worker
+    _worker = {'renderer': load_theme(theme), 'data': data, 'cache': ImageCache(cache_dir),
+               'templates': {}}
+
+
+def _build_hall(residents, save_path, paths_csv, log_path, options):
+    """Worker: build one hall's deck, logging its output to log_path; returns the build time"""
+    start = time.perf_counter()
+    with open(log_path, 'w') as log, contextlib.redirect_stdout(log):
+        _worker['renderer'].render(residents, _worker['data'], cache=_worker['cache'],
+                                   save_path=save_path, paths_csv=paths_csv,
+                                   templates=_worker['templates'], **options)
+    for template in _worker['templates'].values():
+        template.release()
+    return time.perf_counter() - start
+
+
+def _read_halls(roster_paths):
+    """Hall name -> residents of every readable roster"""
+    halls = {}
+    for path in roster_paths:
+        hall = hall_name(path)
+        if hall in halls:
+            raise ValueError(f"Two rosters are named for hall {hall!r}; rename one of them")
+        try:
+            halls[hall] = list(iter_residents(path))
+        except KeyError as e:
+            print(f"Skipping {path}: roster is missing column {e}")
+    return halls
+
+
+def build_batch(theme, rosters, data, output_dir=DEFAULT_OUTPUT_DIR, cache_dir=DEFAULT_CACHE_DIR,
+                processes=None, fetch_workers=DEFAULT_FETCH_WORKERS, **options):
+    """Build a deck for every hall roster and print a time summary per hall.
+
+    rosters is a list of roster CSVs, directories of them or globs (see
+    find_rosters); each hall is named after its file (see hall_name). Decks
+    go to output_dir as <hall>.pptx, with <hall>_image_paths.csv and the
+    build output in <hall>.log. Extra options are passed to the theme's
+    renderer. Returns a map from hall to deck path, without the halls whose
+    build failed.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    renderer = load_theme(theme)
+    os.makedirs(output_dir, exist_ok=True)
+    halls = _read_halls(find_rosters(rosters))
+    if not halls:
+        print("No rosters to build")
+        return {}
+
+    start = time.perf_counter()
+    cache = ImageCache(cache_dir)
+    image_requests = []
+    for residents in halls.values():
+        image_requests += renderer.image_requests(residents, data, **options)
+    with span('fetch_stage', images=len(image_requests)), requests.Session() as session:
+        adapter = HTTPAdapter(pool_connections=fetch_workers, pool_maxsize=fetch_workers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        normalized = normalize_images(image_requests, cache, session, fetch_workers)
+    cache.flush()
+    fetch_seconds = time.perf_counter() - start
+    print(f"Fetched {len(normalized)} distinct images for {len(image_requests)} cards "
+          f"in {len(halls)} halls ({cache.misses} downloaded) in {fetch_seconds:.1f} s")
+
+    decks, times = {}, {}
+    with ProcessPoolExecutor(processes, initializer=_init_worker,
+                             initargs=(theme, data, cache_dir)) as executor:
+        futures = {}
+        for hall, residents in halls.items():
+            save_path = os.path.join(output_dir, f'{hall}.pptx')
+            futures[hall] = (save_path, executor.submit(
+                _build_hall, residents, save_path,
+                os.path.join(output_dir, f'{hall}_image_paths.csv'),
+                os.path.join(output_dir, f'{hall}.log'), options))
+        for hall, (save_path, future) in futures.items():
+            try:
+                times[hall] = future.result()
+                decks[hall] = save_path
+            except Exception as e:
+                print(f"Error building {hall}: {e}")
+
+    lines = [f'{"hall":24s} {"residents":>9s} {"slides":>7s} {"time":>9s}']
+    for hall, residents in halls.items():
+        seconds = f'{times[hall]:7.2f} s' if hall in times else '   failed'
+        lines.append(f'{hall:24s} {len(residents):9d} {-(-len(residents) // 3):7d} {seconds}')
+    lines.append(f'{"fetch stage":42s} {fetch_seconds:7.2f} s')
+    lines.append(f'{"total":42s} {time.perf_counter() - start:7.2f} s')
+    print('\n'.join(lines))
+    print(f"Built {len(decks)} of {len(halls)} hall decks in {output_dir}")
+    return decks
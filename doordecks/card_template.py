@@ -0,0 +1,140 @@
+import os
+import copy
+from io import BytesIO
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+
+# 1x1 white PNG used as a stand-in while a template card is being drawn
+_PLACEHOLDER_PNG = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010802000000'
+    '907753de0000000c49444154789c63f8ffff3f0005fe02fe0def46b800'
+    '00000049454e44ae426082')
+
+
+def placeholder_image():
+    """Image stream for the pictures that a template replaces per resident"""
+    return BytesIO(_PLACEHOLDER_PNG)
+
+
+class ImageStream(BytesIO):
+    """Encoded image held in memory, standing in for an image file.
+
+    name plays the part of the file path: CardTemplate embeds each name once
+    and uses it as the picture description, so identical images should share
+    a name.
+    """
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+class CardTemplate:
+    """A fully styled card captured once as XML and stamped per resident.
+
+    build(slide) draws a single card at column 0 of a scratch slide, using the
+    literal placeholder strings (e.g. '{name}') as text and naming every
+    picture that changes per resident after one of image_roles. stamp() then
+    deep-copies the captured shapes onto a real slide, shifts them
+    horizontally, renumbers their ids, replaces placeholder text runs and
+    points the role pictures at the resident's images. Pictures that are not
+    roles (icons) are re-embedded from the template's own image parts.
+    """
+
+    def __init__(self, build, image_roles=()):
+        prs = Presentation()
+        slide = prs.slides.add_slide(prs.slide_layouts[6])  # Blank slide
+        sp_tree = slide.shapes._spTree
+        existing = len(sp_tree)
+        build(slide)
+
+        self.image_roles = set(image_roles)
+        self._elements = [copy.deepcopy(el) for el in list(sp_tree)[existing:]
+                          if el.tag != qn('p:extLst')]
+        # Blobs of the static pictures keyed by their template rId
+        self._static_blobs = {}
+        for el in self._elements:
+            for blip in el.iter(qn('a:blip')):
+                r_id = blip.get(qn('r:embed'))
+                if _picture_name(el) not in self.image_roles and r_id:
+                    self._static_blobs[r_id] = slide.part.related_part(r_id).blob
+        # Image parts already embedded in the destination deck, keyed by image
+        self._image_parts = {}
+
+    def stamp(self, slide, dx, texts, images, sizes=None):
+        """Add one card to slide, shifted right by dx EMU.
+
+        texts maps placeholder strings to their replacement, images maps image
+        roles to an image file or stream; pictures whose role has no image are
+        dropped. sizes optionally maps placeholder strings to the font size,
+        in points, of the paragraph that holds them.
+        """
+        sp_tree = slide.shapes._spTree
+        next_id = max((int(el.get('id')) for el in sp_tree.iter(qn('p:cNvPr'))), default=1) + 1
+
+        for template_el in self._elements:
+            role = _picture_name(template_el)
+            if role in self.image_roles and not images.get(role):
+                continue
+            el = copy.deepcopy(template_el)
+
+            for off in el.iter(qn('a:off')):
+                off.set('x', str(int(off.get('x')) + dx))
+            for c_nv_pr in el.iter(qn('p:cNvPr')):
+                c_nv_pr.set('id', str(next_id))
+                next_id += 1
+                if role in self.image_roles and _image_name(images[role]):
+                    # python-pptx describes pictures by their source filename
+                    c_nv_pr.set('descr', os.path.basename(_image_name(images[role])))
+            for t in el.iter(qn('a:t')):
+                if sizes and t.text in sizes:
+                    # Paragraph fonts live in a:pPr/a:defRPr, in hundredths of a point
+                    paragraph = t.getparent().getparent()
+                    default_run = paragraph.get_or_add_pPr().get_or_add_defRPr()
+                    default_run.set('sz', str(round(sizes[t.text] * 100)))
+                if t.text in texts:
+                    t.text = texts[t.text]
+            for blip in el.iter(qn('a:blip')):
+                if role in self.image_roles:
+                    image = images[role]
+                    key = _image_name(image)
+                else:
+                    key = ('static', blip.get(qn('r:embed')))
+                    image = BytesIO(self._static_blobs[key[1]])
+                blip.set(qn('r:embed'), self._image_rid(slide, key, image))
+
+            sp_tree.insert_element_before(el, 'p:extLst')
+
+    def release(self):
+        """Forget the image parts of the deck stamped last, so a saved deck can be freed"""
+        self._image_parts.clear()
+
+    def _image_rid(self, slide, key, image):
+        """Relate slide to the image, reusing the part embedded for key before.
+
+        python-pptx's get_or_add_image_part scans every image part in the deck
+        to deduplicate, which grows with deck size; known images are related
+        directly instead.
+        """
+        part = self._image_parts.get(key) if key is not None else None
+        if part is not None and part.package is slide.part.package:
+            return slide.part.relate_to(part, RT.IMAGE)
+        if hasattr(image, 'seek'):
+            image.seek(0)
+        part, r_id = slide.part.get_or_add_image_part(image)
+        if key is not None:
+            self._image_parts[key] = part
+        return r_id
+
+
+def _image_name(image):
+    """File path of an image, the name of an ImageStream, or None for other streams"""
+    return image if isinstance(image, str) else getattr(image, 'name', None)
+
+
+def _picture_name(el):
+    """Shape name of a p:pic element, or None for any other shape"""
+    if el.tag != qn('p:pic'):
+        return None
+    return el.find(qn('p:nvPicPr')).find(qn('p:cNvPr')).get('name')
@@ -0,0 +1,723 @@
+import os
+import copy
+import json
+import hashlib
+import functools
+import threading
+from typing import NamedTuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from PIL import Image
+from io import BytesIO
+from pptx import Presentation
+from pptx.util import Inches, Pt
+from pptx.dml.color import RGBColor
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.enum.text import PP_ALIGN
+from doordecks.image_cache import ImageCache, atomic_write
+from doordecks.memory import decode_slot
+from doordecks.package_writer import save_deck
+from doordecks.text_fit import fit_font_size
+from doordecks.card_template import CardTemplate, ImageStream, placeholder_image
+from doordecks.roster import PathsWriter, chunked, iter_residents, read_ahead
+from doordecks.tracing import count, span
+from doordecks.normalize import (DEFAULT_PRINT_DPI, normalize_image, normalized_image_data,
+                                 placeholder_pixels)
+# Clash Royale card rarity colors
+CARD_COLORS = {
+    'common': {'primary': RGBColor(169, 169, 169), 'secondary': RGBColor(211, 211, 211)},
+    'rare': {'primary': RGBColor(255, 140, 0), 'secondary': RGBColor(255, 165, 0)},
+    'epic': {'primary': RGBColor(128, 0, 128), 'secondary': RGBColor(153, 50, 204)},
+    'legendary': {'primary': RGBColor(255, 215, 0), 'secondary': RGBColor(255, 255, 0)},
+    'champion': {'primary': RGBColor(255, 255, 0), 'secondary': RGBColor(255, 215, 0)}
+}
+
+# Pixel size of the rendered card gradient (2.6" x 5.8" at 100 px per inch)
+CARD_WIDTH_PX = 260
+CARD_HEIGHT_PX = 580
+
+# Card picture box inside the inner card area, in inches
+CARD_IMAGE_INCHES = (2.1, 1.9)
+# Card columns: (left edge of column 0, column pitch, card width), in inches
+CARD_COLUMNS = (0.8, 3, 2.6)
+# (top, height) of the cards, in inches
+CARD_ROW = (0.8, 5.8)
+# Name and room text: (font, largest size in points, text box width in inches)
+NAME_TEXT = ('Impact', 18, CARD_COLUMNS[2] - 0.2)
+ROOM_TEXT = ('Impact', 16, CARD_COLUMNS[2] - 0.2)
+# Card images are flattened onto white, as on the printed card
+WHITE = (255, 255, 255)
+
+# Number of concurrent downloads used by the prefetch stage
+DEFAULT_PREFETCH_WORKERS = 8
+
+DEFAULT_OUTPUT = 'Clash_Royale_Door_Decks.pptx'
+DEFAULT_PATHS_CSV = 'clash_royale_image_paths.csv'
+DEFAULT_DATA_FILE = 'clash_royale_card_data.json'
+
+
+# Colors closer than this on every channel count as the same dominant color
+COLOR_DISTANCE_THRESHOLD = 50
+DEFAULT_DOMINANT_COLORS = [(100, 150, 200), (150, 100, 200), (200, 100, 150)]
+
+# Dominant colors memoized by (image content hash, num_colors)
+_dominant_color_cache = {}
+_dominant_color_lock = threading.Lock()
+
+
+def _rank_dominant_colors(pixels, num_colors):
+    """Pick the most common, mutually distinct colors from an (N, 3) uint8 array"""
+    # Quantize to 8 levels per channel so each pixel falls into one of 512 bins
+    bins = ((pixels[:, 0] >> 5).astype(np.int32) << 6) | (
+        (pixels[:, 1] >> 5).astype(np.int32) << 3) | (pixels[:, 2] >> 5)
+    counts = np.bincount(bins, minlength=512)
+    occupied = np.flatnonzero(counts)
+    # Mean color of every occupied bin, ordered by how many pixels fell in it
+    means = np.stack([
+        np.bincount(bins, weights=pixels[:, c], minlength=512)[occupied]
+        for c in range(3)
+    ], axis=1) / counts[occupied, None]
+    means = means[np.argsort(-counts[occupied], kind='stable')]
+
+    chosen = []
+    for color in np.rint(means).astype(int):
+        if all(np.any(np.abs(color - existing) >= COLOR_DISTANCE_THRESHOLD) for existing in chosen):
+            chosen.append(color)
+            if len(chosen) == num_colors:
+                break
+    return [tuple(int(c) for c in color) for color in chosen]
+
+
+def extract_dominant_colors(image_path, num_colors=3):
+    """Extract the most common distinct colors of an image file, memoized by content"""
+    try:
+        with open(image_path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        print(f"Error extracting colors: {e}")
+        return [RGBColor(*c) for c in DEFAULT_DOMINANT_COLORS]
+    return image_dominant_colors(data, num_colors)
+
+
+def image_dominant_colors(data, num_colors=3):
+    """Extract the most common distinct colors of encoded image bytes, memoized by content"""
+    try:
+        key = (hashlib.sha1(data).hexdigest(), num_colors)
+        with _dominant_color_lock:
+            colors = _dominant_color_cache.get(key)
+
+        if colors is None:
+            with decode_slot(), Image.open(BytesIO(data)) as image:
+                # Let the JPEG decoder downscale while decoding (no-op for other formats)
+                image.draft('RGB', (100, 100))
+                with image.convert('RGB').resize((50, 50)) as small:
+                    pixels = np.asarray(small, dtype=np.uint8).reshape(-1, 3)
+            colors = _rank_dominant_colors(pixels, num_colors)
+
+            # Fill with default colors if not enough unique colors found
+            while len(colors) < num_colors:
+                colors.append((100 + len(colors) * 50, 150, 200))
+            with _dominant_color_lock:
+                _dominant_color_cache[key] = colors
+
+        return [RGBColor(*c) for c in colors]
+    except Exception as e:
+        print(f"Error extracting colors: {e}")
+        # Return default gradient colors
+        return [RGBColor(*c) for c in DEFAULT_DOMINANT_COLORS]
+
+
+def create_gradient_background(width, height, rgb_colors):
+    """Create a vertical gradient background image using RGB color tuples"""
+    # Convert RGBColor objects (tuple subclasses) to plain tuples
+    colors = [tuple(int(c) for c in color[:3]) for color in rgb_colors]
+
+    if len(colors) < 2:
+        colors = [(100, 100, 100), (200, 200, 200)]
+
+    # Blend the two neighbouring color stops for every row at once
+    stops = np.array(colors, dtype=np.float64)
+    section = np.arange(height) / height * (len(colors) - 1)
+    color1_idx = section.astype(np.intp)
+    color2_idx = np.minimum(color1_idx + 1, len(colors) - 1)
+    ratio = (section - color1_idx)[:, None]
+    rows = (stops[color1_idx] * (1 - ratio) +
+            stops[color2_idx] * ratio).astype(np.uint8)
+
+    # Every row is a single color, so broadcast it across the width
+    pixels = np.ascontiguousarray(
+        np.broadcast_to(rows[:, None, :], (height, width, 3)))
+    return Image.fromarray(pixels, 'RGB')
+
+
+def _gradient_key(rgb_colors):
+    return tuple(tuple(int(c) for c in color[:3]) for color in rgb_colors)
+
+
+def _gradient_filename(width, height, colors):
+    return f"gradient_{width}x{height}_{'-'.join('%02x%02x%02x' % c for c in colors)}.png"
+
+
+@functools.lru_cache(maxsize=None)
+def _gradient_background_png(width, height, colors):
+    with span('gradient_render', colors=_gradient_filename(width, height, colors)):
+        buffer = BytesIO()
+        with create_gradient_background(width, height, colors) as image:
+            image.save(buffer, 'PNG')
+        return buffer.getvalue()
+
+
+@functools.lru_cache(maxsize=None)
+def _gradient_background_path(folder_path, width, height, colors):
+    filename = os.path.join(folder_path, _gradient_filename(width, height, colors))
+    if not os.path.exists(filename):
+        atomic_write(filename, _gradient_background_png(width, height, colors))
+    return filename
+
+
+def gradient_background_path(folder_path, width, height, rgb_colors):
+    """Render a gradient once per (size, color stops) and return its PNG file.
+
+    Renders are cached in memory for this process and on disk across runs; the
+    PNG encoding is deterministic, so a given key always yields the same bytes.
+    """
+    return _gradient_background_path(folder_path, width, height, _gradient_key(rgb_colors))
+
+
+def gradient_background_stream(width, height, rgb_colors):
+    """Render a gradient once per (size, color stops) and return it as an ImageStream"""
+    colors = _gradient_key(rgb_colors)
+    return ImageStream(_gradient_background_png(width, height, colors),
+                       _gradient_filename(width, height, colors))
+
+
+def apply_gradient_fill(fill, rgb_colors):
+    """Fill a shape with a native top-to-bottom linear gradient through rgb_colors"""
+    colors = [RGBColor(*color[:3]) for color in rgb_colors]
+    if len(colors) < 2:
+        colors = [RGBColor(100, 100, 100), RGBColor(200, 200, 200)]
+
+    fill.gradient()
+    # python-pptx angles run counter-clockwise from left-to-right
+    fill.gradient_angle = 270
+
+    # The default gradient has two stops; clone or drop stops to match the colors
+    gs_lst = fill.gradient_stops._gsLst
+    while len(gs_lst) < len(colors):
+        gs_lst.append(copy.deepcopy(gs_lst[-1]))
+    while len(gs_lst) > len(colors):
+        gs_lst.remove(gs_lst[-1])
+
+    for i, (stop, color) in enumerate(zip(fill.gradient_stops, colors)):
+        stop.position = i / (len(colors) - 1)
+        stop.color.rgb = color
+
+
+def create_session(pool_size=DEFAULT_PREFETCH_WORKERS):
+    """Create a requests session whose connection pool fits pool_size workers"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def fetch_and_save_image(image_url, image_filename, session=None, cache=None, size=None):
+    """Fetch and save card image, resampled for a placeholder of size pixels.
+
+    Transparency is flattened onto white. With a cache the resampled image is
+    kept there too, so later builds skip decoding and resampling.
+    """
+    try:
+        with span('fetch', url=image_url):
+            if cache is not None:
+                _, data = normalized_image_data(cache, image_url, size, WHITE, session)
+            else:
+                response = (session or requests).get(image_url)
+                response.raise_for_status()
+                count('bytes_downloaded', len(response.content))
+                with decode_slot(), Image.open(BytesIO(response.content)) as image:
+                    data, _ = normalize_image(image, size, WHITE)
+
+            # Save the image locally; written atomically because parallel
+            # builds may save the same card at the same time
+            atomic_write(image_filename, data)
+            return image_filename
+    except Exception as e:
+        print(f"Error fetching image: {e}")
+        return None
+
+
+class CardImage(NamedTuple):
+    """A card image resampled for its picture box and held in memory"""
+    path: str  # normalized file in the image cache
+    data: bytes
+    colors: list
+
+
+def fetch_card_image(image_url, session=None, cache=None, size=None):
+    """Fetch a card image into memory along with its dominant colors.
+
+    Like fetch_and_save_image, but nothing is written outside the image cache:
+    the resampled bytes are decoded once here for the colors and embedded
+    straight from memory. Returns a CardImage, or None if the fetch failed.
+    """
+    try:
+        with span('fetch', url=image_url):
+            path, data = normalized_image_data(cache, image_url, size, WHITE, session)
+        with span('colors', url=image_url):
+            colors = image_dominant_colors(data)
+        return CardImage(path, data, colors)
+    except Exception as e:
+        print(f"Error fetching image: {e}")
+        return None
+
+
+def resolve_card(card_data, index):
+    """Pick the card assigned to the resident at index"""
+    return card_data[index % len(card_data)] if index < len(
+        card_data) else card_data[0]
+
+
+def card_image_path(folder_path, image_url):
+    """Local file used for a card image URL, shared by every resident holding that card"""
+    digest = hashlib.sha1(image_url.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(folder_path, f'{digest}_card.jpg')
+
+
+def card_image_size(dpi=DEFAULT_PRINT_DPI):
+    """Pixel size card images are resampled to, or None to keep their resolution"""
+    return placeholder_pixels(*CARD_IMAGE_INCHES, dpi) if dpi else None
+
+
+def prefetch_card_images(image_urls, folder_path, max_workers=DEFAULT_PREFETCH_WORKERS, session=None, cache=None,
+                         size=None, in_memory=False):
+    """Download every distinct card image concurrently.
+
+    Returns a map from image URL to local file, with None for downloads that
+    failed. With in_memory the images are only normalized into the cache and
+    the map points at the cached files; nothing is saved to folder_path.
+    """
+    if not in_memory:
+        os.makedirs(folder_path, exist_ok=True)
+    unique_urls = list(dict.fromkeys(image_urls))
+    if not unique_urls:
+        return {}
+
+    owns_session = session is None
+    if owns_session:
+        session = create_session(max_workers)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            if in_memory:
+                futures = {url: executor.submit(fetch_card_image, url, session, cache, size)
+                           for url in unique_urls}
+                cards = {url: future.result() for url, future in futures.items()}
+                return {url: card and card.path for url, card in cards.items()}
+            futures = {
+                url: executor.submit(fetch_and_save_image, url,
+                                     card_image_path(folder_path, url), session, cache, size)
+                for url in unique_urls
+            }
+            return {url: future.result() for url, future in futures.items()}
+    finally:
+        if owns_session:
+            session.close()
+
+
+def card_text_sizes(name, room, fit_text=False):
+    """Point sizes of a card's name and room; with fit_text, shrunk to fit their boxes"""
+    if not fit_text:
+        return NAME_TEXT[1], ROOM_TEXT[1]
+    return (fit_font_size(str(name), *NAME_TEXT, bold=True),
+            fit_font_size(f"{room}", *ROOM_TEXT, bold=True))
+
+
+def add_clash_card(slide, column, name, room, rarity, card_image=None, gradient_image=None, gradient_colors=None,
+                   name_pt=NAME_TEXT[1], room_pt=ROOM_TEXT[1]):
+    """Draw one resident card in the given column (0-2) of a slide.
+
+    gradient_image is embedded behind the card; gradient_colors instead fill
+    the card shape with a native gradient. Pictures that change per resident
+    are named after their role ('gradient', 'card_image') so the card can be
+    captured as a CardTemplate.
+    """
+    colors = CARD_COLORS[rarity]
+
+    left = Inches(CARD_COLUMNS[0] + column * CARD_COLUMNS[1])
+    top = Inches(CARD_ROW[0])
+    width = Inches(CARD_COLUMNS[2])
+    height = Inches(CARD_ROW[1])
+
+    if gradient_image:
+        # Add gradient background to card
+        try:
+            gradient_picture = slide.shapes.add_picture(
+                gradient_image,
+                left, top, width, height
+            )
+            gradient_picture.name = 'gradient'
+        except Exception as e:
+            print(f"Error adding gradient background: {e}")
+
+    # Create card-style shape with rarity colors
+    card_shape = slide.shapes.add_shape(
+        MSO_SHAPE.ROUNDED_RECTANGLE,
+        left, top, width, height
+    )
+    if gradient_colors:
+        apply_gradient_fill(card_shape.fill, gradient_colors)
+    else:
+        card_shape.fill.solid()
+        card_shape.fill.fore_color.rgb = colors['primary']
+    card_shape.line.color.rgb = RGBColor(
+        255, 255, 255)  # White border
+    card_shape.line.width = Pt(3)
+
+    # Add Elixir.png icon in top left corner
+    try:
+        elixir_left = Inches(left.inches + 0.1)
+        elixir_top = Inches(top.inches + 0.1)
+        elixir_width = Inches(0.6)
+        elixir_height = Inches(0.6)
+
+        slide.shapes.add_picture(
+            'Elixir.png', elixir_left, elixir_top, elixir_width, elixir_height)
+    except Exception as e:
+        print(f"Error adding Elixir.png: {e}")
+
+    # Add inner card area
+    inner_left = Inches(left.inches + 0.1)
+    inner_top = Inches(top.inches + 0.8)
+    inner_width = Inches(width.inches - 0.2)
+    inner_height = Inches(2.2)
+
+    inner_shape = slide.shapes.add_shape(
+        MSO_SHAPE.ROUNDED_RECTANGLE,
+        inner_left, inner_top, inner_width, inner_height
+    )
+    inner_shape.fill.solid()
+    inner_shape.fill.fore_color.rgb = RGBColor(
+        240, 240, 240)  # Light gray
+    inner_shape.line.color.rgb = RGBColor(
+        200, 200, 200)  # Gray border
+    inner_shape.line.width = Pt(2)
+
+    # Add card image if available
+    if card_image:
+        try:
+            card_picture = slide.shapes.add_picture(
+                card_image,
+                Inches(inner_left.inches + 0.15),
+                Inches(inner_top.inches + 0.15),
+                width=Inches(inner_width.inches - 0.3),
+                height=Inches(inner_height.inches - 0.3),
+            )
+            card_picture.name = 'card_image'
+        except Exception as e:
+            print(f"Error adding image for {name}: {e}")
+
+    # Add name with Clash Royale style font
+    name_top = Inches(top.inches + 3.2)
+    name_textbox = slide.shapes.add_textbox(
+        Inches(
+            left.inches + 0.1), name_top, Inches(width.inches - 0.2), Inches(0.8)
+    )
+    name_textframe = name_textbox.text_frame
+    name_textframe.text = name
+    name_textframe.paragraphs[0].alignment = PP_ALIGN.CENTER
+
+    # Clash Royale style font (bold, prominent)
+    name_font = name_textframe.paragraphs[0].font
+    name_font.name = 'Impact'  # Bold, game-like font
+    name_font.size = Pt(name_pt)
+    name_font.bold = True
+    name_font.color.rgb = RGBColor(255, 255, 255)  # White text
+
+    # Add room number text (simple text display)
+    room_textbox = slide.shapes.add_textbox(
+        Inches(left.inches + 0.1), Inches(top.inches + 4.2),
+        Inches(width.inches - 0.2), Inches(0.6)
+    )
+    room_textframe = room_textbox.text_frame
+    room_textframe.text = f"{room}"
+    room_textframe.paragraphs[0].alignment = PP_ALIGN.CENTER
+
+    room_font = room_textframe.paragraphs[0].font
+    room_font.name = 'Impact'
+    room_font.size = Pt(room_pt)
+    room_font.bold = True
+    room_font.color.rgb = RGBColor(255, 255, 255)  # White text
+
+    # Add rarity indicator
+    rarity_textbox = slide.shapes.add_textbox(
+        Inches(left.inches + 0.1), Inches(top.inches + 5.2),
+        Inches(width.inches - 0.2), Inches(0.4)
+    )
+
+    rarity_textframe = rarity_textbox.text_frame
+    rarity_textframe.text = rarity.upper()
+    rarity_textframe.paragraphs[0].alignment = PP_ALIGN.CENTER
+
+    rarity_font = rarity_textframe.paragraphs[0].font
+    rarity_font.name = 'Impact'
+    rarity_font.size = Pt(10)
+    rarity_font.bold = True
+    rarity_font.color.rgb = colors['secondary']
+
+
+def raster_clash_card(canvas, column, name, room, rarity, card_image=None, gradient_colors=None,
+                      native_gradient=False, name_pt=NAME_TEXT[1], room_pt=ROOM_TEXT[1]):
+    """Paint one resident card onto a raster Canvas, as add_clash_card draws it"""
+    colors = CARD_COLORS[rarity]
+    left = CARD_COLUMNS[0] + column * CARD_COLUMNS[1]
+    top, height = CARD_ROW
+    width = CARD_COLUMNS[2]
+
+    gradient = None
+    if gradient_colors:
+        gradient = create_gradient_background(canvas.px(width), canvas.px(height), gradient_colors)
+    if gradient and not native_gradient:
+        canvas.picture(gradient, left, top, width, height)
+    canvas.shape('rounded', left, top, width, height,
+                 fill=gradient if native_gradient and gradient else colors['primary'],
+                 line=(255, 255, 255), line_pt=3)
+    if os.path.exists('Elixir.png'):
+        canvas.picture('Elixir.png', left + 0.1, top + 0.1, 0.6, 0.6)
+
+    inner_left, inner_top, inner_width, inner_height = left + 0.1, top + 0.8, width - 0.2, 2.2
+    canvas.shape('rounded', inner_left, inner_top, inner_width, inner_height,
+                 fill=(240, 240, 240), line=(200, 200, 200), line_pt=2)
+    if card_image:
+        canvas.picture(card_image, inner_left + 0.15, inner_top + 0.15,
+                       inner_width - 0.3, inner_height - 0.3)
+
+    canvas.text(name, left + 0.1, top + 3.2, width - 0.2, 0.8, 'Impact', name_pt, (255, 255, 255),
+                bold=True)
+    canvas.text(f"{room}", left + 0.1, top + 4.2, width - 0.2, 0.6, 'Impact', room_pt, (255, 255, 255),
+                bold=True)
+    canvas.text(rarity.upper(), left + 0.1, top + 5.2, width - 0.2, 0.4, 'Impact', 10,
+                colors['secondary'], bold=True)
+    if gradient:
+        gradient.close()
+
+
+def raster_slide(canvas, residents, card_data, cache, native_gradient=False, fit_text=False,
+                 **options):
+    """Paint a slide of up to three residents onto a raster Canvas"""
+    # Arena background, as in create_clash_royale_presentation
+    canvas.shape('rect', 0.3, 0.3, 9.4, 7, fill=(30, 144, 255), line=(25, 25, 112), line_pt=4)
+    size = card_image_size(canvas.dpi)
+    for column, resident in enumerate(residents):
+        card = resolve_card(card_data, resident.position)
+        card_image = dominant_colors = None
+        try:
+            card_image, data = normalized_image_data(cache, card['image_url'], size, WHITE)
+            dominant_colors = image_dominant_colors(data)
+        except Exception as e:
+            print(f"Error fetching image: {e}")
+        raster_clash_card(canvas, column, resident.name, resident.room, card['rarity'], card_image,
+                          dominant_colors, native_gradient,
+                          *card_text_sizes(resident.name, resident.room, fit_text))
+
+
+def clash_card_template(rarity, has_card_image, has_gradient_image, gradient_colors=None):
+    """CardTemplate for every card that shares these styling inputs"""
+    def build(slide):
+        add_clash_card(
+            slide, 0, '{name}', '{room}', rarity,
+            card_image=placeholder_image() if has_card_image else None,
+            gradient_image=placeholder_image() if has_gradient_image else None,
+            gradient_colors=gradient_colors)
+    return CardTemplate(build, image_roles=('gradient', 'card_image'))
+
+
+def save_image_paths(residents, card_data, card_images, paths_csv=DEFAULT_PATHS_CSV):
+    """Write the resident -> card image mapping CSV"""
+    with PathsWriter(paths_csv, ('Name', 'Path', 'Rarity')) as paths:
+        for resident in iter_residents(residents):
+            paths.write(resident.name,
+                        card_images.get(resolve_card(card_data, resident.position)['image_url']),
+                        card_data[resident.position % len(card_data)]['rarity'])
+
+
+def create_clash_royale_presentation(residents, card_data, max_workers=DEFAULT_PREFETCH_WORKERS, cache=None,
+                                     native_gradient=False, use_templates=True, dpi=DEFAULT_PRINT_DPI,
+                                     in_memory=False, save_path=DEFAULT_OUTPUT,
+                                     paths_csv=DEFAULT_PATHS_CSV, zip_level=None, fit_text=False,
+                                     templates=None):
+    """Create Clash Royale themed presentation.
+
+    residents is a roster CSV path, a DataFrame or an iterable of Resident
+    records; rows are streamed, so only the slide being laid out and a short
+    download read-ahead are held in memory. With native_gradient the card
+    shape itself is filled with a DrawingML gradient through the card's
+    dominant colors, instead of embedding a rendered gradient PNG behind it.
+    With use_templates each distinct card style is built once and cloned per
+    resident; otherwise every card is drawn through add_clash_card. Card
+    images are resampled to their picture box at dpi (None keeps the
+    downloaded resolution). With in_memory card images and gradients are
+    embedded from memory and nothing is written to clash_royale_images; the
+    paths CSV then points at the resampled images in the cache.
+    paths_csv=None skips the image paths CSV. With zip_level the deck is
+    written by doordecks.package_writer, deflating XML at that level and
+    storing media as is. With fit_text long names and rooms are shrunk to
+    fit across their text boxes (see doordecks.text_fit). templates is a
+    dict of card templates to reuse and extend, so a long-running process
+    captures each card style once across builds.
+    """
+    prs = Presentation()
+    folder_path = 'clash_royale_images'
+    if not in_memory:
+        os.makedirs(folder_path, exist_ok=True)
+    if cache is None:
+        cache = ImageCache()
+
+    if templates is None:
+        templates = {}
+    downloads = {}
+    image_size = card_image_size(dpi)
+    session = create_session(max_workers)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def download(resident):
+        """Resolve the resident's card and start its image download, once per URL"""
+        card = resolve_card(card_data, resident.position)
+        url = card['image_url']
+        if url not in downloads and in_memory:
+            downloads[url] = executor.submit(fetch_card_image, url, session, cache, image_size)
+        elif url not in downloads:
+            downloads[url] = executor.submit(fetch_and_save_image, url,
+                                             card_image_path(folder_path, url), session, cache,
+                                             image_size)
+        return card, downloads[url]
+
+    # Card images for upcoming residents download while earlier slides are laid out
+    pending = read_ahead(iter_residents(residents), max_workers * 4, download)
+
+    with session, executor, PathsWriter(paths_csv, ('Name', 'Path', 'Rarity')) as paths:
+        for slide_index, group in enumerate(chunked(pending, 3)):
+            with span('slide', slide=slide_index):
+                slide = prs.slides.add_slide(prs.slide_layouts[5])  # Blank slide
+
+            # Add arena-style background
+            main_left = Inches(0.3)
+            main_top = Inches(0.3)
+            main_width = Inches(9.4)
+            main_height = Inches(7)
+
+            # Create arena background with blue gradient
+            main_shape = slide.shapes.add_shape(
+                MSO_SHAPE.RECTANGLE,
+                main_left, main_top, main_width, main_height
+            )
+            main_shape.fill.solid()
+            main_shape.fill.fore_color.rgb = RGBColor(30, 144, 255)  # Arena blue
+            main_shape.line.color.rgb = RGBColor(25, 25, 112)  # Dark blue border
+            main_shape.line.width = Pt(4)
+
+            # Add up to three residents per slide
+            for j, (resident, (card, image_future)) in enumerate(group):
+                name = resident.name
+                room = resident.room
+                rarity = card['rarity']
+
+                # Card image was downloaded by the read-ahead stage
+                with span('fetch_wait', resident=name, slide=slide_index):
+                    fetched = image_future.result()
+                dominant_colors = None
+                if in_memory:
+                    # Colors were extracted on the download thread
+                    card_image_filename = fetched and fetched.path
+                    card_image = fetched and ImageStream(fetched.data, fetched.path)
+                    dominant_colors = fetched and fetched.colors
+                else:
+                    card_image_filename = card_image = fetched
+                    if card_image_filename:
+                        # Extract dominant colors from the card image
+                        with span('colors', resident=name, slide=slide_index):
+                            dominant_colors = extract_dominant_colors(
+                                card_image_filename)
+                paths.write(name, card_image_filename,
+                            card_data[resident.position % len(card_data)]['rarity'])
+
+                gradient_image = None
+                gradient_colors = None
+                if dominant_colors and native_gradient:
+                    gradient_colors = dominant_colors
+                elif dominant_colors:
+                    # Gradient background, rendered once per distinct palette
+                    with span('gradient', resident=name, slide=slide_index):
+                        if in_memory:
+                            gradient_image = gradient_background_stream(
+                                CARD_WIDTH_PX, CARD_HEIGHT_PX, dominant_colors)
+                        else:
+                            gradient_image = gradient_background_path(
+                                folder_path, CARD_WIDTH_PX, CARD_HEIGHT_PX, dominant_colors)
+
+                count('images_embedded', bool(card_image) + bool(gradient_image))
+                with span('text_fit', resident=name, slide=slide_index):
+                    name_pt, room_pt = card_text_sizes(name, room, fit_text)
+                with span('shapes', resident=name, slide=slide_index):
+                    if not use_templates:
+                        add_clash_card(slide, j, name, room, rarity, card_image,
+                                       gradient_image, gradient_colors, name_pt, room_pt)
+                        continue
+
+                    key = (rarity, bool(card_image), bool(gradient_image),
+                           tuple(gradient_colors) if gradient_colors else None)
+                    if key not in templates:
+                        templates[key] = clash_card_template(*key)
+                    templates[key].stamp(
+                        slide, Inches(j * 3),
+                        {'{name}': str(name), '{room}': f"{room}"},
+                        {'gradient': gradient_image, 'card_image': card_image},
+                        {'{name}': name_pt, '{room}': room_pt} if fit_text else None)
+
+    # Save the presentation
+    save_deck(prs, save_path, zip_level)
+    print(f"Clash Royale presentation created: {save_path}")
+
+    cache.flush()
+    print(f"Image cache: {cache.stats()}")
+
+
+def load_card_data(card_data_file=DEFAULT_DATA_FILE):
+    """Card data written by the scraper, or an empty list if it has not run yet"""
+    try:
+        with open(card_data_file, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print("Please run `doordecks scrape clash` first to generate card data")
+        return []
+
+
+def image_requests(residents, card_data, dpi=DEFAULT_PRINT_DPI, **options):
+    """(url, size, background) of every normalized card image a build will embed"""
+    size = card_image_size(dpi)
+    return [(resolve_card(card_data, resident.position)['image_url'], size, WHITE)
+            for resident in iter_residents(residents)]
+
+
+def card_inputs(card_data, position):
+    """Everything besides name and room that the card at a roster position is drawn from"""
+    card = resolve_card(card_data, position)
+    return [card['image_url'], card['rarity'], card_data[position % len(card_data)]['rarity']]
+
+
+# Theme renderer interface, see doordecks.themes
+render = create_clash_royale_presentation
+load_data = load_card_data
+
+
+def main(roster='residents_moore.csv', card_data_file=DEFAULT_DATA_FILE):
+    card_data = load_card_data(card_data_file)
+
+    # Create the presentation, streaming residents from the roster CSV
+    create_clash_royale_presentation(roster, card_data)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""Command line entry point: `doordecks <command> [options]`.
+
+Only argparse and the standard-library-only doordecks modules (defaults,
+image_cache, themes) are imported at module level. pandas, python-pptx, PIL,
+requests and the scraping libraries are imported inside the command that uses
+them, so `doordecks --help` and the cache commands start without loading any
+of them.
+"""
+import os
+import sys
+import argparse
+
+from doordecks import __version__
+from doordecks.defaults import DEFAULT_PRINT_DPI, DEFAULT_SLIDES_PER_SHARD
+from doordecks.image_cache import DEFAULT_CACHE_DIR
+from doordecks.themes import THEMES
+
+
+def _positive_int(value):
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
+def _non_negative_int(value):
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, got {value}")
+    return number
+
+
+def _format_bytes(n):
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if n < 1024 or unit == 'GiB':
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def cmd_scrape(args):
+    if args.source == 'clash':
+        from doordecks import scrape_clash
+        scrape_clash.main()
+    else:
+        from doordecks import scrape_villagers
+        scrape_villagers.main(args.url or scrape_villagers.url,
+                              args.output or scrape_villagers.output_file)
+
+
+def _build(theme, args, data, fetch_workers=None, **options):
+    """Run a sharded, incremental or memory-bounded build, or return the shared cache for a plain one.
+
+    fetch_workers (concurrent downloads) goes to the fetch stage of a sharded
+    build and to the renderer's max_workers otherwise.
+    """
+    from doordecks.image_cache import ImageCache
+
+    render_options = dict(options, max_workers=fetch_workers) if fetch_workers else options
+    if args.incremental:
+        from doordecks.incremental import build_incremental
+        build_incremental(theme, args.roster, data, args.output, cache=ImageCache(args.cache_dir),
+                          **render_options)
+        return None
+    if args.shard_by:
+        from doordecks.sharding import build_sharded
+        if fetch_workers:
+            options['fetch_workers'] = fetch_workers
+        shard_paths = build_sharded(theme, args.roster, data, by=args.shard_by,
+                                    slides_per_shard=args.slides_per_shard,
+                                    max_workers=args.processes, output_dir=args.shard_dir,
+                                    merge_path=args.output, cache_dir=args.cache_dir, **options)
+        print(f"Built {len(shard_paths)} shards in {args.shard_dir}")
+        return None
+    if args.memory_budget:
+        from doordecks.memory import build_bounded
+        parts = build_bounded(theme, args.roster, data, args.output, args.memory_budget,
+                              cache=ImageCache(args.cache_dir), **render_options)
+        if len(parts) > 1:
+            print(f"Built {len(parts)} parts within {args.memory_budget} MiB: {', '.join(parts)}")
+        return None
+    return ImageCache(args.cache_dir)
+
+
+def cmd_build_clash(args):
+    from doordecks.clash import load_card_data, create_clash_royale_presentation
+
+    card_data = load_card_data(args.cards)
+    cache = _build('clash', args, card_data, fetch_workers=args.workers,
+                   native_gradient=args.native_gradient,
+                   dpi=args.dpi or None, in_memory=args.in_memory, zip_level=args.zip_level,
+                   fit_text=args.fit_text)
+    if cache is not None:
+        create_clash_royale_presentation(args.roster, card_data, max_workers=args.workers,
+                                         cache=cache, native_gradient=args.native_gradient,
+                                         dpi=args.dpi or None, in_memory=args.in_memory,
+                                         save_path=args.output, zip_level=args.zip_level,
+                                         fit_text=args.fit_text)
+
+
+def cmd_build_villager(args):
+    from doordecks.villager import adjust_pptx, load_image_urls
+
+    image_urls = load_image_urls(args.image_urls)
+    cache = _build('villager', args, image_urls, dpi=args.dpi or None, pack=args.pack,
+                   zip_level=args.zip_level, fit_text=args.fit_text)
+    if cache is not None:
+        adjust_pptx(args.roster, image_urls, cache=cache, dpi=args.dpi or None,
+                    save_path=args.output, pack=args.pack, zip_level=args.zip_level,
+                    fit_text=args.fit_text)
+
+
+def cmd_pack_villagers(args):
+    from doordecks.image_cache import ImageCache
+    from doordecks.villager import load_image_urls, pack_villager_images
+
+    pack_villager_images(load_image_urls(args.image_urls), args.output,
+                         cache=ImageCache(args.cache_dir), dpi=args.dpi or None)
+
+
+def cmd_build(args):
+    from doordecks.pipeline import ThemeBuild, build_themes
+    from doordecks.themes import load_theme
+
+    builds = []
+    for theme in dict.fromkeys(args.themes):
+        renderer = load_theme(theme)
+        save_path = None
+        if args.output_dir:
+            save_path = os.path.join(args.output_dir, os.path.basename(renderer.DEFAULT_OUTPUT))
+        builds.append(ThemeBuild(theme, renderer.load_data(), save_path,
+                                 options={'dpi': args.dpi or None, 'zip_level': args.zip_level,
+                                          'fit_text': args.fit_text}))
+    build_themes(args.roster, builds, cache_dir=args.cache_dir, parallel=args.parallel,
+                 max_workers=args.workers)
+
+
+def cmd_export(args):
+    from doordecks.raster import export_prints
+    from doordecks.themes import load_theme
+
+    options = {'native_gradient': True} if args.native_gradient else {}
+    if args.pack:
+        options['pack'] = args.pack
+    if args.fit_text:
+        options['fit_text'] = True
+    export_prints(args.theme, args.roster, load_theme(args.theme).load_data(),
+                  output_dir=args.output_dir, pdf_path=args.pdf, cache_dir=args.cache_dir,
+                  dpi=args.dpi, max_workers=args.processes, **options)
+
+
+def cmd_batch(args):
+    from doordecks.batch import build_batch
+    from doordecks.themes import load_theme
+
+    renderer = load_theme(args.theme)
+    options = {'dpi': args.dpi or None, 'zip_level': args.zip_level, 'fit_text': args.fit_text}
+    if args.native_gradient:
+        options['native_gradient'] = True
+    if args.in_memory:
+        options['in_memory'] = True
+    if args.pack:
+        options['pack'] = args.pack
+    build_batch(args.theme, args.rosters, renderer.load_data(args.data or renderer.DEFAULT_DATA_FILE),
+                output_dir=args.output_dir, cache_dir=args.cache_dir, processes=args.processes,
+                fetch_workers=args.workers, **options)
+
+
+def cmd_serve(args):
+    from doordecks.server import serve
+
+    data_files = {'clash': args.cards, 'villager': args.image_urls}
+    serve(args.host, args.port, args.socket, workers=args.workers, cache_dir=args.cache_dir,
+          data_files={theme: data_files.get(theme) for theme in args.themes or THEMES},
+          prefetch=args.prefetch)
+
+
+def cmd_cache(args):
+    from doordecks.image_cache import ImageCache
+
+    cache = ImageCache(args.cache_dir)
+    if args.action == 'stats':
+        stats = cache.stats()
+        print(f"{args.cache_dir}: {stats['entries']} entries, {_format_bytes(stats['size'])}")
+    elif args.action == 'prune':
+        max_bytes = args.max_mb * 1024 * 1024 if args.max_mb is not None else None
+        freed = cache.prune(max_bytes)
+        print(f"Freed {_format_bytes(freed)}, {_format_bytes(cache.size())} left")
+    else:
+        cache.clear()
+        print(f"Cleared {args.cache_dir}")
+
+
+def _add_build_options(parser, output):
+    parser.add_argument('--roster', default='residents_moore.csv', help='resident CSV')
+    parser.add_argument('--output', default=output, help='deck to write')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--dpi', type=_non_negative_int, default=DEFAULT_PRINT_DPI,
+                        help='print resolution images are resampled to (0 keeps the downloaded size)')
+    parser.add_argument('--trace', metavar='JSON',
+                        help='write a Chrome trace of the build stages and print a summary')
+    parser.add_argument('--zip-level', type=int, choices=range(10), metavar='0-9',
+                        help='save with the fast package writer: store media as is and deflate '
+                             'only the XML, at this level')
+    parser.add_argument('--fit-text', action='store_true',
+                        help='shrink names and rooms that are too wide for their text boxes')
+    parser.add_argument('--incremental', action='store_true',
+                        help='patch only the slides whose residents changed since the last '
+                             'incremental build of --output')
+    parser.add_argument('--memory-budget', type=_positive_int, metavar='MB',
+                        help='keep the build within about MB MiB of RSS by saving --output in '
+                             'numbered parts (deck_part01.pptx, ...) whenever it gets close')
+    parser.add_argument('--memory-report', action='store_true',
+                        help='print the peak RSS and Python heap (tracemalloc) of the build')
+    shards = parser.add_argument_group('sharded build')
+    shards.add_argument('--shard-by', choices=('slides', 'floor', 'building'),
+                        help='render shards in parallel processes and merge them into --output')
+    shards.add_argument('--slides-per-shard', type=_positive_int, default=DEFAULT_SLIDES_PER_SHARD)
+    shards.add_argument('--processes', type=_positive_int, default=None)
+    shards.add_argument('--shard-dir', default='shards')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='doordecks', description='Generate resident door decks')
+    parser.add_argument('--version', action='version', version=f'%(prog)s {__version__}')
+    commands = parser.add_subparsers(dest='command', required=True, metavar='command')
+
+    scrape = commands.add_parser('scrape', help='scrape card or villager image data from the wikis')
+    scrape.add_argument('source', choices=('clash', 'villagers'))
+    scrape.add_argument('--url', help='villager list page (villagers only)')
+    scrape.add_argument('--output', help='JSON file to write (villagers only)')
+    scrape.set_defaults(func=cmd_scrape)
+
+    clash = commands.add_parser('build-clash', help='build the Clash Royale deck')
+    _add_build_options(clash, 'Clash_Royale_Door_Decks.pptx')
+    clash.add_argument('--cards', default='clash_royale_card_data.json', help='scraped card data')
+    clash.add_argument('--workers', type=_positive_int, default=8, help='concurrent image downloads')
+    clash.add_argument('--native-gradient', action='store_true',
+                       help='use DrawingML gradient fills instead of rendered pictures')
+    clash.add_argument('--in-memory', action='store_true',
+                       help='embed images from memory without writing clash_royale_images/')
+    clash.set_defaults(func=cmd_build_clash)
+
+    villager = commands.add_parser('build-villager', help='build the Animal Crossing deck')
+    _add_build_options(villager, 'adjusted_pptx/MAIN_Adjusted_Residents_Presentation.pptx')
+    villager.add_argument('--image-urls', default='villager_image_urls.json',
+                          help='scraped villager image URLs')
+    villager.add_argument('--pack', help='read posters from an image pack made by pack-villagers')
+    villager.set_defaults(func=cmd_build_villager)
+
+    pack = commands.add_parser('pack-villagers',
+                               help='pack every villager poster into one memory-mapped archive')
+    pack.add_argument('--image-urls', default='villager_image_urls.json',
+                      help='scraped villager image URLs')
+    pack.add_argument('--output', default='villager_images.pack', help='pack to write')
+    pack.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    pack.add_argument('--dpi', type=_non_negative_int, default=DEFAULT_PRINT_DPI,
+                      help='print resolution posters are resampled to; builds must use the same')
+    pack.set_defaults(func=cmd_pack_villagers)
+
+    build = commands.add_parser('build', help='build several themed decks in one pass')
+    build.add_argument('themes', nargs='+', choices=sorted(THEMES), metavar='theme',
+                       help=f"themes to build ({', '.join(sorted(THEMES))})")
+    build.add_argument('--roster', default='residents_moore.csv', help='resident CSV')
+    build.add_argument('--output-dir', help="directory for the decks (default: each theme's usual path)")
+    build.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    build.add_argument('--dpi', type=_non_negative_int, default=DEFAULT_PRINT_DPI,
+                       help='print resolution images are resampled to (0 keeps the downloaded size)')
+    build.add_argument('--workers', type=_positive_int, default=8, help='concurrent image downloads')
+    build.add_argument('--parallel', action='store_true', help='render the themes in parallel processes')
+    build.add_argument('--zip-level', type=int, choices=range(10), metavar='0-9',
+                       help='save with the fast package writer at this XML deflate level')
+    build.add_argument('--fit-text', action='store_true',
+                       help='shrink names and rooms that are too wide for their text boxes')
+    build.add_argument('--trace', metavar='JSON',
+                       help='write a Chrome trace of the build stages and print a summary')
+    build.set_defaults(func=cmd_build)
+
+    export = commands.add_parser('export', help='render print-ready card PNGs and a PDF without PowerPoint')
+    export.add_argument('theme', choices=sorted(THEMES))
+    export.add_argument('--roster', default='residents_moore.csv', help='resident CSV')
+    export.add_argument('--output-dir', default='prints', help='directory for the card PNGs')
+    export.add_argument('--pdf', help='PDF to write (default: <output-dir>/<theme>_cards.pdf)')
+    export.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    export.add_argument('--dpi', type=_positive_int, default=DEFAULT_PRINT_DPI, help='resolution of the PNGs and PDF')
+    export.add_argument('--processes', type=_positive_int, default=None, help='render processes (default: CPU count)')
+    export.add_argument('--native-gradient', action='store_true',
+                        help='clash: fill the card shape with the gradient instead of a picture behind it')
+    export.add_argument('--fit-text', action='store_true',
+                        help='shrink names and rooms that are too wide for their text boxes')
+    export.add_argument('--pack', help='villager: read posters from an image pack made by pack-villagers')
+    export.add_argument('--trace', metavar='JSON',
+                        help='write a Chrome trace of the export stages and print a summary')
+    export.set_defaults(func=cmd_export)
+
+    batch = commands.add_parser('batch', help="build a deck for every hall's roster in one run")
+    batch.add_argument('theme', choices=sorted(THEMES))
+    batch.add_argument('rosters', nargs='+', metavar='roster',
+                       help='roster CSVs, directories of them or globs (quote them)')
+    batch.add_argument('--output-dir', default='decks',
+                       help='directory for <hall>.pptx, its image paths CSV and build log')
+    batch.add_argument('--data', help="scraped card data or villager image URLs (default: the theme's)")
+    batch.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    batch.add_argument('--dpi', type=_non_negative_int, default=DEFAULT_PRINT_DPI,
+                       help='print resolution images are resampled to (0 keeps the downloaded size)')
+    batch.add_argument('--workers', type=_positive_int, default=8, help='concurrent image downloads')
+    batch.add_argument('--processes', type=_positive_int, default=None, help='build processes (default: CPU count)')
+    batch.add_argument('--zip-level', type=int, choices=range(10), metavar='0-9',
+                       help='save with the fast package writer at this XML deflate level')
+    batch.add_argument('--fit-text', action='store_true',
+                       help='shrink names and rooms that are too wide for their text boxes')
+    batch.add_argument('--native-gradient', action='store_true',
+                       help='clash: use DrawingML gradient fills instead of rendered pictures')
+    batch.add_argument('--in-memory', action='store_true',
+                       help='clash: embed images from memory without writing clash_royale_images/')
+    batch.add_argument('--pack', help='villager: read posters from an image pack made by pack-villagers')
+    batch.add_argument('--trace', metavar='JSON',
+                       help='write a Chrome trace of the fetch stage and print a summary')
+    batch.set_defaults(func=cmd_batch)
+
+    serve = commands.add_parser('serve', help='keep a warm deck server running for repeated builds')
+    serve.add_argument('themes', nargs='*', choices=sorted(THEMES), metavar='theme',
+                       help='themes to serve (default: all)')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8737)
+    serve.add_argument('--socket', metavar='PATH', help='listen on a Unix socket instead of TCP')
+    serve.add_argument('--workers', type=_positive_int, default=1, help='build processes')
+    serve.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    serve.add_argument('--cards', default='clash_royale_card_data.json', help='scraped card data')
+    serve.add_argument('--image-urls', default='villager_image_urls.json',
+                       help='scraped villager image URLs')
+    serve.add_argument('--prefetch', action='store_true',
+                       help='download and resample every card and villager image before serving')
+    serve.set_defaults(func=cmd_serve)
+
+    cache = commands.add_parser('cache', help='inspect or trim the shared image cache')
+    cache.add_argument('action', choices=('stats', 'prune', 'clear'))
+    cache.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    cache.add_argument('--max-mb', type=int, default=None,
+                       help='size to prune down to (default: the cache limit)')
+    cache.set_defaults(func=cmd_cache)
+    return parser
+
+
+def _run(args):
+    if not getattr(args, 'memory_report', False):
+        args.func(args)
+        return
+
+    from doordecks.memory import MemoryReport
+    with MemoryReport() as report:
+        args.func(args)
+    print(report.summary())
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not getattr(args, 'trace', None):
+        _run(args)
+        return
+
+    from doordecks.tracing import tracing
+    with tracing() as tracer:
+        _run(args)
+    tracer.write_chrome_trace(args.trace)
+    print(tracer.summary())
+    print(f"Trace written to {args.trace} (open it in chrome://tracing or ui.perfetto.dev)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
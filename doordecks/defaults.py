@@ -0,0 +1,10 @@
+"""Defaults shared by the build modules and the `doordecks` command.
+
+This module imports nothing, so the command line can read them without
+loading PIL or python-pptx.
+"""
+
+# Resolution the decks are printed at
+DEFAULT_PRINT_DPI = 300
+# Default shard size when splitting by slide count (3 residents per slide)
+DEFAULT_SLIDES_PER_SHARD = 100
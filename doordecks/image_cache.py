@@ -0,0 +1,355 @@
+import os
+import glob
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from doordecks.tracing import count
+
+try:
+    import fcntl
+except ImportError:  # Windows: index merges are not serialized across processes
+    fcntl = None
+
+# Default location and size cap for the shared download cache
+DEFAULT_CACHE_DIR = '.image_cache'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Entries older than this are revalidated with the server before reuse
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+
+# The process umask, read once at import: os.umask can only be read by setting it
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+
+class ImageCache:
+    """On-disk image cache keyed by URL and stored by content hash.
+
+    Every URL maps to a blob named after the SHA-256 of its bytes, so URLs that
+    serve identical content share one file. Entries are reused without any
+    network traffic until they are older than max_age seconds (a week by
+    default; None never revalidates); stale entries are revalidated with
+    If-None-Match / If-Modified-Since. When the blobs and the variants derived
+    from them exceed max_bytes the least recently used ones are evicted.
+
+    Several processes may share one cache directory: blobs and the index are
+    replaced atomically, and flush() merges with the index on disk under a
+    file lock instead of overwriting entries added by other processes.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.bytes_downloaded = 0
+
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries = self._load_index()
+        # Variant sizes by source digest, scanned from disk on first use
+        self._variants = None
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        # Drop entries whose blob disappeared from disk
+        return {url: entry for url, entry in entries.items()
+                if os.path.exists(self._blob_path(entry['hash'], entry['ext']))}
+
+    @contextlib.contextmanager
+    def _index_lock(self):
+        """Hold an exclusive lock on the index shared with other processes"""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.cache_dir, 'index.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _blob_path(self, digest, ext):
+        return os.path.join(self.objects_dir, digest[:2], f'{digest}{ext}')
+
+    def _remove_blob(self, digest, ext):
+        """Delete a blob together with any variants derived from it"""
+        if self._variants is not None:
+            self._variants.pop(digest, None)
+        for path in glob.glob(os.path.join(self.objects_dir, digest[:2], f'{digest}*')):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def variant_path(self, blob_path, tag, ext):
+        """Path for a version of a cached blob derived under tag (e.g. a resample).
+
+        Variants are stored next to their source blob, so eviction and clear()
+        remove them along with it.
+        """
+        digest = os.path.basename(blob_path).split('.', 1)[0]
+        return os.path.join(os.path.dirname(blob_path), f'{digest}.{tag}{ext}')
+
+    def write_variant(self, path, data):
+        """Store a variant at a path from variant_path, counting it toward max_bytes"""
+        atomic_write(path, data)
+        digest = os.path.basename(path).split('.', 1)[0]
+        with self._lock:
+            self._scan_variants().setdefault(digest, {})[path] = len(data)
+            self._evict(keep=digest)
+
+    def _scan_variants(self):
+        """Source digest -> {variant path: bytes} of the variants on disk (lock held)"""
+        if self._variants is None:
+            self._variants = {}
+            for path in glob.glob(os.path.join(self.objects_dir, '*', '*.*.*')):
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                digest = os.path.basename(path).split('.', 1)[0]
+                self._variants.setdefault(digest, {})[path] = size
+        return self._variants
+
+    def path_for(self, url):
+        """Local path of a cached URL, or None if it is not cached"""
+        with self._lock:
+            entry = self._entries.get(url)
+            return self._blob_path(entry['hash'], entry['ext']) if entry else None
+
+    def fetch(self, url, session=None):
+        """Return the local path holding the content of url, downloading it if needed"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry and not os.path.exists(self._blob_path(entry['hash'], entry['ext'])):
+                # Evicted by another process sharing the cache; download it again
+                entry = None
+            if entry and (self.max_age is None or time.time() - entry['fetched'] < self.max_age):
+                self.hits += 1
+                entry['used'] = time.time()
+                self._dirty = True
+                count('cache_hits')
+                return self._blob_path(entry['hash'], entry['ext'])
+            entry = dict(entry) if entry else None
+
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        if session is None:
+            # Imported here so cache maintenance never pays for requests
+            import requests
+            session = requests
+        response = session.get(url, headers=headers)
+        if entry and response.status_code == 304:
+            with self._lock:
+                self.hits += 1
+                self.revalidated += 1
+                entry['fetched'] = entry['used'] = time.time()
+                self._entries[url] = entry
+                self._dirty = True
+                count('cache_hits')
+            return self._blob_path(entry['hash'], entry['ext'])
+        response.raise_for_status()
+
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        ext = _guess_extension(url, response.headers.get('Content-Type'))
+        blob_path = self._blob_path(digest, ext)
+        if not os.path.exists(blob_path):
+            atomic_write(blob_path, content)
+
+        now = time.time()
+        with self._lock:
+            self.misses += 1
+            self.bytes_downloaded += len(content)
+            count('cache_misses')
+            count('bytes_downloaded', len(content))
+            self._entries[url] = {
+                'hash': digest,
+                'ext': ext,
+                'size': len(content),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched': now,
+                'used': now,
+            }
+            self._dirty = True
+            self._evict(keep=digest)
+        return blob_path
+
+    def _evict(self, keep, max_bytes=None):
+        """Drop least recently used blobs, with their variants, until the cache fits
+        max_bytes (lock held). keep is the digest of a blob that must stay.
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        variants = self._scan_variants()
+        blobs = {}
+        for url, entry in self._entries.items():
+            key = (entry['hash'], entry['ext'])
+            size, used, urls = blobs.get(
+                key, (entry['size'] + sum(variants.get(entry['hash'], {}).values()), 0, []))
+            blobs[key] = (size, max(used, entry['used']), urls + [url])
+
+        total = sum(size for size, _, _ in blobs.values())
+        for key, (size, _, urls) in sorted(blobs.items(), key=lambda item: item[1][1]):
+            if total <= max_bytes:
+                break
+            # Never evict the blob that was just stored
+            if key[0] == keep:
+                continue
+            for url in urls:
+                del self._entries[url]
+            self._remove_blob(*key)
+            total -= size
+
+    def size(self):
+        """Total bytes held in distinct blobs and their variants"""
+        with self._lock:
+            return self._size()
+
+    def _size(self):
+        variants = self._scan_variants()
+        seen = {(e['hash'], e['ext']): e['size'] + sum(variants.get(e['hash'], {}).values())
+                for e in self._entries.values()}
+        return sum(seen.values())
+
+    def stats(self):
+        """Counters for this session plus the current cache footprint"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidated': self.revalidated,
+            'bytes_downloaded': self.bytes_downloaded,
+            'entries': len(self._entries),
+            'size': self.size(),
+        }
+
+    def flush(self):
+        """Merge the index with the one on disk and write it if it changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+        with self._index_lock():
+            on_disk = self._load_index()
+            with self._lock:
+                # Keep the most recently fetched version of every URL
+                for url, entry in on_disk.items():
+                    mine = self._entries.get(url)
+                    if mine is None or entry['fetched'] > mine['fetched']:
+                        self._entries[url] = entry
+                    elif entry['used'] > mine['used']:
+                        mine['used'] = entry['used']
+                data = json.dumps(self._entries, indent=1).encode('utf-8')
+            atomic_write(self.index_path, data)
+
+    def prefetch(self, urls, session=None, max_workers=8):
+        """Fetch every distinct URL concurrently.
+
+        Returns a map from URL to local path, with None for failed downloads.
+        """
+        def fetch(url):
+            try:
+                return self.fetch(url, session)
+            except Exception as e:
+                count('fetch_errors')
+                print(f"Error fetching image {url}: {e}")
+                return None
+
+        unique_urls = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(unique_urls, executor.map(fetch, unique_urls)))
+
+    def prune(self, max_bytes=None):
+        """Evict least recently used blobs until the cache fits max_bytes.
+
+        Defaults to the cache's own limit. Returns the number of bytes freed.
+        """
+        self.flush()
+        with self._index_lock():
+            with self._lock:
+                self._entries = self._load_index()
+                self._variants = None
+                before = self._size()
+                self._evict(keep=None, max_bytes=max_bytes)
+                data = json.dumps(self._entries, indent=1).encode('utf-8')
+            atomic_write(self.index_path, data)
+        return before - self.size()
+
+    def clear(self):
+        """Remove every cached entry and blob"""
+        with self._index_lock():
+            with self._lock:
+                entries = {**self._load_index(), **self._entries}
+                self._entries = {}
+                self._variants = {}
+                self._dirty = False
+            for entry in entries.values():
+                self._remove_blob(entry['hash'], entry['ext'])
+            atomic_write(self.index_path, b'{}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+
+def _guess_extension(url, content_type):
+    """File extension for a downloaded image, preferring the Content-Type"""
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    by_type = {'image/png': '.png', 'image/jpeg': '.jpg', 'image/gif': '.gif', 'image/webp': '.webp'}
+    if content_type in by_type:
+        return by_type[content_type]
+    path = url.split('?', 1)[0].lower()
+    for ext in ('.png', '.jpg', '.jpeg', '.gif', '.webp'):
+        if ext in path:
+            return '.jpg' if ext == '.jpeg' else ext
+    return '.bin'
+
+
+@contextlib.contextmanager
+def atomic_file(path, mode='wb'):
+    """Open a temp file next to path and move it into place when the block succeeds.
+
+    The file gets the permissions open() would give it under the umask
+    rather than mkstemp's owner-only 0600, so other users sharing the
+    directory can read it. On error the temp file is removed.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write(path, data):
+    """Write data to path via a temp file so readers never see a partial file"""
+    with atomic_file(path) as f:
+        f.write(data)
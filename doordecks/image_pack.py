@@ -0,0 +1,119 @@
+import os
+import json
+import mmap
+import struct
+import hashlib
+from doordecks.card_template import ImageStream
+from doordecks.image_cache import ImageCache, atomic_file
+
+PACK_VERSION = 1
+# Header: magic, then the offset and length of the JSON index at the end of the file
+_MAGIC = b'DDPACK01'
+_HEADER = struct.Struct('<8sQQ')
+
+
+class ImagePack:
+    """Read-only archive of normalized images, memory-mapped and indexed by name and URL.
+
+    Every image is one slice of the mapped file, so looking one up costs no
+    file open, stat or network round trip; the OS pages in only what is read.
+    size is the pixel size the images were normalized for (None when they
+    were packed as downloaded).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, offset, length = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not an image pack")
+        index = json.loads(self._map[offset:offset + length])
+        if index.get('version') != PACK_VERSION:
+            self._map.close()
+            raise ValueError(f"{path} was packed by an incompatible version")
+
+        self.size = tuple(index['size']) if index['size'] else None
+        self.background = tuple(index['background']) if index['background'] else None
+        self._entries = {}
+        for entry in index['entries']:
+            self._entries[entry['url']] = entry
+            if entry['name']:
+                self._entries.setdefault(entry['name'], entry)
+        self.count = len(index['entries'])
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return self.count
+
+    def image_name(self, key):
+        """Name a packed image is embedded and listed under: <pack>/<name><ext>"""
+        entry = self._entries[key]
+        return os.path.join(self.path, f"{entry['name'] or entry['hash'][:16]}{entry['ext']}")
+
+    def data(self, key):
+        """Encoded bytes of the image packed under a name or URL"""
+        entry = self._entries[key]
+        return self._map[entry['offset']:entry['offset'] + entry['length']]
+
+    def open_image(self, key):
+        """The packed image as an in-memory stream python-pptx and PIL can read"""
+        return ImageStream(self.data(key), self.image_name(key))
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def pack_images(items, pack_path, cache=None, size=None, background=None, session=None,
+                max_workers=8):
+    """Write an image pack from (name, url) pairs.
+
+    Every URL is downloaded and normalized for size through the image cache,
+    concurrently, and the encoded images are appended to one file behind an
+    index of name, URL, offset and length. Images with identical bytes are
+    stored once. URLs that cannot be fetched are left out. The pack replaces
+    pack_path atomically. Returns the number of URLs packed.
+    """
+    from doordecks.pipeline import normalize_images
+
+    if cache is None:
+        cache = ImageCache()
+    items = list(items)
+    normalized = normalize_images([(url, size, background) for _, url in items], cache, session,
+                                  max_workers)
+    cache.flush()
+
+    entries = []
+    stored = {}
+    with atomic_file(pack_path) as f:
+        f.write(_HEADER.pack(_MAGIC, 0, 0))
+        for name, url in items:
+            path = normalized[(url, size, background)]
+            if path is None:
+                continue
+            with open(path, 'rb') as image:
+                data = image.read()
+            digest = hashlib.sha256(data).hexdigest()
+            if digest not in stored:
+                stored[digest] = f.tell()
+                f.write(data)
+            entries.append({'name': name, 'url': url, 'hash': digest, 'offset': stored[digest],
+                            'length': len(data), 'ext': os.path.splitext(path)[1]})
+
+        index = json.dumps({'version': PACK_VERSION, 'size': size, 'background': background,
+                            'entries': entries}).encode('utf-8')
+        offset = f.tell()
+        f.write(index)
+        f.seek(0)
+        f.write(_HEADER.pack(_MAGIC, offset, len(index)))
+    print(f"Packed {len(entries)} images ({len(stored)} distinct) into {pack_path}")
+    return len(entries)
@@ -0,0 +1,267 @@
+import os
+import csv
+import json
+import tempfile
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+from pptx.util import Emu
+from doordecks.image_cache import ImageCache, atomic_write
+from doordecks.package_writer import save_deck
+from doordecks.roster import PathsWriter, iter_residents
+from doordecks.sharding import copy_slide_shapes, deck_image_parts
+from doordecks.themes import load_theme
+from doordecks.tracing import span
+
+MANIFEST_VERSION = 1
+RESIDENTS_PER_SLIDE = 3
+# How far a card's shapes may stick out of its column (the villager bells icon)
+COLUMN_MARGIN = 0.1
+
+# Generator options that do not change the deck, so they never force a full rebuild
+_NEUTRAL_OPTIONS = ('max_workers', 'zip_level')
+
+
+def manifest_path(save_path):
+    """Build manifest kept next to a deck"""
+    return os.path.splitext(save_path)[0] + '.manifest.json'
+
+
+def _manifest_options(options):
+    kept = {key: value for key, value in options.items() if key not in _NEUTRAL_OPTIONS}
+    # Round-trip through JSON so tuples compare equal to the lists read back
+    return json.loads(json.dumps(kept, sort_keys=True))
+
+
+def _load_manifest(path, theme, options):
+    """The manifest at path, or None if it is missing or was built differently"""
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (manifest.get('version') != MANIFEST_VERSION or manifest.get('theme') != theme
+            or manifest.get('options') != _manifest_options(options)):
+        return None
+    return manifest
+
+
+def _card_shape_ids(slide, theme):
+    """Shape ids of each card column on a slide, using the theme's CARD_COLUMNS.
+
+    Shapes that do not fit inside one card (the title placeholder, the arena
+    background) belong to no column.
+    """
+    origin, pitch, width = load_theme(theme).CARD_COLUMNS
+    columns = [[] for _ in range(RESIDENTS_PER_SLIDE)]
+    for shape in slide.shapes:
+        if shape.left is None or shape.width is None:
+            continue
+        left = Emu(shape.left).inches
+        right = Emu(shape.left + shape.width).inches
+        column = round((left - origin) / pitch)
+        column_left = origin + column * pitch
+        if (0 <= column < RESIDENTS_PER_SLIDE and left >= column_left - COLUMN_MARGIN
+                and right <= column_left + width + COLUMN_MARGIN):
+            columns[column].append(shape.shape_id)
+    return columns
+
+
+def _index_slide(slide, index, theme, rows):
+    """Record the slide and shape ids of the residents on the slide at index"""
+    for column, shape_ids in enumerate(_card_shape_ids(slide, theme)):
+        position = index * RESIDENTS_PER_SLIDE + column
+        if position < len(rows):
+            rows[position]['slide'] = slide.slide_id
+            rows[position]['shapes'] = shape_ids
+
+
+def _read_paths(paths_csv):
+    """(header, rows) of an image paths CSV"""
+    with open(paths_csv, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        return next(reader), list(reader)
+
+
+def _update_text(slide, row, name, room):
+    """Rewrite a card's name and room runs in place.
+
+    Returns False when the old name or room does not appear exactly once in
+    the card, e.g. a resident named like their room, so the slide has to be
+    re-rendered instead.
+    """
+    shape_ids = set(row['shapes'])
+    runs = [t for shape in slide.shapes if shape.shape_id in shape_ids
+            for t in shape._element.iter(qn('a:t'))]
+    replacements = {}
+    if name != row['name']:
+        replacements[row['name']] = name
+    if room != row['room']:
+        replacements[row['room']] = room
+    if row['name'] == row['room'] or any(
+            sum(t.text == old for t in runs) != 1 for old in replacements):
+        return False
+    for t in runs:
+        if t.text in replacements:
+            t.text = replacements[t.text]
+    return True
+
+
+def _drop_unused_images(slide):
+    """Remove image relationships that no shape on the slide refers to any more"""
+    used = set(slide.part._element.xpath('//@r:embed'))
+    for r_id, rel in list(slide.part.rels.items()):
+        if rel.reltype == RT.IMAGE and r_id not in used:
+            slide.part.drop_rel(r_id)
+
+
+def _drop_slide(prs, index):
+    sld_id_lst = prs.slides._sldIdLst
+    sld_id = sld_id_lst[index]
+    sld_id_lst.remove(sld_id)
+    prs.part.drop_rel(sld_id.rId)
+
+
+def _write_manifest(path, theme, options, fields, rows):
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'theme': theme,
+        'options': _manifest_options(options),
+        'paths_fields': fields,
+        'rows': rows,
+    }
+    atomic_write(path, json.dumps(manifest).encode('utf-8'))
+
+
+def _full_build(theme, residents, data, rows, save_path, cache, paths_csv, options):
+    load_theme(theme).render(residents, data, cache=cache, save_path=save_path, paths_csv=paths_csv,
+                      **options)
+    fields, paths = _read_paths(paths_csv)
+    for row, values in zip(rows, paths):
+        row['paths'] = values
+    prs = Presentation(save_path)
+    for index, slide in enumerate(prs.slides):
+        _index_slide(slide, index, theme, rows)
+    _write_manifest(manifest_path(save_path), theme, options, fields, rows)
+    print(f"Build manifest saved to {manifest_path(save_path)}")
+    return {'mode': 'full', 'slides': len(prs.slides)}
+
+
+def build_incremental(theme, residents, data, save_path, cache=None, paths_csv=None, **options):
+    """Bring the deck at save_path up to date with residents, patching only what changed.
+
+    A manifest next to the deck maps every roster row to its slide id, the
+    ids of its card's shapes and the inputs the card was drawn from. The new
+    roster is compared with it position by position. Changed names and rooms
+    are rewritten in the existing text runs; slides with any other change (a
+    different card or image) are rendered again through the theme's
+    generator and swapped in, and slides are appended or dropped when the
+    roster grows or shrinks. Inserting or deleting a row shifts every later
+    resident, so all slides after it change.
+
+    Without a usable manifest (first build, different theme or options, or a
+    deck whose slides no longer match it) the whole deck is built and a
+    manifest is written. paths_csv defaults to the theme's image paths CSV,
+    which is kept up to date as well. Returns a summary of what was done.
+    """
+    renderer = load_theme(theme)
+    if cache is None:
+        cache = ImageCache()
+    if paths_csv is None:
+        paths_csv = renderer.DEFAULT_PATHS_CSV
+
+    residents = list(iter_residents(residents))
+    rows = [{'name': str(resident.name), 'room': f"{resident.room}",
+             'card': renderer.card_inputs(data, resident.position),
+             'slide': None, 'shapes': [], 'paths': []} for resident in residents]
+    manifest = _load_manifest(manifest_path(save_path), theme, options)
+    if manifest is None or not os.path.exists(save_path):
+        return _full_build(theme, residents, data, rows, save_path, cache, paths_csv, options)
+
+    with span('load'):
+        prs = Presentation(save_path)
+    slides = list(prs.slides)
+    old_rows = manifest['rows']
+    slide_ids = list(dict.fromkeys(row['slide'] for row in old_rows))
+    if slide_ids != [slide.slide_id for slide in slides]:
+        print(f"{save_path} no longer matches its manifest; rebuilding it")
+        return _full_build(theme, residents, data, rows, save_path, cache, paths_csv, options)
+
+    slide_count = -(-len(rows) // RESIDENTS_PER_SLIDE)
+    rerender = set(range(len(slides), slide_count))
+    text_updates = {}
+    for position in range(max(len(rows), len(old_rows))):
+        index = position // RESIDENTS_PER_SLIDE
+        if index >= slide_count:
+            break
+        if position >= len(rows) or position >= len(old_rows):
+            rerender.add(index)
+            continue
+        old, new = old_rows[position], rows[position]
+        if old['card'] != new['card']:
+            rerender.add(index)
+        elif (old['name'], old['room']) != (new['name'], new['room']):
+            if options.get('fit_text'):
+                # The new text may be drawn at another size, so the card is drawn again
+                rerender.add(index)
+            else:
+                text_updates[position] = new
+
+    # Carry the unchanged rows over; patched ones are filled in below
+    for position, row in enumerate(rows[:len(old_rows)]):
+        row.update(slide=old_rows[position]['slide'], shapes=old_rows[position]['shapes'],
+                   paths=old_rows[position]['paths'])
+
+    with span('patch'):
+        updated = 0
+        for position, new in text_updates.items():
+            index = position // RESIDENTS_PER_SLIDE
+            if index in rerender:
+                continue
+            if _update_text(slides[index], old_rows[position], new['name'], new['room']):
+                rows[position]['paths'] = [new['name']] + old_rows[position]['paths'][1:]
+                updated += 1
+            else:
+                rerender.add(index)
+
+        rerender = sorted(rerender)
+        if rerender:
+            with tempfile.TemporaryDirectory() as tmp:
+                scratch_path = os.path.join(tmp, 'slides.pptx')
+                scratch_paths = os.path.join(tmp, 'paths.csv')
+                positions = [position for index in rerender
+                             for position in range(index * RESIDENTS_PER_SLIDE,
+                                                   min((index + 1) * RESIDENTS_PER_SLIDE, len(rows)))]
+                renderer.render([residents[position] for position in positions], data,
+                                cache=cache, save_path=scratch_path, paths_csv=scratch_paths,
+                                **options)
+                scratch = Presentation(scratch_path)
+                for position, values in zip(positions, _read_paths(scratch_paths)[1]):
+                    rows[position]['paths'] = values
+
+            image_parts = deck_image_parts(prs)
+            for index, scratch_slide in zip(rerender, scratch.slides):
+                if index < len(slides):
+                    slide = slides[index]
+                else:
+                    layout = prs.slide_layouts[scratch.slide_layouts.index(scratch_slide.slide_layout)]
+                    slide = prs.slides.add_slide(layout)
+                copy_slide_shapes(scratch_slide, slide, image_parts)
+                _drop_unused_images(slide)
+                _index_slide(slide, index, theme, rows)
+
+        for index in range(len(slides) - 1, slide_count - 1, -1):
+            _drop_slide(prs, index)
+
+    save_deck(prs, save_path, options.get('zip_level'))
+    _write_manifest(manifest_path(save_path), theme, options, manifest['paths_fields'], rows)
+    with PathsWriter(paths_csv, manifest['paths_fields']) as paths:
+        for row in rows:
+            paths.write(*row['paths'])
+
+    summary = {'mode': 'patch', 'slides': len(prs.slides), 'text_updates': updated,
+               'rerendered': len([index for index in rerender if index < len(slides)]),
+               'appended': max(slide_count - len(slides), 0),
+               'dropped': max(len(slides) - slide_count, 0)}
+    print(f"Patched {save_path}: {summary}")
+    return summary
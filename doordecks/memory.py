@@ -0,0 +1,212 @@
+"""Bounded-memory builds and peak memory reports.
+
+build_bounded renders a roster as a series of part decks: residents are
+streamed into the theme's renderer until the process RSS nears the budget,
+then that part is saved, the deck's object graph is released and the next
+part starts. At most max_decoded images are decoded by PIL at any time.
+
+MemoryReport measures the RSS high-water mark of a block and, with
+tracemalloc, the peak of the Python heap (lxml and PIL allocate outside it,
+which is why RSS is what the budget is checked against).
+"""
+import os
+import gc
+import sys
+import ctypes
+import threading
+import itertools
+import contextlib
+import tracemalloc
+from doordecks.image_cache import ImageCache
+from doordecks.roster import iter_residents
+from doordecks.themes import load_theme
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is only known where /proc is
+    resource = None
+
+# A part is saved once RSS reaches this fraction of the budget, leaving the
+# rest for serializing the part
+FLUSH_FRACTION = 0.75
+# Parts never get smaller than this, even when the budget is already used up at rest
+MIN_PART_SLIDES = 10
+# Images decoded at once by the download and color threads in a bounded build
+DEFAULT_DECODED_IMAGES = 2
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+_decode_slots = None
+
+
+def rss_bytes():
+    """Resident set size of this process now (the high-water mark where /proc is
+    missing), or None where neither can be read"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        return rss_high_water_bytes()
+
+
+def rss_high_water_bytes():
+    """Largest resident set size this process has had, or None where it cannot be read"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def _reset_high_water():
+    """Restart the RSS high-water mark at the current RSS, where the kernel allows it"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def release_memory():
+    """Collect garbage and hand freed heap pages back to the OS (glibc only)"""
+    gc.collect()
+    try:
+        ctypes.CDLL(None).malloc_trim(0)
+    except (OSError, AttributeError, TypeError):
+        pass
+
+
+def limit_decoded_images(limit):
+    """Allow at most limit images decoded at once in this process; None lifts the limit"""
+    global _decode_slots
+    _decode_slots = threading.BoundedSemaphore(limit) if limit else None
+
+
+def decode_slot():
+    """Context manager held while an image is decoded, see limit_decoded_images"""
+    slots = _decode_slots
+    return slots if slots is not None else contextlib.nullcontext()
+
+
+def format_bytes(n):
+    return 'unknown' if n is None else f"{n / (1024 * 1024):.1f} MiB"
+
+
+class MemoryReport:
+    """Peak memory of a block: the RSS high-water mark and, with trace, the Python heap peak.
+
+        with MemoryReport() as report:
+            build()
+        print(report.summary())
+    """
+
+    def __init__(self, trace=True):
+        self.trace = trace
+        self.rss_start = self.rss_peak = self.traced_peak = None
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.trace:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+        _reset_high_water()
+        self.rss_start = rss_bytes()
+        return self
+
+    def __exit__(self, *exc):
+        if self.trace:
+            self.traced_peak = tracemalloc.get_traced_memory()[1]
+            if self._started_tracing:
+                tracemalloc.stop()
+        self.rss_peak = rss_high_water_bytes()
+
+    def summary(self):
+        lines = [f"Peak RSS: {format_bytes(self.rss_peak)} "
+                 f"(started at {format_bytes(self.rss_start)})"]
+        if self.traced_peak is not None:
+            lines.append(f"Peak Python heap (tracemalloc): {format_bytes(self.traced_peak)}")
+        return '\n'.join(lines)
+
+
+def part_path(path, part):
+    """path with a part number before its extension ('deck.pptx' -> 'deck_part01.pptx')"""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}_part{part:02d}{ext}"
+
+
+def _over(limit):
+    rss = rss_bytes()
+    return rss is not None and rss >= limit
+
+
+def _until_budget(first, stream, limit, min_residents, counter):
+    """first and then residents from stream, until a slide boundary at which RSS has reached limit"""
+    for n, resident in enumerate(itertools.chain([first], stream), 1):
+        counter[0] = n
+        yield resident
+        if n % 3 == 0 and n >= min_residents and _over(limit):
+            return
+
+
+def build_bounded(theme, residents, data, save_path, budget_mb, cache=None, paths_csv=None,
+                  max_decoded=DEFAULT_DECODED_IMAGES, **options):
+    """Build a deck in parts so the process stays within about budget_mb of RSS.
+
+    Parts are saved as save_path with a part number (see part_path), each
+    with its own paths CSV; when the roster fits in one part it is saved as
+    save_path itself. Card templates are captured once and reused by every
+    part. Extra options are passed to the theme's renderer. Returns the deck
+    paths in roster order.
+    """
+    renderer = load_theme(theme)
+    if cache is None:
+        cache = ImageCache()
+    paths_csv = paths_csv or renderer.DEFAULT_PATHS_CSV
+    limit = budget_mb * 1024 * 1024 * FLUSH_FRACTION
+    templates = options.pop('templates', None)
+    if templates is None:
+        templates = {}
+
+    if rss_bytes() is None:
+        print("Memory use cannot be measured on this system; building the deck in one part")
+    stream = iter_residents(residents)
+    parts = []
+    warned = False
+    limit_decoded_images(max_decoded)
+    try:
+        first = next(stream, None)
+        while first is not None:
+            if parts and not warned and _over(limit):
+                warned = True
+                print(f"Memory budget of {budget_mb} MiB is already used at rest "
+                      f"({format_bytes(rss_bytes())}); writing parts of {MIN_PART_SLIDES} slides")
+
+            counter = [0]
+            path = part_path(save_path, len(parts) + 1)
+            renderer.render(_until_budget(first, stream, limit, MIN_PART_SLIDES * 3, counter), data,
+                            cache=cache, save_path=path,
+                            paths_csv=part_path(paths_csv, len(parts) + 1), templates=templates,
+                            **options)
+            parts.append(path)
+            # Image parts remembered by the templates would keep the saved deck alive
+            for template in templates.values():
+                template.release()
+            release_memory()
+            print(f"Saved part {len(parts)}: {counter[0]} residents, RSS {format_bytes(rss_bytes())}")
+            first = next(stream, None)
+    finally:
+        limit_decoded_images(None)
+
+    if len(parts) == 1:
+        os.replace(parts[0], save_path)
+        os.replace(part_path(paths_csv, 1), paths_csv)
+        parts = [save_path]
+    return parts
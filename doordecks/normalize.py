@@ -0,0 +1,92 @@
+import os
+from io import BytesIO
+from PIL import Image
+
+from doordecks.defaults import DEFAULT_PRINT_DPI
+from doordecks.memory import decode_slot
+from doordecks.tracing import span
+
+JPEG_QUALITY = 85
+
+
+def placeholder_pixels(width_in, height_in, dpi=DEFAULT_PRINT_DPI):
+    """Pixel size of a picture placeholder printed at dpi"""
+    return (round(width_in * dpi), round(height_in * dpi))
+
+
+def has_alpha(image):
+    """Whether the image has any pixel that is not fully opaque"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        return image.convert('RGBA').getchannel('A').getextrema()[0] < 255
+    return False
+
+
+def normalize_image(image, size=None, background=None):
+    """Resample an image for a placeholder of size pixels and encode it.
+
+    Images are only ever scaled down, per axis, since the picture is stretched
+    to its placeholder anyway and upscaling adds bytes without detail; with
+    size=None the image keeps its resolution and is only re-encoded.
+    Transparent images are flattened onto background when one is given;
+    otherwise they stay PNG, and opaque images become JPEG.
+    Returns (data, ext).
+    """
+    alpha = has_alpha(image)
+    if alpha and background is not None:
+        rgba = image.convert('RGBA')
+        flat = Image.new('RGB', image.size, background)
+        flat.paste(rgba, mask=rgba.getchannel('A'))
+        image, alpha = flat, False
+    image = image.convert('RGBA' if alpha else 'RGB')
+
+    target = (min(image.width, size[0]), min(image.height, size[1])) if size else image.size
+    if target != image.size:
+        image = image.resize(target, Image.LANCZOS)
+
+    buffer = BytesIO()
+    if alpha:
+        image.save(buffer, 'PNG')
+        return buffer.getvalue(), '.png'
+    image.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+    return buffer.getvalue(), '.jpg'
+
+
+def normalized_image(cache, url, size=None, background=None, session=None):
+    """Cached path of url's image normalized for a size-pixel placeholder.
+
+    The normalized file is stored in the image cache next to the downloaded
+    original, so each (image, size, background) is resampled once.
+    """
+    return _normalized(cache, url, size, background, session)[0]
+
+
+def normalized_image_data(cache, url, size=None, background=None, session=None):
+    """Cached path and bytes of url's normalized image.
+
+    A freshly normalized image is returned from memory rather than read back
+    from the file just written to the cache.
+    """
+    path, data = _normalized(cache, url, size, background, session)
+    if data is None:
+        with open(path, 'rb') as f:
+            data = f.read()
+    return path, data
+
+
+def _normalized(cache, url, size, background, session):
+    """(path, data) of the normalized image; data is None when it was already cached"""
+    source = cache.fetch(url, session)
+    tag = f'{size[0]}x{size[1]}' if size else 'full'
+    if background is not None:
+        tag += '-' + ''.join('%02x' % c for c in background)
+    for ext in ('.jpg', '.png'):
+        path = cache.variant_path(source, tag, ext)
+        if os.path.exists(path):
+            return path, None
+
+    with span('normalize', url=url), decode_slot():
+        with Image.open(source) as image:
+            data, ext = normalize_image(image, size, background)
+        path = cache.variant_path(source, tag, ext)
+        cache.write_variant(path, data)
+    return path, data
@@ -0,0 +1,98 @@
+import time
+import zlib
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pptx.opc.serialized import PackageWriter
+from doordecks.image_cache import atomic_file
+from doordecks.tracing import span
+
+# Deflate level of the XML parts; 6 is zlib's (and python-pptx's) default
+DEFAULT_ZIP_LEVEL = 6
+# Parts that are compressed already and are stored as they are
+STORED_CONTENT_TYPES = {'image/png', 'image/jpeg', 'image/gif', 'video/mp4', 'audio/mpeg'}
+
+
+class _Collector:
+    """Stands in for python-pptx's zip writer and records (member, blob, stored) in order"""
+
+    def __init__(self, stored_members):
+        self.items = []
+        self._stored_members = stored_members
+
+    def write(self, pack_uri, blob):
+        self.items.append((pack_uri.membername, blob, pack_uri.membername in self._stored_members))
+
+
+def _package_items(prs):
+    """Every member of the deck's package, in the order python-pptx writes them"""
+    package = prs.part.package
+    parts = tuple(package.iter_parts())
+    stored = {part.partname.membername for part in parts
+              if part.content_type in STORED_CONTENT_TYPES}
+    collector = _Collector(stored)
+    writer = PackageWriter(None, package._rels, parts)
+    writer._write_content_types_stream(collector)
+    writer._write_pkg_rels(collector)
+    writer._write_parts(collector)
+    return collector.items
+
+
+class _Deflated:
+    """Stands in for zipfile's compressor of one member and emits its deflate stream
+    computed ahead of time"""
+
+    def __init__(self, data):
+        self._data = data
+
+    def compress(self, blob):
+        return b''
+
+    def flush(self):
+        return self._data
+
+
+def _deflate(blob, level):
+    """Raw deflate stream of blob, as zipfile's compressor would write it"""
+    deflate = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return deflate.compress(blob) + deflate.flush()
+
+
+def _write_member(package, name, blob, deflated, date_time):
+    """Add one member to an open ZipFile; deflated is its precomputed stream, or None to store it"""
+    info = zipfile.ZipInfo(name, date_time)
+    info.external_attr = 0o600 << 16
+    info.file_size = len(blob)
+    info.compress_type = zipfile.ZIP_STORED if deflated is None else zipfile.ZIP_DEFLATED
+    with package.open(info, 'w') as member:
+        if deflated is not None:
+            # zipfile still computes the CRC and sizes and writes the headers
+            member._compressor = _Deflated(deflated)
+        member.write(blob)
+
+
+def save_package(prs, save_path, level=DEFAULT_ZIP_LEVEL, max_workers=None):
+    """Write a presentation as a .pptx, faster than Presentation.save.
+
+    Media that is compressed already (PNG, JPEG, ...) is stored rather than
+    deflated again, and the XML parts are deflated at level on a thread pool
+    (zlib releases the GIL). Members are written with zipfile in
+    python-pptx's order as they are ready, with [Content_Types].xml first,
+    to a temp file that is moved into place at the end.
+    """
+    items = _package_items(prs)
+    date_time = time.localtime(time.time())[:6]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+            atomic_file(save_path) as f, zipfile.ZipFile(f, 'w') as package:
+        futures = [None if stored else executor.submit(_deflate, blob, level)
+                   for _, blob, stored in items]
+        for (name, blob, _), future in zip(items, futures):
+            _write_member(package, name, blob, future and future.result(), date_time)
+
+
+def save_deck(prs, save_path, zip_level=None):
+    """Save a deck with Presentation.save, or with save_package at zip_level when one is given"""
+    with span('save', slides=len(prs.slides)):
+        if zip_level is None:
+            prs.save(save_path)
+        else:
+            save_package(prs, save_path, zip_level)
@@ -0,0 +1,97 @@
+import os
+import importlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import NamedTuple, Optional
+from doordecks.image_cache import ImageCache, DEFAULT_CACHE_DIR
+from doordecks.normalize import normalized_image
+from doordecks.roster import iter_residents
+from doordecks.themes import THEMES, load_theme
+from doordecks.tracing import span
+
+# Concurrent downloads in the shared fetch stage
+DEFAULT_FETCH_WORKERS = 8
+
+
+class ThemeBuild(NamedTuple):
+    """One deck of a multi-theme build.
+
+    save_path and paths_csv default to the theme's DEFAULT_OUTPUT and
+    DEFAULT_PATHS_CSV; options are passed on to the theme's renderer.
+    """
+    theme: str
+    data: list
+    save_path: Optional[str] = None
+    paths_csv: Optional[str] = None
+    options: Optional[dict] = None
+
+
+def normalize_images(image_requests, cache, session=None, max_workers=DEFAULT_FETCH_WORKERS):
+    """Download and normalize every distinct (url, size, background) concurrently.
+
+    Returns a map from request to the normalized file in the cache, with None
+    for images that could not be fetched.
+    """
+    def normalize(request):
+        url, size, background = request
+        try:
+            return normalized_image(cache, url, size, background, session)
+        except Exception as e:
+            print(f"Error fetching image: {e}")
+            return None
+
+    unique_requests = list(dict.fromkeys(image_requests))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(unique_requests, executor.map(normalize, unique_requests)))
+
+
+def _render(module, residents, data, save_path, paths_csv, cache_dir, options):
+    """Worker: render one theme's deck from the shared cache"""
+    importlib.import_module(module).render(residents, data, cache=ImageCache(cache_dir),
+                                           save_path=save_path, paths_csv=paths_csv, **options)
+    return save_path
+
+
+def build_themes(residents, builds, cache_dir=DEFAULT_CACHE_DIR, parallel=False,
+                 max_workers=DEFAULT_FETCH_WORKERS):
+    """Build several themed decks for one roster in a single pass.
+
+    The roster is read once. The images of every theme are then fetched,
+    decoded and normalized into the shared cache by one thread pool and HTTP
+    session, each distinct image once, before the renderers run: one after
+    the other in this process, or with parallel in a process pool. builds is
+    a list of ThemeBuild. Returns the deck paths in builds order.
+    """
+    import requests
+
+    residents = list(iter_residents(residents))
+    cache = ImageCache(cache_dir)
+    renderers = [load_theme(build.theme) for build in builds]
+
+    image_requests = []
+    for build, renderer in zip(builds, renderers):
+        image_requests += renderer.image_requests(residents, build.data, **(build.options or {}))
+    with span('fetch_stage', images=len(image_requests)), requests.Session() as session:
+        normalized = normalize_images(image_requests, cache, session, max_workers)
+    cache.flush()
+    print(f"Fetched {len(normalized)} distinct images for {len(builds)} themes")
+
+    jobs = []
+    for build, renderer in zip(builds, renderers):
+        save_path = build.save_path or renderer.DEFAULT_OUTPUT
+        if os.path.dirname(save_path):
+            os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        jobs.append((THEMES[build.theme], build.data, save_path,
+                     build.paths_csv or renderer.DEFAULT_PATHS_CSV, build.options or {}))
+
+    if parallel:
+        with ProcessPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = [executor.submit(_render, module, residents, data, save_path, paths_csv,
+                                       cache_dir, options)
+                       for module, data, save_path, paths_csv, options in jobs]
+            return [future.result() for future in futures]
+
+    for (_, data, save_path, paths_csv, options), build, renderer in zip(jobs, builds, renderers):
+        with span('render', theme=build.theme):
+            renderer.render(residents, data, cache=cache, save_path=save_path,
+                            paths_csv=paths_csv, **options)
+    return [save_path for _, _, save_path, _, _ in jobs]
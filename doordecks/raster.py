@@ -0,0 +1,279 @@
+import os
+import re
+import functools
+import importlib
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageDraw, ImageFont
+from doordecks.image_cache import ImageCache, DEFAULT_CACHE_DIR, atomic_file
+from doordecks.normalize import DEFAULT_PRINT_DPI
+from doordecks.roster import chunked, iter_residents, read_ahead
+from doordecks.themes import THEMES, load_theme
+from doordecks.tracing import span
+
+# Page size of the decks (python-pptx's default 4:3 slide), in inches
+SLIDE_INCHES = (10, 7.5)
+# Card PNGs are cropped this far outside the card box, so its border is kept
+CROP_MARGIN = 0.05
+PDF_JPEG_QUALITY = 90
+
+# Font files tried for (family, bold, italic), by the names Windows and macOS
+# install them under; PIL searches the system font directories for them
+FONT_FILES = {
+    ('Impact', True, False): ['impact.ttf', 'Impact.ttf'],
+    ('Perpetua', True, True): ['PERBI___.TTF', 'Perpetua Bold Italic.ttf'],
+}
+FALLBACK_FONT_FILES = ['DejaVuSans-Bold.ttf', 'Arial Bold.ttf', 'arialbd.ttf']
+
+# Rounded rectangles use PowerPoint's default corner: 1/6 of the shorter side
+ROUNDED_CORNER = 0.16667
+# Top inset of python-pptx text boxes, in inches
+TEXT_INSET_TOP = 0.05
+
+
+@functools.lru_cache(maxsize=None)
+def load_family_font(family, size_px, bold=False, italic=False):
+    """The font family itself at a pixel size, or None when it is not installed"""
+    for filename in FONT_FILES.get((family, bold, italic), []):
+        try:
+            return ImageFont.truetype(filename, size_px)
+        except OSError:
+            continue
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def load_font(family, size_px, bold=False, italic=False):
+    """(font, synthetic_bold) for a font family at a pixel size.
+
+    Falls back to a common bold sans and then to PIL's bundled font, which is
+    drawn with a stroke when bold was asked for.
+    """
+    font = load_family_font(family, size_px, bold, italic)
+    if font is not None:
+        return font, False
+    for filename in FALLBACK_FONT_FILES:
+        try:
+            return ImageFont.truetype(filename, size_px), False
+        except OSError:
+            continue
+    return ImageFont.load_default(size_px), bold
+
+
+def _rgb(color):
+    return tuple(int(c) for c in color[:3])
+
+
+def _draw_shape(draw, kind, box, **style):
+    if kind == 'rect':
+        draw.rectangle(box, **style)
+    elif kind == 'rounded':
+        radius = ROUNDED_CORNER * min(box[2] - box[0], box[3] - box[1])
+        draw.rounded_rectangle(box, radius, **style)
+    else:
+        draw.ellipse(box, **style)
+
+
+class Canvas:
+    """A PIL image addressed in inches, with the shapes the decks are drawn from.
+
+    Mirrors what python-pptx produces: outlines are centered on the shape
+    edge, pictures are stretched to their box and text is a single centered
+    line near the top of its box.
+    """
+
+    def __init__(self, width_in, height_in, dpi=DEFAULT_PRINT_DPI, background=(255, 255, 255)):
+        self.dpi = dpi
+        self.image = Image.new('RGB', (self.px(width_in), self.px(height_in)), background)
+        self.draw = ImageDraw.Draw(self.image)
+
+    def px(self, inches):
+        return round(inches * self.dpi)
+
+    def _box(self, left, top, width, height, grow=0):
+        return (self.px(left) - grow, self.px(top) - grow,
+                self.px(left + width) - 1 + grow, self.px(top + height) - 1 + grow)
+
+    def shape(self, kind, left, top, width, height, fill=None, line=None, line_pt=0):
+        """Draw a 'rect', 'rounded' or 'oval' shape.
+
+        fill is a color or a PIL image stretched over the shape; a 0 pt line
+        is drawn one pixel wide, as PowerPoint does.
+        """
+        box = self._box(left, top, width, height)
+        if isinstance(fill, Image.Image):
+            size = (box[2] - box[0] + 1, box[3] - box[1] + 1)
+            mask = Image.new('L', size, 0)
+            _draw_shape(ImageDraw.Draw(mask), kind, (0, 0, size[0] - 1, size[1] - 1), fill=255)
+            self.image.paste(fill.convert('RGB').resize(size), box[:2], mask)
+        elif fill is not None:
+            _draw_shape(self.draw, kind, box, fill=_rgb(fill))
+        if line is not None:
+            line_px = max(1, round(line_pt / 72 * self.dpi))
+            _draw_shape(self.draw, kind, self._box(left, top, width, height, line_px // 2),
+                        outline=_rgb(line), width=line_px)
+
+    def picture(self, image, left, top, width, height):
+        """Stretch an image file, stream or PIL image over a box, keeping transparency"""
+        size = (self.px(left + width) - self.px(left), self.px(top + height) - self.px(top))
+        source = image if isinstance(image, Image.Image) else Image.open(image)
+        picture = source.convert('RGBA').resize(size, Image.LANCZOS)
+        if source is not image:
+            source.close()
+        self.image.paste(picture, (self.px(left), self.px(top)), picture)
+
+    def text(self, text, left, top, width, height, family, size_pt, color, bold=False,
+             italic=False, space_before_pt=0):
+        """Draw one line of text centered across a text box"""
+        font, synthetic_bold = load_font(family, round(size_pt / 72 * self.dpi), bold, italic)
+        y = self.px(top + TEXT_INSET_TOP + space_before_pt / 72)
+        self.draw.text((self.px(left + width / 2), y), str(text), fill=_rgb(color), font=font,
+                       anchor='ma', stroke_width=max(1, font.size // 30) if synthetic_bold else 0,
+                       stroke_fill=_rgb(color))
+
+    def crop(self, left, top, width, height, margin=0):
+        return self.image.crop((self.px(left - margin), self.px(top - margin),
+                                self.px(left + width + margin), self.px(top + height + margin)))
+
+
+class PdfPages:
+    """Multi-page PDF written one JPEG page at a time.
+
+    Each page shows one image across the whole page. Pages go to disk as
+    they are added, so a long deck is never held in memory; the file is
+    moved into place when it is closed.
+    """
+
+    def __init__(self, path, page_inches=SLIDE_INCHES):
+        self.path = path
+        self.page_size = (page_inches[0] * 72, page_inches[1] * 72)
+        # A uniquely named temp file, moved into place with umask permissions
+        self._atomic = atomic_file(path)
+        self._file = self._atomic.__enter__()
+        self._offsets = {}
+        self._pages = []
+        # Objects 1 and 2 (catalog and page tree) are written last
+        self._next_id = 3
+        self._file.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def _write_object(self, obj_id, body, stream=None):
+        self._offsets[obj_id] = self._file.tell()
+        self._file.write(b'%d 0 obj\n' % obj_id + body)
+        if stream is not None:
+            self._file.write(b'\nstream\n' + stream + b'\nendstream')
+        self._file.write(b'\nendobj\n')
+
+    def _add_object(self, body, stream=None):
+        obj_id = self._next_id
+        self._next_id += 1
+        self._write_object(obj_id, body, stream)
+        return obj_id
+
+    def add_page(self, jpeg, size):
+        """Add a page showing JPEG data of size (width, height) pixels"""
+        width, height = self.page_size
+        image = self._add_object(
+            b'<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB '
+            b'/BitsPerComponent 8 /Filter /DCTDecode /Length %d >>' % (size[0], size[1], len(jpeg)),
+            jpeg)
+        content = b'q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q' % (width, height)
+        contents = self._add_object(b'<< /Length %d >>' % len(content), content)
+        self._pages.append(self._add_object(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] '
+            b'/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>'
+            % (width, height, image, contents)))
+
+    def close(self):
+        kids = b' '.join(b'%d 0 R' % page for page in self._pages)
+        self._write_object(2, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self._pages)))
+        self._write_object(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+        xref = self._file.tell()
+        self._file.write(b'xref\n0 %d\n0000000000 65535 f \n' % self._next_id)
+        for obj_id in range(1, self._next_id):
+            self._file.write(b'%010d 00000 n \n' % self._offsets[obj_id])
+        self._file.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                         % (self._next_id, xref))
+        self._atomic.__exit__(None, None, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self._atomic.__exit__(exc_type, *exc)
+        return False
+
+
+def card_filename(resident):
+    """PNG name of a resident's card: roster order, then a filesystem-safe name"""
+    return f"{resident.position + 1:04d}_{re.sub(r'[^A-Za-z0-9_-]+', '_', str(resident.name))}.png"
+
+
+# Per-process state of the export workers, set once by _init_worker
+_worker = None
+
+
+def _init_worker(module, data, cache_dir, output_dir, dpi, options):
+    global _worker
+    _worker = (importlib.import_module(module), data, ImageCache(cache_dir), output_dir, dpi, options)
+
+
+def _render_slide(residents):
+    """Worker: paint one slide, save its card PNGs and return the page as JPEG"""
+    renderer, data, cache, output_dir, dpi, options = _worker
+    canvas = Canvas(*SLIDE_INCHES, dpi=dpi)
+    renderer.raster_slide(canvas, residents, data, cache, **options)
+
+    origin, pitch, width = renderer.CARD_COLUMNS
+    top, height = renderer.CARD_ROW
+    for column, resident in enumerate(residents):
+        card = canvas.crop(origin + column * pitch, top, width, height, CROP_MARGIN)
+        card.save(os.path.join(output_dir, card_filename(resident)), dpi=(dpi, dpi))
+
+    buffer = BytesIO()
+    canvas.image.save(buffer, 'JPEG', quality=PDF_JPEG_QUALITY, dpi=(dpi, dpi))
+    return buffer.getvalue(), canvas.image.size
+
+
+def export_prints(theme, residents, data, output_dir='prints', pdf_path=None,
+                  cache_dir=DEFAULT_CACHE_DIR, dpi=DEFAULT_PRINT_DPI, max_workers=None, **options):
+    """Render print-ready card PNGs and a multi-page PDF without PowerPoint.
+
+    Every slide of the theme's deck is painted with PIL at dpi, following the
+    deck's geometry, in a process pool. Each card is saved as a PNG in
+    output_dir and each slide becomes a page of pdf_path (default
+    <output_dir>/<theme>_cards.pdf). Images are downloaded and resampled into
+    the shared cache first, so workers only read from it. Extra options go
+    to the theme's image_requests and raster_slide. Returns the PDF path.
+    """
+    from doordecks.pipeline import normalize_images
+    import requests
+
+    renderer = load_theme(theme)
+    residents = list(iter_residents(residents))
+    os.makedirs(output_dir, exist_ok=True)
+    pdf_path = pdf_path or os.path.join(output_dir, f'{theme}_cards.pdf')
+
+    cache = ImageCache(cache_dir)
+    with span('fetch_stage'), requests.Session() as session:
+        normalize_images(renderer.image_requests(residents, data, dpi=dpi, **options), cache, session)
+    cache.flush()
+
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(THEMES[theme], data, cache_dir, output_dir, dpi, options)) as executor, \
+            PdfPages(pdf_path) as pdf:
+        # Submit a few slides ahead of the PDF writer, which adds pages in order
+        pending = read_ahead(chunked(residents, 3), workers * 2,
+                             lambda group: executor.submit(_render_slide, group))
+        pages = 0
+        for _, future in pending:
+            jpeg, size = future.result()
+            with span('write_page'):
+                pdf.add_page(jpeg, size)
+            pages += 1
+
+    print(f"Saved {len(residents)} card images to {output_dir} and {pages} pages to {pdf_path}")
+    return pdf_path
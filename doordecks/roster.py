@@ -0,0 +1,115 @@
+import io
+import os
+import csv
+from collections import deque
+from itertools import islice
+from typing import NamedTuple, Optional
+
+
+class Resident(NamedTuple):
+    """One roster row.
+
+    position is the row's place in the full roster; it selects the resident's
+    card or villager image, so a shard of a larger roster keeps its cards.
+    """
+    position: int
+    name: str
+    room: str
+    building: Optional[str] = None
+
+
+def _csv_residents(f, start):
+    for position, row in enumerate(csv.DictReader(f), start):
+        yield Resident(position, row['Name'], row['Room'], row.get('Building'))
+
+
+def read_roster(path, start=0):
+    """Stream residents from a roster CSV one row at a time"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        yield from _csv_residents(f, start)
+
+
+def parse_roster(text):
+    """Residents of roster CSV text, e.g. an uploaded file"""
+    return list(_csv_residents(io.StringIO(text.lstrip('\ufeff'), newline=''), 0))
+
+
+def _frame_residents(residents_df):
+    """Residents from a DataFrame, positioned by its integer index labels"""
+    if residents_df.index.dtype.kind in 'iu':
+        positions = residents_df.index
+    else:
+        positions = range(len(residents_df))
+    buildings = (residents_df['Building'] if 'Building' in residents_df.columns
+                 else [None] * len(residents_df))
+    for position, name, room, building in zip(positions, residents_df['Name'],
+                                               residents_df['Room'], buildings):
+        yield Resident(int(position), str(name), str(room),
+                       None if building is None else str(building))
+
+
+def iter_residents(roster):
+    """Residents from a CSV path, a DataFrame or an iterable of Resident records"""
+    if isinstance(roster, (str, os.PathLike)):
+        return read_roster(roster)
+    if hasattr(roster, 'itertuples'):
+        return _frame_residents(roster)
+    return iter(roster)
+
+
+def chunked(items, size=3):
+    """Yield lists of up to size consecutive items"""
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_ahead(items, size, start):
+    """Yield (item, start(item)) pairs, calling start up to size items early.
+
+    Lets downloads for upcoming residents run while the current slide is laid
+    out, without reading more than size rows ahead of the consumer.
+    """
+    pending = deque()
+    for item in items:
+        pending.append((item, start(item)))
+        if len(pending) > size:
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
+
+
+class PathsWriter:
+    """Append rows to an image paths CSV as cards are produced.
+
+    With path=None nothing is written, so callers can skip the CSV without
+    branching on every row.
+    """
+
+    def __init__(self, path, fields):
+        self.path = path
+        self.fields = fields
+        self.rows = 0
+        self._file = None
+        self._writer = None
+
+    def __enter__(self):
+        if self.path:
+            self._file = open(self.path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file, lineterminator='\n')
+            self._writer.writerow(self.fields)
+        return self
+
+    def write(self, *values):
+        if self._writer:
+            self._writer.writerow(['' if value is None else value for value in values])
+            self.rows += 1
+
+    def __exit__(self, *exc):
+        if self._file:
+            self._file.close()
+            if exc[0] is None:
+                print(f"Image paths saved to {self.path}")
@@ -0,0 +1,343 @@
+import requests
+from io import BytesIO
+from bs4 import BeautifulSoup
+from lxml import etree
+import time
+import random
+import asyncio
+from requests.adapters import HTTPAdapter
+from doordecks.scrape_manifest import ScrapeManifest, write_json_if_changed
+
+BASE_URL = "https://clashroyale.fandom.com"
+
+# List of popular Clash Royale cards
+CARD_NAMES = ["P.E.K.K.A.", "Royal_Giant", "Prince", "Dark_Prince", "Miner", "Bandit", "Ice_Spirit", "Electro_Dragon", "Baby_Dragon", "Skeleton_Dragons", "Night_Witch", "Witch", "Executioner", "Hunter", "Bowler", "Magic_Archer", "Dart_Goblin", "Royal_Recruits", "Royal_Ghost", "Cannon_Cart", "Flying_Machine", "Mega_Knight", "Lumberjack", "Ram_Rider", "Elite_Barbarians", "Barbarians", "Guards", "Fisherman", "Tornado",
+              "Lightning", "Arrows", "Rocket", "Zap", "Furnace", "Zappies", "Minions", "Goblin_Hut", "Hog_Rider", "Skeleton_Army", "Skeletons", "Monk", "Little_Prince", "Goblin_Drill", "Goblin_Barrel", "Knight", "Bomber", "Electro_Spirit", "Spear_Goblins", "Mini_P.E.K.K.A.", "Mega_Minion", "Berserker", "Wizard", "Ice_Wizard", "Firecracker", "Valkyrie", "Battle_Healer", "Mother_Witch", "Heal_Spirit", "Archers", "Musketeer"]
+
+# Manual rarity mapping for known cards
+RARITY_MAPPING = {
+    'P.E.K.K.A.': 'epic',
+    'Royal_Giant': 'common',
+    'Prince': 'epic',
+    'Dark_Prince': 'epic',
+    'Miner': 'legendary',
+    'Bandit': 'legendary',
+    'Ice_Spirit': 'common',
+    'Electro_Dragon': 'epic',
+    'Baby_Dragon': 'epic',
+    'Skeleton_Dragons': 'epic',
+    'Night_Witch': 'legendary',
+    'Witch': 'epic',
+    'Executioner': 'epic',
+    'Hunter': 'epic',
+    'Bowler': 'epic',
+    'Magic_Archer': 'legendary',
+    'Dart_Goblin': 'rare',
+    'Royal_Recruits': 'common',
+    'Royal_Ghost': 'legendary',
+    'Cannon_Cart': 'epic',
+    'Flying_Machine': 'rare',
+    'Mega_Knight': 'legendary',
+    'Lumberjack': 'legendary',
+    'Ram_Rider': 'legendary',
+    'Elite_Barbarians': 'common',
+    'Barbarians': 'common',
+    'Guards': 'epic',
+    'Fisherman': 'legendary',
+    'Tornado': 'epic',
+    'Lightning': 'epic',
+    'Arrows': 'common',
+    'Rocket': 'rare',
+    'Zap': 'common',
+    'Furnace': 'rare',
+    'Zappies': 'rare',
+    'Minions': 'common',
+    'Goblin_Hut': 'rare',
+    'Hog_Rider': 'rare',
+    'Skeleton_Army': 'epic',
+    'Skeletons': 'common',
+    'Monk': 'champion',
+    'Little_Prince': 'champion',
+    'Goblin_Drill': 'epic',
+    'Goblin_Barrel': 'epic',
+    'Knight': 'common',
+    'Bomber': 'common',
+    'Electro_Spirit': 'common',
+    'Spear_Goblins': 'common',
+    'Mini_P.E.K.K.A.': 'rare',
+    'Mega_Minion': 'rare',
+    'Berserker': 'epic',
+    'Wizard': 'rare',
+    'Ice_Wizard': 'legendary',
+    'Firecracker': 'common',
+    'Valkyrie': 'rare',
+    'Battle_Healer': 'rare',
+    'Mother_Witch': 'legendary',
+    'Heal_Spirit': 'common',
+    'Archers': 'common',
+    'Musketeer': 'rare'
+}
+
+# Concurrent page requests and sustained request rate used by the scraper
+DEFAULT_CONCURRENCY = 8
+DEFAULT_REQUESTS_PER_SECOND = 4.0
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF = 0.5
+# Seconds to wait for a connection or for the next bytes of a response
+DEFAULT_TIMEOUT = 30
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _card_image_url(src, base_url):
+    """Absolute, scaled-up URL for a card image src"""
+    if src.startswith('//'):
+        src = 'https:' + src
+    elif src.startswith('/'):
+        src = base_url + src
+
+    # Scale up the image
+    if 'scale-to-width-down' in src:
+        src = src.replace(
+            'scale-to-width-down/100', 'scale-to-width-down/500')
+        src = src.replace(
+            'scale-to-width-down/150', 'scale-to-width-down/500')
+    return src
+
+
+def parse_card_page(card_name, html, base_url=BASE_URL):
+    """Extract a card's image URL and rarity from its wiki page.
+
+    Returns the card_data entry, or None when the page has no card image.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Look for card image
+    card_image = None
+    selectors = [
+        'img[alt*="Card"]',
+        'img[src*="Card.png"]',
+        'img[data-src*="Card.png"]',
+        '.image img',
+        '.infobox img'
+    ]
+
+    for selector in selectors:
+        images = soup.select(selector)
+        for img in images:
+            src = img.get('src') or img.get('data-src')
+            if isinstance(src, list):
+                src = src[0] if src else None
+            if src and 'Card.png' in src:
+                card_image = _card_image_url(src, base_url)
+                break
+
+        if card_image:
+            break
+
+    # Look for rarity information
+    rarity = "common"  # default
+
+    # Try multiple ways to find rarity
+    rarity_selectors = [
+        '.infobox tr:contains("Rarity") td',
+        '.infobox-data',
+        'td:contains("Common")',
+        'td:contains("Rare")',
+        'td:contains("Epic")',
+        'td:contains("Legendary")',
+        'td:contains("Champion")'
+    ]
+
+    for selector in rarity_selectors:
+        elements = soup.select(selector)
+        for element in elements:
+            text = element.get_text().lower().strip()
+            if any(r in text for r in ['common', 'rare', 'epic', 'legendary', 'champion']):
+                if 'champion' in text:
+                    rarity = 'champion'
+                elif 'legendary' in text:
+                    rarity = 'legendary'
+                elif 'epic' in text:
+                    rarity = 'epic'
+                elif 'rare' in text:
+                    rarity = 'rare'
+                else:
+                    rarity = 'common'
+                break
+        if rarity != 'common':
+            break
+
+    if card_name in RARITY_MAPPING:
+        rarity = RARITY_MAPPING[card_name]
+
+    if not card_image:
+        return None
+    return {
+        'name': card_name,
+        'image_url': card_image,
+        'rarity': rarity
+    }
+
+
+def parse_card_page_fast(card_name, html, base_url=BASE_URL):
+    """parse_card_page's result from a single streaming pass over <img> tags.
+
+    The image selectors reduce to three tiers, first match in document order
+    within each: an img whose alt contains "Card", then one whose src holds
+    Card.png, then a lazy one with Card.png only in data-src (the '.image img'
+    and '.infobox img' selectors can only pick images these tiers already
+    cover). Parsing stops at the first alt="...Card" hit, which is normally
+    the infobox image near the top of the page, and no soup is built.
+    Cards missing from RARITY_MAPPING need the full rarity selectors, so
+    they fall back to parse_card_page.
+    """
+    if card_name not in RARITY_MAPPING:
+        return parse_card_page(card_name, html, base_url)
+
+    data = html.encode('utf-8') if isinstance(html, str) else html
+    tiers = [None, None, None]
+    for _, img in etree.iterparse(BytesIO(data), events=('end',), tag='img', html=True,
+                                  encoding='utf-8' if isinstance(html, str) else None):
+        src_attr = img.get('src')
+        src = src_attr or img.get('data-src')
+        if src and 'Card.png' in src:
+            if 'Card' in (img.get('alt') or ''):
+                tiers[0] = src
+                break
+            tier = 1 if src_attr else 2
+            if tiers[tier] is None:
+                tiers[tier] = src
+        img.clear()
+
+    card_image = next((src for src in tiers if src), None)
+    if not card_image:
+        return None
+    return {
+        'name': card_name,
+        'image_url': _card_image_url(card_image, base_url),
+        'rarity': RARITY_MAPPING[card_name]
+    }
+
+
+class TokenBucket:
+    """Async token bucket: allows bursts of capacity, then rate requests per second"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def fetch_page(session, url, bucket, max_retries=DEFAULT_MAX_RETRIES, backoff=DEFAULT_BACKOFF,
+                     headers=None, timeout=DEFAULT_TIMEOUT):
+    """GET url under the rate limit, retrying 429/5xx, timeouts and dropped
+    connections with exponential backoff.
+
+    Returns the response, which is a 304 when conditional headers matched.
+    """
+    for attempt in range(max_retries + 1):
+        await bucket.acquire()
+        try:
+            response = await asyncio.to_thread(session.get, url, headers=headers, timeout=timeout)
+        except requests.RequestException:
+            if attempt == max_retries:
+                raise
+            delay = backoff * 2 ** attempt
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == max_retries:
+                response.raise_for_status()
+                return response
+            # Honour the server's Retry-After when it gives one in seconds
+            retry_after = response.headers.get('Retry-After', '')
+            delay = float(retry_after) if retry_after.isdigit() else backoff * 2 ** attempt
+        await asyncio.sleep(delay * random.uniform(1, 1.25))
+
+
+async def scrape_card_data(card_names=CARD_NAMES, base_url=BASE_URL, concurrency=DEFAULT_CONCURRENCY,
+                           requests_per_second=DEFAULT_REQUESTS_PER_SECOND, max_retries=DEFAULT_MAX_RETRIES,
+                           backoff=DEFAULT_BACKOFF, manifest=None, fast_parse=True):
+    """Fetch and parse card pages concurrently, returning results in card_names order.
+
+    With a manifest, pages are requested conditionally and only pages that
+    changed since the last scrape are parsed. fast_parse selects
+    parse_card_page_fast over the BeautifulSoup parser.
+    """
+    bucket = TokenBucket(requests_per_second)
+    semaphore = asyncio.Semaphore(concurrency)
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    async def scrape(card_name):
+        async with semaphore:
+            try:
+                print(f"Fetching {card_name}...")
+                page_url = f"{base_url}/wiki/{card_name}"
+                headers = manifest.conditional_headers(page_url) if manifest else None
+                response = await fetch_page(session, page_url, bucket,
+                                            max_retries, backoff, headers)
+                if manifest and manifest.is_unchanged(page_url, response):
+                    print(f"Unchanged: {card_name}")
+                    return manifest.result(page_url)
+                if fast_parse:
+                    card = parse_card_page_fast(card_name, response.text, base_url)
+                else:
+                    card = parse_card_page(card_name, response.text, base_url)
+                if manifest:
+                    manifest.update(page_url, response, card)
+                if card:
+                    print(f"Found: {card_name} - {card['rarity']} - {card['image_url']}")
+                else:
+                    print(f"No card image found for {card_name}")
+                return card
+            except Exception as e:
+                print(f"Error processing {card_name}: {e}")
+                return None
+
+    try:
+        results = await asyncio.gather(*(scrape(card_name) for card_name in card_names))
+    finally:
+        session.close()
+    return [card for card in results if card]
+
+
+def get_clash_royale_card_data(**options):
+    """Scrape Clash Royale card images and rarities from wiki"""
+    return asyncio.run(scrape_card_data(**options))
+
+
+def main():
+    """Main function to scrape and save card data"""
+    print("Starting Clash Royale card data scraping...")
+
+    manifest = ScrapeManifest()
+    card_data = get_clash_royale_card_data(manifest=manifest)
+    manifest.save()
+
+    # Save to JSON file
+    output_file = 'clash_royale_card_data.json'
+    written = write_json_if_changed(output_file, card_data)
+
+    print(f"\nScraping complete!")
+    print(f"Found {len(card_data)} cards ({manifest.summary()})")
+    print(f"Data saved to {output_file}" if written else f"{output_file} is up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import json
+import time
+import threading
+from doordecks.image_cache import atomic_write
+
+# Default location of the manifest shared by the scrapers
+DEFAULT_MANIFEST_PATH = '.scrape_manifest.json'
+
+
+class ScrapeManifest:
+    """Record of every scraped page: validators, parsed result and fetch time.
+
+    Scrapers send conditional_headers(url) with each request. A 304 means the
+    page is unchanged and result(url) is reused without parsing; a 200 is
+    parsed and stored with update(). Counters tell how much of a scrape was
+    actually refetched.
+    """
+
+    def __init__(self, path=DEFAULT_MANIFEST_PATH):
+        self.path = path
+        self.unchanged = 0
+        self.changed = 0
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r') as f:
+                self._pages = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self._pages = {}
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since headers for a page seen before"""
+        with self._lock:
+            page = self._pages.get(url)
+        headers = {}
+        if page and page.get('etag'):
+            headers['If-None-Match'] = page['etag']
+        if page and page.get('last_modified'):
+            headers['If-Modified-Since'] = page['last_modified']
+        return headers
+
+    def result(self, url):
+        """Parsed result stored for url; counts the page as unchanged"""
+        with self._lock:
+            page = self._pages[url]
+            page['checked'] = time.time()
+            self.unchanged += 1
+            return page['result']
+
+    def update(self, url, response, result):
+        """Store the validators of a fresh response together with its parsed result"""
+        with self._lock:
+            now = time.time()
+            self._pages[url] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'result': result,
+                'fetched': now,
+                'checked': now,
+            }
+            self.changed += 1
+
+    def is_unchanged(self, url, response):
+        """True when response is a 304 for a page whose result is on record"""
+        with self._lock:
+            return response.status_code == 304 and url in self._pages
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self._pages, indent=1).encode('utf-8')
+        atomic_write(self.path, data)
+
+    def summary(self):
+        return f"{self.changed} pages changed, {self.unchanged} unchanged"
+
+
+def write_json_if_changed(path, data, indent=4):
+    """Write data as JSON unless the file already holds exactly that; returns True if written"""
+    text = json.dumps(data, indent=indent)
+    try:
+        with open(path, 'r') as f:
+            if f.read() == text:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path, 'w') as f:
+        f.write(text)
+    return True
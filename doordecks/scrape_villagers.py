@@ -0,0 +1,94 @@
+import requests
+from io import BytesIO
+from bs4 import BeautifulSoup
+from lxml import etree
+import asyncio
+from doordecks.scrape_clash import DEFAULT_REQUESTS_PER_SECOND, DEFAULT_TIMEOUT, TokenBucket, fetch_page
+from doordecks.scrape_manifest import ScrapeManifest, write_json_if_changed
+
+
+url = 'https://animalcrossing.fandom.com/wiki/Villager_list_(New_Horizons)'
+output_file = 'villager_image_urls.json'
+
+
+def parse_image_urls(html):
+    """Poster image URLs from the villager list's sortable table"""
+    soup = BeautifulSoup(html, 'html.parser')
+    table = soup.find('table', {'class': 'sortable'})
+
+    image_urls = []
+    for img_tag in table.find_all('img'):
+        img_url = img_tag.get('data-src', None)  # Look for 'data-src' first
+        if not img_url:                          # Now look for 'src'
+            img_url = img_tag.get('src')
+
+        if img_url and img_url.startswith('https://'):
+            img_url = img_url.replace('scale-to-width-down/100', 'scale-to-width-down/500')
+            image_urls.append(img_url)
+    return image_urls
+
+
+def parse_image_urls_fast(html):
+    """parse_image_urls' result from a streaming lxml parse.
+
+    Only the tree up to the end of the first sortable table is built; the rest
+    of the page is never parsed.
+    """
+    data = html.encode('utf-8') if isinstance(html, str) else html
+    target = None
+    for event, table in etree.iterparse(BytesIO(data), events=('start', 'end'), tag='table', html=True,
+                                        encoding='utf-8' if isinstance(html, str) else None):
+        # Like soup.find, take the first sortable table by its opening tag
+        if event == 'start':
+            if target is None and 'sortable' in (table.get('class') or '').split():
+                target = table
+            continue
+        if table is not target:
+            continue
+        image_urls = []
+        for img_tag in table.iter('img'):
+            img_url = img_tag.get('data-src') or img_tag.get('src')
+            if img_url and img_url.startswith('https://'):
+                image_urls.append(img_url.replace('scale-to-width-down/100', 'scale-to-width-down/500'))
+        return image_urls
+    raise ValueError("No sortable table found")
+
+
+async def _fetch_list_page(page_url, headers, timeout):
+    with requests.Session() as session:
+        return await fetch_page(session, page_url, TokenBucket(DEFAULT_REQUESTS_PER_SECOND),
+                                headers=headers, timeout=timeout)
+
+
+def scrape_image_urls(page_url, manifest=None, fast_parse=True, timeout=DEFAULT_TIMEOUT):
+    """Image URLs of a list page, reusing the manifest's result when the page is unchanged.
+
+    The page is fetched with the clash scraper's fetch_page, so timeouts,
+    dropped connections and 429/5xx responses are retried with backoff.
+    """
+    headers = manifest.conditional_headers(page_url) if manifest else None
+    response = asyncio.run(_fetch_list_page(page_url, headers, timeout))
+    if manifest and manifest.is_unchanged(page_url, response):
+        return manifest.result(page_url)
+
+    parse = parse_image_urls_fast if fast_parse else parse_image_urls
+    image_urls = parse(response.text)
+    if manifest:
+        manifest.update(page_url, response, image_urls)
+    return image_urls
+
+
+def main(page_url=url, image_urls_file=output_file):
+    manifest = ScrapeManifest()
+    image_urls = scrape_image_urls(page_url, manifest)
+    manifest.save()
+
+    # Image URLs list to a JSON format
+    if write_json_if_changed(image_urls_file, image_urls):
+        print(f"Saved {len(image_urls)} image URLs to {image_urls_file}")
+    else:
+        print(f"{image_urls_file} is up to date ({manifest.summary()})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""Long-running deck server: `doordecks serve`.
+
+Builds run in a pool of worker processes that stay up between requests, so
+python-pptx, PIL and the theme modules are imported once, each theme's data
+file is read once (and again only when it changes), and card templates,
+dominant color palettes, rendered gradients, fonts and fitted text sizes
+stay in memory. Requests:
+
+    POST /decks/<theme>[?dpi=300&fit_text=1&...]   body: roster CSV
+        -> the .pptx, streamed back
+    GET /status
+        -> JSON with the themes, their options, worker count and builds served
+
+    curl --data-binary @residents.csv -o deck.pptx http://127.0.0.1:8737/decks/clash
+"""
+import io
+import os
+import csv
+import json
+import inspect
+import time
+import tempfile
+import threading
+import contextlib
+import socketserver
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from doordecks.image_cache import DEFAULT_CACHE_DIR
+from doordecks.themes import THEMES, load_theme
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8737
+PPTX_TYPE = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+STREAM_CHUNK = 256 * 1024
+# Query options a request may set, with their parsers; each theme accepts
+# those its renderer takes (see theme_options)
+def _int_option(name, low, high=None):
+    """Parser of an integer option that must lie in [low, high]"""
+    def parse(value):
+        number = int(value)
+        if number < low or (high is not None and number > high):
+            bounds = f"{low}-{high}" if high is not None else f">= {low}"
+            raise ValueError(f"{name} must be {bounds}, got {number}")
+        return number
+    return parse
+
+
+REQUEST_OPTIONS = {
+    'dpi': _int_option('dpi', 0),
+    'zip_level': _int_option('zip_level', 0, 9),
+    'fit_text': lambda value: value not in ('', '0', 'false'),
+    'native_gradient': lambda value: value not in ('', '0', 'false'),
+}
+# Options every server build starts from; clash cards are embedded from
+# memory so builds never write to the server's working directory
+THEME_DEFAULTS = {'clash': {'in_memory': True}}
+# Columns an uploaded roster must have
+ROSTER_COLUMNS = ('Name', 'Room')
+
+
+class RosterColumnError(ValueError):
+    """An uploaded roster lacks a column the decks are built from"""
+
+
+def check_roster_columns(roster_text):
+    """Raise RosterColumnError unless the roster's header has every ROSTER_COLUMNS column"""
+    header = next(csv.reader(io.StringIO(roster_text)), [])
+    missing = [column for column in ROSTER_COLUMNS if column not in header]
+    if missing:
+        raise RosterColumnError(f"roster is missing column {', '.join(missing)}")
+
+
+def theme_options(theme):
+    """The REQUEST_OPTIONS a theme's renderer accepts"""
+    parameters = inspect.signature(load_theme(theme).render).parameters
+    return sorted(key for key in REQUEST_OPTIONS if key in parameters)
+
+
+# Per-process state of the build workers, set up by _init_worker
+_worker = None
+
+
+def _init_worker(cache_dir, data_files):
+    """Worker: import every theme and load its data once"""
+    from doordecks.image_cache import ImageCache
+    from doordecks.themes import load_theme
+
+    global _worker
+    themes = {}
+    for theme, data_file in data_files.items():
+        renderer = load_theme(theme)
+        data_file = data_file or renderer.DEFAULT_DATA_FILE
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            data = renderer.load_data(data_file)
+        themes[theme] = {'renderer': renderer, 'data_file': data_file, 'data': data,
+                         'mtime': _mtime(data_file), 'templates': {}}
+    _worker = {'cache': ImageCache(cache_dir), 'themes': themes}
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _build_deck(theme, roster_text, options, output_dir):
+    """Worker: build one deck into output_dir and return its path and build time"""
+    from doordecks.roster import parse_roster
+
+    start = time.perf_counter()
+    state = _worker['themes'][theme]
+    mtime = _mtime(state['data_file'])
+    if mtime != state['mtime']:
+        # The scraper rewrote the data; templates may depend on it too
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            state['data'] = state['renderer'].load_data(state['data_file'])
+        state.update(mtime=mtime, templates={})
+
+    fd, save_path = tempfile.mkstemp(suffix='.pptx', dir=output_dir)
+    os.close(fd)
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            state['renderer'].render(parse_roster(roster_text), state['data'], cache=_worker['cache'],
+                                     save_path=save_path, paths_csv=None,
+                                     templates=state['templates'], **options)
+    except BaseException:
+        os.remove(save_path)
+        raise
+    finally:
+        # Let the finished deck be freed instead of living on through the templates
+        for template in state['templates'].values():
+            template.release()
+    return save_path, time.perf_counter() - start
+
+
+class DeckService:
+    """The worker pool and counters behind the HTTP handler"""
+
+    def __init__(self, workers=1, cache_dir=DEFAULT_CACHE_DIR, data_files=None):
+        self.data_files = data_files or {theme: None for theme in THEMES}
+        self.options = {theme: theme_options(theme) for theme in self.data_files}
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.builds = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._output_dir = tempfile.TemporaryDirectory(prefix='doordecks-')
+        self._executor = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                             initargs=(cache_dir, self.data_files))
+
+    def warm_up(self, prefetch=False):
+        """Start every worker now instead of on the first request.
+
+        With prefetch every image the themes' data can put on a card is
+        downloaded and normalized into the cache at the default dpi first.
+        """
+        from concurrent.futures import wait
+
+        if prefetch:
+            from doordecks.image_cache import ImageCache
+            from doordecks.pipeline import normalize_images
+            from doordecks.roster import Resident
+            from doordecks.themes import load_theme
+
+            image_requests = []
+            for theme, data_file in self.data_files.items():
+                renderer = load_theme(theme)
+                data = renderer.load_data(data_file or renderer.DEFAULT_DATA_FILE)
+                residents = [Resident(position, '', '') for position in range(len(data))]
+                image_requests += renderer.image_requests(residents, data)
+            cache = ImageCache(self.cache_dir)
+            normalized = normalize_images(image_requests, cache)
+            cache.flush()
+            print(f"Prefetched {len(normalized)} images")
+        wait([self._executor.submit(time.sleep, 0.1) for _ in range(self.workers)])
+
+    def build(self, theme, roster_text, options):
+        """Path of a freshly built deck (the caller deletes it) and the build time"""
+        try:
+            result = self._executor.submit(_build_deck, theme, roster_text,
+                                           {**THEME_DEFAULTS.get(theme, {}), **options},
+                                           self._output_dir.name).result()
+        except BaseException:
+            with self._lock:
+                self.failures += 1
+            raise
+        with self._lock:
+            self.builds += 1
+        return result
+
+    def status(self):
+        return {'themes': sorted(self.data_files), 'options': self.options, 'workers': self.workers,
+                'builds': self.builds, 'failures': self.failures}
+
+    def close(self):
+        self._executor.shutdown()
+        self._output_dir.cleanup()
+
+
+class DeckRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'doordecks'
+    protocol_version = 'HTTP/1.1'
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if urlsplit(self.path).path != '/status':
+            self._send_json(404, {'error': 'not found'})
+            return
+        self._send_json(200, self.server.service.status())
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        parts = url.path.strip('/').split('/')
+        length = int(self.headers.get('Content-Length') or 0)
+        roster_text = self.rfile.read(length).decode('utf-8-sig')
+        if len(parts) != 2 or parts[0] != 'decks' or parts[1] not in self.server.service.data_files:
+            self._send_json(404, {'error': f"no such deck: {url.path}",
+                                  'themes': sorted(self.server.service.data_files)})
+            return
+
+        theme = parts[1]
+        allowed = self.server.service.options[theme]
+        try:
+            options = {}
+            for key, values in parse_qs(url.query, keep_blank_values=True).items():
+                if key not in allowed:
+                    raise KeyError(key)
+                options[key] = REQUEST_OPTIONS[key](values[-1])
+        except (KeyError, ValueError) as e:
+            self._send_json(400, {'error': f"bad option for {theme}: {e}", 'options': allowed})
+            return
+        if not roster_text.strip():
+            self._send_json(400, {'error': 'empty roster'})
+            return
+        try:
+            check_roster_columns(roster_text)
+        except RosterColumnError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+
+        try:
+            save_path, seconds = self.server.service.build(theme, roster_text, options)
+        except Exception as e:
+            self._send_json(500, {'error': f"build failed: {e}"})
+            return
+
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', PPTX_TYPE)
+            self.send_header('Content-Length', str(os.path.getsize(save_path)))
+            self.send_header('Content-Disposition', f'attachment; filename="{theme}_door_decks.pptx"')
+            self.send_header('X-Build-Seconds', f'{seconds:.3f}')
+            self.end_headers()
+            with open(save_path, 'rb') as f:
+                while chunk := f.read(STREAM_CHUNK):
+                    self.wfile.write(chunk)
+        finally:
+            os.remove(save_path)
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None):
+    """HTTP server on host:port, or on a Unix socket at socket_path, handing builds to service"""
+    if socket_path:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(socket_path)
+        server = _UnixHTTPServer(socket_path, DeckRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), DeckRequestHandler)
+        server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None, workers=1,
+          cache_dir=DEFAULT_CACHE_DIR, data_files=None, prefetch=False):
+    """Run the deck server until interrupted.
+
+    data_files maps each theme to serve to its data file (None for the
+    theme's default); by default every registered theme is served.
+    """
+    service = DeckService(workers, cache_dir, data_files)
+    server = make_server(service, host, port, socket_path)
+    service.warm_up(prefetch)
+    where = socket_path or f"http://{host}:{server.server_address[1]}"
+    print(f"Serving {', '.join(sorted(service.data_files))} decks on {where} with {workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if socket_path:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(socket_path)
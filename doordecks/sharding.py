@@ -0,0 +1,172 @@
+import os
+import re
+import copy
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+from doordecks.defaults import DEFAULT_SLIDES_PER_SHARD
+from doordecks.image_cache import ImageCache, DEFAULT_CACHE_DIR
+from doordecks.package_writer import save_deck
+from doordecks.pipeline import DEFAULT_FETCH_WORKERS, normalize_images
+from doordecks.roster import chunked, iter_residents
+from doordecks.themes import load_theme
+
+
+def room_floor(room):
+    """Floor of a room number: everything before the last two digits ('1204' -> '12')"""
+    match = re.match(r'\D*(\d+)', str(room))
+    if not match:
+        return str(room)
+    return match.group(1)[:-2] or '0'
+
+
+def shard_roster(residents, by='slides', slides_per_shard=DEFAULT_SLIDES_PER_SHARD):
+    """Split a roster into lists of Resident records that keep their roster position.
+
+    by is 'slides' (fixed chunks of slides_per_shard slides), 'floor' (from
+    the Room column) or 'building' (a Building column). Floors and buildings
+    are ordered by where they first appear in the roster.
+    """
+    residents = list(iter_residents(residents))
+    if by == 'slides':
+        return list(chunked(residents, slides_per_shard * 3))
+    if by == 'floor':
+        key = lambda resident: room_floor(resident.room)  # noqa: E731
+    elif by == 'building':
+        if any(resident.building is None for resident in residents):
+            raise ValueError("Sharding by building needs a 'Building' column")
+        key = lambda resident: resident.building  # noqa: E731
+    else:
+        raise ValueError(f"Unknown shard key: {by}")
+    groups = {}
+    for resident in residents:
+        groups.setdefault(key(resident), []).append(resident)
+    return list(groups.values())
+
+
+def _render_shard(theme, shard, data, save_path, paths_csv, cache_dir, options):
+    """Worker: build one shard deck reading images from the shared cache"""
+    load_theme(theme).render(shard, data, cache=ImageCache(cache_dir), save_path=save_path,
+                             paths_csv=paths_csv, **options)
+    return save_path
+
+
+def _prefetch(theme, residents, data, cache, fetch_workers, options):
+    """Download and normalize every image the whole roster needs before any worker starts"""
+    image_requests = load_theme(theme).image_requests(residents, data, **options)
+    normalized = normalize_images(image_requests, cache, max_workers=fetch_workers)
+    cache.flush()
+    print(f"Fetched {len(normalized)} distinct images")
+
+
+def _merge_paths(shard_csvs, paths_csv):
+    """Concatenate the shards' image paths CSVs, keeping the first header, and remove them"""
+    with open(paths_csv, 'w', newline='', encoding='utf-8') as out:
+        for k, shard_csv in enumerate(shard_csvs):
+            with open(shard_csv, newline='', encoding='utf-8') as f:
+                header = f.readline()
+                if k == 0:
+                    out.write(header)
+                out.writelines(f)
+            os.remove(shard_csv)
+    print(f"Image paths saved to {paths_csv}")
+
+
+def deck_image_parts(prs):
+    """Image parts already in a deck, keyed by content hash"""
+    image_parts = {}
+    for slide in prs.slides:
+        for rel in slide.part.rels.values():
+            if rel.reltype == RT.IMAGE:
+                image_parts[rel.target_part.sha1] = rel.target_part
+    return image_parts
+
+
+def copy_slide_shapes(slide, new_slide, image_parts):
+    """Replace the shapes of new_slide with copies of slide's shapes.
+
+    Pictures are related to the matching part in image_parts (see
+    deck_image_parts) when the deck already holds that image, so identical
+    images are stored once.
+    """
+    sp_tree = new_slide.shapes._spTree
+    # Drop the current shapes, including placeholders cloned from the layout
+    for el in list(sp_tree)[2:]:
+        if el.tag != qn('p:extLst'):
+            sp_tree.remove(el)
+    for source_el in list(slide.shapes._spTree)[2:]:
+        if source_el.tag == qn('p:extLst'):
+            continue
+        el = copy.deepcopy(source_el)
+        for blip in el.iter(qn('a:blip')):
+            source_part = slide.part.related_part(blip.get(qn('r:embed')))
+            part = image_parts.get(source_part.sha1)
+            if part is None:
+                part, r_id = new_slide.part.get_or_add_image_part(BytesIO(source_part.blob))
+                image_parts[source_part.sha1] = part
+            else:
+                r_id = new_slide.part.relate_to(part, RT.IMAGE)
+            blip.set(qn('r:embed'), r_id)
+        sp_tree.insert_element_before(el, 'p:extLst')
+
+
+def merge_decks(deck_paths, save_path, zip_level=None):
+    """Concatenate decks into one presentation, sharing identical images.
+
+    zip_level is passed to doordecks.package_writer.save_deck.
+    """
+    merged = Presentation(deck_paths[0])
+    image_parts = deck_image_parts(merged)
+
+    for path in deck_paths[1:]:
+        deck = Presentation(path)
+        for slide in deck.slides:
+            layout = merged.slide_layouts[deck.slide_layouts.index(slide.slide_layout)]
+            copy_slide_shapes(slide, merged.slides.add_slide(layout), image_parts)
+
+    save_deck(merged, save_path, zip_level)
+    print(f"Merged {len(deck_paths)} decks into {save_path}")
+    return save_path
+
+
+def build_sharded(theme, residents, data, by='slides', slides_per_shard=DEFAULT_SLIDES_PER_SHARD,
+                  max_workers=None, output_dir='shards', merge_path=None,
+                  cache_dir=DEFAULT_CACHE_DIR, paths_csv=None,
+                  fetch_workers=DEFAULT_FETCH_WORKERS, **options):
+    """Render a roster as several decks in a process pool.
+
+    residents is anything iter_residents accepts and data is the theme's
+    scraped data. Every image the theme's image_requests lists is downloaded
+    and normalized into the shared cache first, with fetch_workers
+    concurrent downloads, so workers only read from it. The shards' image
+    paths are joined into paths_csv (default: the theme's
+    DEFAULT_PATHS_CSV). Extra options are passed to the theme's generator.
+    Returns the shard paths, in roster order.
+    """
+    renderer = load_theme(theme)
+    os.makedirs(output_dir, exist_ok=True)
+
+    residents = list(iter_residents(residents))
+    _prefetch(theme, residents, data, ImageCache(cache_dir), fetch_workers, options)
+
+    shards = shard_roster(residents, by, slides_per_shard)
+    shard_csvs = [os.path.join(output_dir, f'{theme}_shard_{k:03d}_paths.csv')
+                  for k in range(len(shards))]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_render_shard, theme, shard, data,
+                            os.path.join(output_dir, f'{theme}_shard_{k:03d}.pptx'),
+                            shard_csv, cache_dir, options)
+            for k, (shard, shard_csv) in enumerate(zip(shards, shard_csvs))
+        ]
+        shard_paths = [future.result() for future in futures]
+
+    if shard_csvs:
+        _merge_paths(shard_csvs, paths_csv or renderer.DEFAULT_PATHS_CSV)
+
+    if merge_path and shard_paths:
+        merge_decks(shard_paths, merge_path, options.get('zip_level'))
+    return shard_paths
+
@@ -0,0 +1,66 @@
+import functools
+from doordecks.raster import load_family_font
+
+# Left plus right inset of python-pptx text boxes, in inches
+TEXT_BOX_INSETS = 0.2
+# Characters are measured once at this pixel size and scaled to each point size
+MEASURE_PX = 100
+MIN_FONT_PT = 6
+
+
+@functools.lru_cache(maxsize=None)
+def _advances(family, bold, italic):
+    """Advance width per point of font size of each character met so far, for one font"""
+    return {}
+
+
+@functools.lru_cache(maxsize=None)
+def _warn_missing(family, bold, italic):
+    print(f"Font {family} is not installed; keeping its designed sizes instead of fitting text")
+
+
+def _measure(text, family, bold, italic):
+    """Width per point of font size of one line of text, or None when the font is not installed.
+
+    Summing cached per-character advances skips kerning, which moves a
+    name's width by well under a point, but needs no glyph loading once a
+    font's characters have been seen.
+    """
+    font = load_family_font(family, MEASURE_PX, bold, italic)
+    if font is None:
+        return None
+    advances = _advances(family, bold, italic)
+    width = 0
+    for char in text:
+        advance = advances.get(char)
+        if advance is None:
+            advance = advances[char] = font.getlength(char) / MEASURE_PX
+        width += advance
+    return width
+
+
+def text_width_pt(text, family, size_pt, bold=False, italic=False):
+    """Advance width of one line of text, in points, from PIL font metrics; None without the font"""
+    width_per_pt = _measure(text, family, bold, italic)
+    return None if width_per_pt is None else width_per_pt * size_pt
+
+
+@functools.lru_cache(maxsize=65536)
+def fit_font_size(text, family, max_pt, box_width_in, bold=False, italic=False, min_pt=MIN_FONT_PT):
+    """Largest whole point size up to max_pt at which text fits across a text box.
+
+    Only the width is fitted, on one line, so text that already fits keeps
+    the card's designed size. Text is measured with the deck's own font
+    (see doordecks.raster.FONT_FILES); when it is not installed a stand-in
+    would give the wrong size, so max_pt is kept and a warning printed.
+    Results are memoized per (font, text, box).
+    """
+    width_per_pt = _measure(text, family, bold, italic)
+    if width_per_pt is None:
+        _warn_missing(family, bold, italic)
+        return max_pt
+    available = (box_width_in - TEXT_BOX_INSETS) * 72
+    if width_per_pt * max_pt <= available:
+        return max_pt
+    # Width grows linearly with the size, so the largest fitting size is direct
+    return max(min_pt, min(max_pt, int(available / width_per_pt)))
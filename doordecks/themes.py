@@ -0,0 +1,47 @@
+"""Deck themes, by name.
+
+A theme is a module that renders one kind of deck. The shared build stages
+(sharded, incremental and multi-theme builds, print export) only talk to it through:
+
+    render(residents, data, cache=None, save_path=DEFAULT_OUTPUT,
+           paths_csv=DEFAULT_PATHS_CSV, **options)
+                        build the deck; residents is anything
+                        doordecks.roster.iter_residents accepts and data is
+                        the theme's scraped data
+    load_data(path=DEFAULT_DATA_FILE)
+                        read that data
+    image_requests(residents, data, **options)
+                        (url, size, background) of every normalized image
+                        the build will embed, for the shared fetch stage
+    card_inputs(data, position)
+                        JSON-able inputs besides name and room that the card
+                        at a roster position is drawn from
+    raster_slide(canvas, residents, data, cache, **options)
+                        paint a slide of up to three residents onto a
+                        doordecks.raster.Canvas, for print export
+    CARD_COLUMNS        (left edge of column 0, column pitch, card width) of
+                        the three cards on a slide, in inches
+    CARD_ROW            (top, height) of the cards, in inches
+    DEFAULT_OUTPUT, DEFAULT_PATHS_CSV, DEFAULT_DATA_FILE
+
+Modules are imported on first use, so listing the themes stays cheap.
+"""
+import importlib
+
+# Theme name -> module implementing the interface above
+THEMES = {
+    'clash': 'doordecks.clash',
+    'villager': 'doordecks.villager',
+}
+
+
+def register_theme(name, module):
+    """Make a renderer module, given by its import name, available as a theme"""
+    THEMES[name] = module
+
+
+def load_theme(name):
+    """The module of a registered theme"""
+    if name not in THEMES:
+        raise ValueError(f"Unknown theme: {name}")
+    return importlib.import_module(THEMES[name])
@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+
+class _NullSpan:
+    """Shared no-op span handed out while tracing is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+# The active Tracer, or None. Instrumented code only checks this global, so a
+# disabled span costs one function call and two empty method calls.
+_tracer = None
+
+
+class _Span:
+    def __init__(self, tracer, name, tags):
+        self.tracer = tracer
+        self.name = name
+        self.tags = tags
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer._record(self.name, self.start, time.perf_counter(), self.tags)
+        return False
+
+
+class Tracer:
+    """Collects timing spans and counters for one build.
+
+    Spans carry free-form tags (resident, slide, url); counters are plain
+    running totals. Both can be exported as Chrome trace-event JSON, which
+    chrome://tracing and Perfetto open directly, or summarized as a table.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def span(self, name, **tags):
+        return _Span(self, name, tags)
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def _record(self, name, start, end, tags):
+        # list.append is atomic, so download threads can record without the lock
+        self.events.append((name, start, end, threading.get_ident(), tags))
+
+    def chrome_trace(self):
+        """Trace-event JSON object: one complete ('X') event per span"""
+        pid = os.getpid()
+        trace_events = [
+            {
+                'name': name,
+                'ph': 'X',
+                'ts': (start - self._origin) * 1e6,
+                'dur': (end - start) * 1e6,
+                'pid': pid,
+                'tid': tid,
+                'args': {key: str(value) for key, value in tags.items()},
+            }
+            for name, start, end, tid, tags in self.events
+        ]
+        end = max((event[2] for event in self.events), default=self._origin)
+        trace_events += [
+            {'name': name, 'ph': 'C', 'ts': (end - self._origin) * 1e6, 'pid': pid,
+             'args': {name: value}}
+            for name, value in self.counters.items()
+        ]
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+    def stages(self):
+        """Per span name: (calls, total seconds, max seconds)"""
+        totals = {}
+        for name, start, end, _, _ in self.events:
+            calls, total, longest = totals.get(name, (0, 0.0, 0.0))
+            totals[name] = (calls + 1, total + end - start, max(longest, end - start))
+        return totals
+
+    def summary(self):
+        """Table of span totals, slowest stage first, followed by the counters"""
+        lines = [f'{"stage":14s} {"calls":>7s} {"total":>10s} {"mean":>10s} {"max":>10s}']
+        for name, (calls, total, longest) in sorted(self.stages().items(),
+                                                    key=lambda item: -item[1][1]):
+            lines.append(f'{name:14s} {calls:7d} {total * 1e3:8.1f}ms '
+                         f'{total / calls * 1e3:8.2f}ms {longest * 1e3:8.2f}ms')
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'{name:30s} {value:>10}')
+        return '\n'.join(lines)
+
+
+def span(name, **tags):
+    """Time a block as a span of the active tracer; a no-op when tracing is off"""
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(name, **tags)
+
+
+def count(name, value=1):
+    """Add value to a counter of the active tracer"""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.count(name, value)
+
+
+def enabled():
+    return _tracer is not None
+
+
+@contextmanager
+def tracing(tracer=None):
+    """Activate a tracer for the duration of the block and yield it"""
+    global _tracer
+    previous = _tracer
+    _tracer = tracer or Tracer()
+    try:
+        yield _tracer
+    finally:
+        _tracer = previous
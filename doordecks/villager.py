@@ -0,0 +1,378 @@
+import os
+import re
+import json
+import functools
+import requests
+from urllib.parse import unquote
+from pptx import Presentation
+from pptx.util import Inches, Pt
+from pptx.dml.color import RGBColor
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.enum.text import PP_ALIGN
+from doordecks.image_cache import ImageCache
+from doordecks.image_pack import ImagePack, pack_images
+from doordecks.package_writer import save_deck
+from doordecks.text_fit import fit_font_size
+from doordecks.card_template import CardTemplate, placeholder_image
+from doordecks.roster import PathsWriter, chunked, iter_residents
+from doordecks.tracing import count, span
+from doordecks.normalize import DEFAULT_PRINT_DPI, normalized_image, placeholder_pixels
+
+# Villager picture frame, in inches
+VILLAGER_IMAGE_INCHES = (2.5, 2.5)
+# Card columns: (left edge of column 0, column pitch, card width), in inches
+CARD_COLUMNS = (0.15, 3.3, 3.04)
+# (top, height) of the cards, in inches
+CARD_ROW = (0.15, 7.1)
+# Name and room text: (font, largest size in points, text box width in inches)
+NAME_TEXT = ('Perpetua', 66, 2.74)
+ROOM_TEXT = ('Perpetua', 66, 2.8)
+
+DEFAULT_OUTPUT = os.path.join('adjusted_pptx', 'MAIN_Adjusted_Residents_Presentation.pptx')
+DEFAULT_PATHS_CSV = 'image_paths.csv'
+DEFAULT_DATA_FILE = 'villager_image_urls.json'
+DEFAULT_PACK = 'villager_images.pack'
+
+
+def card_text_sizes(name, room, fit_text=False):
+    """Point sizes of a card's name and room; with fit_text, shrunk to fit their boxes"""
+    if not fit_text:
+        return NAME_TEXT[1], ROOM_TEXT[1]
+    return (fit_font_size(str(name), *NAME_TEXT, bold=True, italic=True),
+            fit_font_size(f"{room}", *ROOM_TEXT, bold=True, italic=True))
+
+
+def add_villager_card(slide, column, name, room, image_filename=None, name_pt=NAME_TEXT[1],
+                      room_pt=ROOM_TEXT[1]):
+    """Draw one resident card in the given column (0-2) of a slide.
+
+    The villager picture is named 'villager_image' so the card can be captured
+    as a CardTemplate.
+    """
+    # Adjusted positioning and sizing
+    left = Inches(CARD_COLUMNS[0] + column * CARD_COLUMNS[1])
+    top = Inches(CARD_ROW[0])
+    width = Inches(CARD_COLUMNS[2])
+    height = Inches(CARD_ROW[1])
+
+    # Add shape to the slide
+    shape = slide.shapes.add_shape(
+        MSO_SHAPE.RECTANGLE,
+        left, top, width, height
+    )
+
+    shape.fill.solid()
+    shape.fill.fore_color.rgb = RGBColor(
+        200, 200, 200)  # Light gray fill
+    shape.line.color.rgb = RGBColor(0, 0, 0)  # Black border
+    shape.line.width = Pt(4)
+
+    # Add image
+    if image_filename:
+        img_border_left = Inches(left.inches + 0.275)
+        img_border_top = Inches(top.inches + 0.5)
+        img_border_width = Inches(2.5)
+        img_border_height = Inches(2.5)
+
+        img_border = slide.shapes.add_shape(
+            MSO_SHAPE.RECTANGLE,
+            img_border_left, img_border_top, img_border_width, img_border_height
+        )
+
+        img_border.fill.solid()
+        img_border.fill.fore_color.rgb = RGBColor(
+            200, 200, 200)  # Light gray fill
+        img_border.line.color.rgb = RGBColor(
+            0, 0, 0)  # Black border
+        img_border.line.width = Pt(4)
+
+        # Add villager image on top
+        villager_picture = slide.shapes.add_picture(image_filename,
+                                                    img_border_left,
+                                                    img_border_top,
+                                                    width=Inches(2.5),
+                                                    height=Inches(2.5))
+        villager_picture.name = 'villager_image'
+
+    # Add rectangle border for resident's name
+    name_border_left = Inches(left.inches + 0.15)
+    name_border_top = Inches(top.inches + 3.2)
+    name_border_width = Inches(2.74)
+    name_border_height = Inches(1)
+
+    name_border = slide.shapes.add_shape(
+        MSO_SHAPE.RECTANGLE,
+        name_border_left, name_border_top, name_border_width, name_border_height
+    )
+    name_border.fill.solid()
+    name_border.fill.fore_color.rgb = RGBColor(249, 245, 223)
+    name_border.line.color.rgb = RGBColor(0, 0, 0)
+    name_border.line.width = Pt(3)
+
+    # Add text for resident's name on top of the border
+    name_textbox = slide.shapes.add_textbox(
+        name_border_left, name_border_top, name_border_width, name_border_height)
+    name_textframe = name_textbox.text_frame
+    name_textframe.text = name
+    name_textframe.paragraphs[0].alignment = PP_ALIGN.CENTER
+
+    name_font = name_textframe.paragraphs[0].font
+    name_font.name = 'Perpetua'
+    name_font.size = Pt(name_pt)
+    name_font.bold = True
+    name_font.italic = True
+    name_font.color.rgb = RGBColor(0, 0, 0)
+
+    # Add ellipse border for room number
+    room_border_left = Inches(left.inches + 0.1)
+    room_border_top = Inches(top.inches + 5)
+    room_border_width = Inches(2.8)
+    room_border_height = Inches(2.0)
+
+    room_border = slide.shapes.add_shape(
+        MSO_SHAPE.OVAL,
+        room_border_left, room_border_top, room_border_width, room_border_height
+    )
+    room_border.fill.solid()
+    room_border.fill.fore_color.rgb = RGBColor(249, 245, 223)
+    room_border.line.color.rgb = RGBColor(0, 0, 0)
+    room_border.line.width = Pt(0)
+
+    # Set the position of the room number text box
+    room_textbox_left = Inches(left.inches + 0.2)
+    room_textbox_top = Inches(5.64)
+
+    # Create the text box with the updated positions
+    room_textbox = slide.shapes.add_textbox(
+        room_textbox_left, room_textbox_top, room_border_width, room_border_height)
+    room_textframe = room_textbox.text_frame
+
+    # Add the room number text
+    room_textframe.text = f"{room}"
+    room_textframe.paragraphs[0].alignment = PP_ALIGN.CENTER
+
+    # Set the font properties to match the resident name's font
+    room_font = room_textframe.paragraphs[0].font
+    room_font.name = 'Perpetua'
+    room_font.size = Pt(room_pt)
+    room_font.bold = True
+    room_font.italic = True
+    room_font.color.rgb = RGBColor(0, 0, 0)
+
+    # Adjust line spacing to move the text down if needed
+    paragraph = room_textframe.paragraphs[0]
+    paragraph.space_before = Pt(20)
+
+    # Add bells icon
+    bells_left = Inches(left.inches - 0.05)
+    bells_top = Inches(top.inches + 3.9)
+    bells_width = Inches(2.04)
+    bells_height = Inches(2.04)
+
+    bells_icon = os.path.join('bells.png')
+    slide.shapes.add_picture(
+        bells_icon, bells_left, bells_top, bells_width, bells_height)
+
+
+def raster_villager_card(canvas, column, name, room, image_filename=None, name_pt=NAME_TEXT[1],
+                         room_pt=ROOM_TEXT[1]):
+    """Paint one resident card onto a raster Canvas, as add_villager_card draws it"""
+    black = (0, 0, 0)
+    cream = (249, 245, 223)
+    left = CARD_COLUMNS[0] + column * CARD_COLUMNS[1]
+    top, height = CARD_ROW
+    width = CARD_COLUMNS[2]
+
+    canvas.shape('rect', left, top, width, height, fill=(200, 200, 200), line=black, line_pt=4)
+    if image_filename:
+        canvas.shape('rect', left + 0.275, top + 0.5, 2.5, 2.5, fill=(200, 200, 200), line=black,
+                     line_pt=4)
+        canvas.picture(image_filename, left + 0.275, top + 0.5, 2.5, 2.5)
+
+    canvas.shape('rect', left + 0.15, top + 3.2, 2.74, 1, fill=cream, line=black, line_pt=3)
+    canvas.text(name, left + 0.15, top + 3.2, 2.74, 1, 'Perpetua', name_pt, black, bold=True,
+                italic=True)
+
+    canvas.shape('oval', left + 0.1, top + 5, 2.8, 2.0, fill=cream, line=black, line_pt=0)
+    # The room text box sits at a fixed 5.64" from the top of the slide
+    canvas.text(f"{room}", left + 0.2, 5.64, 2.8, 2.0, 'Perpetua', room_pt, black, bold=True,
+                italic=True, space_before_pt=20)
+
+    if os.path.exists('bells.png'):
+        canvas.picture('bells.png', left - 0.05, top + 3.9, 2.04, 2.04)
+
+
+def raster_slide(canvas, residents, image_urls, cache, pack=None, fit_text=False, **options):
+    """Paint a slide of up to three residents onto a raster Canvas"""
+    size = villager_image_size(canvas.dpi)
+    pack = open_villager_pack(pack, size)
+    for column, resident in enumerate(residents):
+        image_filename = None
+        try:
+            image_url = image_urls[resident.position]
+            if pack is not None and image_url in pack:
+                image_filename = pack.open_image(image_url)
+            else:
+                image_filename = normalized_image(cache, image_url, size)
+        except Exception as e:
+            print(f"An error occurred with {resident.name}'s image: {e}")
+        raster_villager_card(canvas, column, resident.name, resident.room, image_filename,
+                             *card_text_sizes(resident.name, resident.room, fit_text))
+
+
+def villager_image_size(dpi=DEFAULT_PRINT_DPI):
+    """Pixel size villager images are resampled to, or None to keep their resolution"""
+    return placeholder_pixels(*VILLAGER_IMAGE_INCHES, dpi) if dpi else None
+
+
+def villager_name(image_url):
+    """Villager name from a poster URL (.../NH-Agent_S_poster.png/... -> 'Agent S'), or None"""
+    match = re.search(r'/NH-(.+?)_poster', image_url)
+    return unquote(match.group(1)).replace('_', ' ') if match else None
+
+
+def pack_villager_images(image_urls, pack_path=DEFAULT_PACK, cache=None, dpi=DEFAULT_PRINT_DPI,
+                         session=None):
+    """Pack every villager poster, resampled for the frame at dpi, into one image pack"""
+    return pack_images([(villager_name(url), url) for url in image_urls], pack_path, cache,
+                       villager_image_size(dpi), session=session)
+
+
+@functools.lru_cache(maxsize=None)
+def open_villager_pack(pack_path, size):
+    """The image pack at pack_path if its posters were packed for size, else None.
+
+    Packs stay open (and mapped) for the life of the process, so every build
+    and export worker maps each pack once.
+    """
+    if not pack_path:
+        return None
+    pack = ImagePack(pack_path)
+    if pack.size != size:
+        print(f"{pack_path} was packed for {pack.size} images, not {size}; fetching instead")
+        pack.close()
+        return None
+    return pack
+
+
+def villager_card_template(has_image):
+    """CardTemplate for villager cards with or without a villager picture"""
+    def build(slide):
+        add_villager_card(slide, 0, '{name}', '{room}',
+                          placeholder_image() if has_image else None)
+    return CardTemplate(build, image_roles=('villager_image',))
+
+
+def adjust_pptx(residents, image_urls, cache=None, use_templates=True, dpi=DEFAULT_PRINT_DPI,
+                save_path=DEFAULT_OUTPUT, paths_csv=DEFAULT_PATHS_CSV, pack=None, zip_level=None,
+                fit_text=False, templates=None):
+    """Build the villager deck.
+
+    residents is a roster CSV path, a DataFrame or an iterable of Resident
+    records, streamed three at a time; each resident's position in the full
+    roster selects their image from image_urls. Images are resampled to the
+    2.5" frame at dpi (None keeps the downloaded resolution); transparent
+    posters stay PNG, opaque ones become JPEG. With pack, the path of an
+    image pack built by pack_villager_images at the same dpi, posters are
+    read from it and only URLs missing from it are fetched. With zip_level
+    the deck is written by doordecks.package_writer at that deflate level.
+    With fit_text long names and rooms are shrunk from 66 pt to fit across
+    their text boxes (see doordecks.text_fit). templates is a dict of card
+    templates to reuse and extend across builds.
+    """
+    prs = Presentation()
+    folder_path = 'adjusted_pptx'
+    os.makedirs(folder_path, exist_ok=True)
+    image_size = villager_image_size(dpi)
+    pack = open_villager_pack(pack, image_size)
+    if cache is None:
+        cache = ImageCache()
+    session = requests.Session()
+    if templates is None:
+        templates = {}
+
+    with session, PathsWriter(paths_csv, ('Name', 'Path')) as paths:
+        for slide_index, group in enumerate(chunked(iter_residents(residents), 3)):
+            print(f"Processing slide {slide_index + 1}")
+
+            slide_layout = prs.slide_layouts[5]  # Choosing a blank slide
+            with span('slide', slide=slide_index):
+                slide = prs.slides.add_slide(slide_layout)
+
+            # Add three vertical rectangles inside the slide
+            for i, resident in enumerate(group):
+                name = resident.name
+                room = resident.room
+
+                image_filename = image = None
+                try:
+                    with span('fetch', resident=name, slide=slide_index):
+                        image_url = image_urls[resident.position]
+                        if pack is not None and image_url in pack:
+                            image = pack.open_image(image_url)
+                            image_filename = image.name
+                        else:
+                            # Resampled for the frame once and kept in the cache
+                            image = image_filename = normalized_image(cache, image_url, image_size,
+                                                                      session=session)
+                except Exception as e:
+                    print(f"An error occurred with {name}'s image: {e}")
+                paths.write(name, image_filename)
+
+                count('images_embedded', image is not None)
+                with span('text_fit', resident=name, slide=slide_index):
+                    name_pt, room_pt = card_text_sizes(name, room, fit_text)
+                with span('shapes', resident=name, slide=slide_index):
+                    if not use_templates:
+                        add_villager_card(slide, i, name, room, image, name_pt, room_pt)
+                        continue
+
+                    has_image = image is not None
+                    if has_image not in templates:
+                        templates[has_image] = villager_card_template(has_image)
+                    templates[has_image].stamp(
+                        slide, Inches(i * 3.3),
+                        {'{name}': str(name), '{room}': f"{room}"},
+                        {'villager_image': image},
+                        {'{name}': name_pt, '{room}': room_pt} if fit_text else None)
+
+    # Save the modified presentation
+    save_deck(prs, save_path, zip_level)
+    print(f"Presentation adjusted and saved as {save_path}")
+
+    cache.flush()
+    print(f"Image cache: {cache.stats()}")
+
+
+def load_image_urls(image_urls_file=DEFAULT_DATA_FILE):
+    """Villager image URLs written by the scraper, indexed by roster position"""
+    with open(image_urls_file, 'r') as f:
+        return json.load(f)
+
+
+def image_requests(residents, image_urls, dpi=DEFAULT_PRINT_DPI, pack=None, **options):
+    """(url, size, background) of every normalized villager image a build will fetch"""
+    size = villager_image_size(dpi)
+    pack = open_villager_pack(pack, size)
+    return [(image_urls[resident.position], size, None) for resident in iter_residents(residents)
+            if resident.position < len(image_urls)
+            and (pack is None or image_urls[resident.position] not in pack)]
+
+
+def card_inputs(image_urls, position):
+    """Everything besides name and room that the card at a roster position is drawn from"""
+    return image_urls[position] if position < len(image_urls) else None
+
+
+# Theme renderer interface, see doordecks.themes
+render = adjust_pptx
+load_data = load_image_urls
+
+
+def main(roster='residents_moore.csv', image_urls_file=DEFAULT_DATA_FILE):
+    # Stream residents from the roster CSV; image URLs come from the scraper's JSON
+    adjust_pptx(roster, load_image_urls(image_urls_file))
+
+
+if __name__ == "__main__":
+    main()